@@ -0,0 +1,217 @@
+from benchmarks.fakes import Dataset, Recorder, Server
+from benchmarks.scenarios import SCENARIOS, Environment
+from pathlib import Path
+from tabulate import tabulate
+from toggl2pl import Client, TogglAPIClient
+import argparse
+import json
+import os
+import sys
+import yaml
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+# The datasets sizes available to run scenarios with
+SCALES = {
+    'default': {
+        'entries': 20000,
+        'projects': 500,
+        'streamed': 1000000
+    },
+    'small': {
+        'entries': 2000,
+        'projects': 50,
+        'streamed': 100000
+    }
+}
+
+
+def compare(results, baselines, tolerance):
+    """
+    Compare scenarios results with baselines and find regressions (more upstream requests or slower and bigger runs).
+
+    :param results: Dictionary object with metrics by scenarios names.
+    :type results: dict
+    :param baselines: Dictionary object with baseline metrics by scenarios names.
+    :type baselines: dict
+    :param tolerance: The allowed relative increase of wall time and peak memory (e.g. `0.25` for 25%).
+    :type tolerance: float
+    :return: List of regressions descriptions.
+    :rtype: list
+    """
+    regressions = list()
+    for name, metrics in results.items():
+        baseline = baselines.get(name)
+        if not baseline:
+            continue
+        for metric in ('pl_requests', 'toggl_requests'):
+            if metrics[metric] > baseline[metric]:
+                regressions.append('{name}: {metric} {value} > {baseline}'.format(
+                    name=name, metric=metric, value=metrics[metric], baseline=baseline[metric]
+                ))
+        for metric in ('peak_mb', 'seconds'):
+            if metrics[metric] > baseline[metric] * (1 + tolerance):
+                regressions.append('{name}: {metric} {value} > {baseline} (+{tolerance:.0%})'.format(
+                    name=name, metric=metric, value=metrics[metric], baseline=baseline[metric], tolerance=tolerance
+                ))
+    return regressions
+
+
+def parse_arguments():
+    """
+    Configure benchmark command line arguments.
+
+    :return: :obj:`argparse.ArgumentParser` object with set of configured arguments.
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('--latency', help='Fake upstreams latency in milliseconds (default: 5).', type=float, default=5)
+    parser.add_argument(
+        '--replay',
+        help='Run scenarios against responses recorded with `record` command instead of generated dataset.',
+        type=str
+    )
+    parser.add_argument(
+        '--scale',
+        help='The dataset size (default: default).',
+        choices=sorted(SCALES),
+        default='default'
+    )
+    parser.add_argument(
+        '--scenario',
+        help='Scenario to run (can be used multiple times, default: all).',
+        action='append',
+        choices=list(SCENARIOS)
+    )
+    parser.add_argument(
+        '--tolerance',
+        help='The allowed relative increase of wall time and peak memory comparing to baselines (default: 0.5).',
+        type=float,
+        default=0.5
+    )
+    parser.add_argument('--update-baselines', help='Store results as new baselines.', action='store_true')
+    parser.set_defaults(func=run)
+    subparsers = parser.add_subparsers()
+    record = subparsers.add_parser(name='record', help='Record real PL and Toggl responses to replay them later.')
+    record.add_argument(
+        '-c',
+        '--config',
+        help='Path to toggl2pl configuration file with credentials.',
+        type=str,
+        default=str(Path.home() / '.toggl2pl' / 'config.yml')
+    )
+    record.add_argument('-o', '--output', help='Path to fixture file to store responses.', type=str, required=True)
+    record.add_argument('--since', help='The first date to record time entries.', type=str, required=True)
+    record.add_argument('--until', help='The last date to record time entries.', type=str, required=True)
+    record.set_defaults(func=record_fixture)
+    return parser
+
+
+def record_fixture(known_args):
+    """
+    Pull posts from real upstreams through recording proxies and store responses into fixture file.
+
+    :param known_args: The argument parser namespace object with supplied arguments.
+    :type known_args: :obj:`argparse.Namespace`
+    """
+    with open(known_args.config, 'r') as fp:
+        config = yaml.safe_load(fp)
+    pl = Recorder(target=config['pl']['base_url'])
+    toggl = Recorder(target=config['toggl'].get('base_url') or TogglAPIClient.base_url)
+    with Server(handler=pl) as pl_server, Server(handler=toggl) as toggl_server:
+        client = Client(
+            api_token=config['toggl']['api_token'],
+            base_url=pl_server.url,
+            excluded_projects=config['pl']['excluded_projects'],
+            toggl_url=toggl_server.url,
+            user_key=config['pl']['user_key'],
+            workspace=config['toggl']['workspace']
+        )
+        client.days(since=known_args.since, until=known_args.until)
+    fixture = {
+        'meta': {
+            'excluded_projects': config['pl']['excluded_projects'],
+            'since': known_args.since,
+            'until': known_args.until,
+            'workspace': config['toggl']['workspace']
+        },
+        'pl': pl.responses,
+        'toggl': toggl.responses
+    }
+    with open(known_args.output, 'w') as fp:
+        json.dump(fixture, fp, indent=2, sort_keys=True)
+    print('recorded {count} responses into {path}'.format(
+        count=len(pl.responses) + len(toggl.responses),
+        path=known_args.output
+    ))
+
+
+def run(known_args):
+    """
+    Run benchmark scenarios, print results and compare them with stored baselines.
+
+    :param known_args: The argument parser namespace object with supplied arguments.
+    :type known_args: :obj:`argparse.Namespace`
+    """
+    fixture = None
+    baseline_key = '{scale}@{latency:g}ms'.format(scale=known_args.scale, latency=known_args.latency)
+    if known_args.replay:
+        with open(known_args.replay, 'r') as fp:
+            fixture = json.load(fp)
+        baseline_key = 'replay:{name}@{latency:g}ms'.format(
+            name=os.path.basename(known_args.replay),
+            latency=known_args.latency
+        )
+    dataset = Dataset(**SCALES[known_args.scale])
+    results = dict()
+    for name in known_args.scenario or list(SCENARIOS):
+        scenario, replayable = SCENARIOS[name]
+        if fixture is not None and not replayable:
+            continue
+        results[name] = dict()
+        # GOTCHA: Memory tracing slows down execution significantly, so wall time and peak memory are measured using
+        # separate runs with fresh upstreams state.
+        for trace in (False, True):
+            with Environment(dataset=dataset, latency=known_args.latency / 1000, fixture=fixture, trace=trace) as env:
+                scenario(env=env)
+            results[name].update(env.metrics)
+    try:
+        with open(BASELINES, 'r') as fp:
+            baselines = json.load(fp)
+    except FileNotFoundError:
+        baselines = dict()
+    previous = baselines.get(baseline_key, dict())
+    rows = list()
+    for name, metrics in results.items():
+        baseline = previous.get(name, dict())
+        rows.append(
+            [
+                name,
+                metrics['seconds'],
+                baseline.get('seconds', '-'),
+                metrics['pl_requests'],
+                metrics['toggl_requests'],
+                metrics['peak_mb'],
+                baseline.get('peak_mb', '-')
+            ]
+        )
+    headers = ('Scenario', 'Wall (s)', 'Baseline (s)', 'PL requests', 'Toggl requests', 'Peak (MB)', 'Baseline (MB)')
+    print(tabulate(tabular_data=rows, headers=headers, tablefmt='simple'))
+    if known_args.update_baselines:
+        baselines.setdefault(baseline_key, dict()).update(results)
+        with open(BASELINES, 'w') as fp:
+            json.dump(baselines, fp, indent=2, sort_keys=True)
+            fp.write('\n')
+        return
+    regressions = compare(results=results, baselines=previous, tolerance=known_args.tolerance)
+    if regressions:
+        sys.exit('\n'.join(['', 'regressions comparing to {key} baselines:'.format(key=baseline_key)] + regressions))
+
+
+def main():
+    known_args = parse_arguments().parse_args()
+    known_args.func(known_args=known_args)
+
+
+if __name__ == '__main__':
+    main()
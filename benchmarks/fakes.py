@@ -0,0 +1,411 @@
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from time import sleep
+from toggl2pl.models import TimeEntry
+from urllib.parse import parse_qsl, urlsplit
+import json
+import random
+import requests
+
+# Request and response fields which hold credentials or application keys, so they are not stored in fixtures
+SECRETS = ('api_token', 'app-key', 'user-key', 'user_agent', 'user_key')
+
+
+class Dataset(object):
+
+    def __init__(self, projects=500, tasks=4, entries=20000, days=5, since='2020-01-06', synced=0.5, seed=0,
+                 streamed=1000000):
+        """
+        Deterministic set of PL projects, Toggl clients, projects and time entries shared by PL and Toggl stand-ins.
+
+        :param projects: The number of PL projects (each of them corresponds to Toggl client).
+        :type projects: int
+        :param tasks: The number of tasks per PL project (each of them corresponds to Toggl project).
+        :type tasks: int
+        :param entries: The number of Toggl time entries spread over the reported days.
+        :type entries: int
+        :param days: The number of days to spread time entries over.
+        :type days: int
+        :param since: The first day of time entries in ISO 8601 (`YYYY-MM-DD`) format.
+        :type since: str
+        :param synced: The share of PL projects which already exist in Toggl as clients (the rest is created by sync).
+        :type synced: float
+        :param seed: The random generator seed to build the same dataset on every run.
+        :type seed: int
+        :param streamed: The number of synthetic time entries generated on the fly by :meth:`stream`.
+        :type streamed: int
+        """
+        generator = random.Random(seed)
+        start = date.fromisoformat(since)
+        self.dates = [(start + timedelta(days=day)).isoformat() for day in range(days)]
+        self.projects = list()
+        for i in range(projects):
+            self.projects.append(
+                {
+                    'id': i + 1,
+                    'name': 'Project {i:04d}'.format(i=i),
+                    'tasks': [
+                        {
+                            'id': (i + 1) * 1000 + j,
+                            'title': 'Task {j:02d}'.format(j=j)
+                        } for j in range(tasks)
+                    ]
+                }
+            )
+        self.clients = [
+            {'id': item['id'], 'name': item['name'], 'wid': 1} for item in self.projects[:int(projects * synced)]
+        ]
+        self.toggl_projects = [
+            {'cid': client['id'], 'name': task['title']} for client, project in zip(self.clients, self.projects)
+            for task in project['tasks']
+        ]
+        self.entries = list()
+        for i in range(entries if self.clients else 0):
+            project = self.projects[generator.randrange(len(self.clients))]
+            self.entries.append(
+                {
+                    'client': project['name'],
+                    'description': 'Work item {item}'.format(item=generator.randrange(10)),
+                    'dur': generator.randrange(60, 7200) * 1000,
+                    'id': i + 1,
+                    'project': generator.choice(project['tasks'])['title'],
+                    'start': '{date}T{hour:02d}:00:00+00:00'.format(
+                        date=self.dates[i % len(self.dates)],
+                        hour=generator.randrange(8, 20)
+                    )
+                }
+            )
+        self.entries.sort(key=lambda entry: entry['start'])
+        self.me = {'email': 'john.doe@example.com', 'id': 1}
+        self.streamed = streamed
+        self.workspace = {'id': 1, 'name': 'Workspace'}
+
+    def stream(self):
+        """
+        Generate synthetic time entries on the fly (without keeping them in memory) to benchmark aggregation of reports
+        which are too big to be served by stand-in servers.
+
+        :return: Generator of :attr:`streamed` time entries as :class:`toggl2pl.models.TimeEntry` records.
+        :rtype: generator
+        """
+        projects = self.projects[:len(self.clients)]
+        descriptions = ['Work item {item}'.format(item=item) for item in range(10)]
+        for i in range(self.streamed if projects else 0):
+            # Cheap arithmetic spreading instead of random generator keeps generation cost low comparing to aggregation
+            project = projects[i * 7919 % len(projects)]
+            yield TimeEntry._make(
+                (
+                    project['name'],
+                    project['tasks'][i % len(project['tasks'])]['title'],
+                    descriptions[i * 31 % len(descriptions)],
+                    60000 + i * 104729 % 7140000,
+                    self.dates[i % len(self.dates)],
+                    i + 1
+                )
+            )
+
+    @property
+    def until(self):
+        """
+        The last day of time entries in ISO 8601 (`YYYY-MM-DD`) format.
+        """
+        return self.dates[-1]
+
+
+class FakePL(object):
+
+    def __init__(self, dataset):
+        """
+        Project Laboratory API stand-in which serves `projects/list`, `tasks/list` and `posts/add` endpoints.
+
+        :param dataset: The dataset to serve.
+        :type dataset: :class:`Dataset`
+        """
+        self.dataset = dataset
+        self.lock = Lock()
+        self.posts = list()
+        self.tasks = {project['id']: project['tasks'] for project in dataset.projects}
+
+    def __call__(self, method, path, query, body, headers):
+        if path.endswith('/projects/list'):
+            return 200, {'projects': [{'id': item['id'], 'name': item['name']} for item in self.dataset.projects]}
+        if path.endswith('/tasks/list'):
+            return 200, {'tasks': {'data': self.tasks.get(body['project-id'], list())}}
+        if path.endswith('/posts/add'):
+            with self.lock:
+                self.posts.append(body)
+                return 200, {'post': {'id': len(self.posts)}}
+        return 404, {'error': 'unknown endpoint {path}'.format(path=path)}
+
+
+class FakeToggl(object):
+
+    # The number of time entries per page returned by Toggl Reports API
+    per_page = 50
+
+    def __init__(self, dataset):
+        """
+        Toggl API and Toggl Reports API stand-in which serves endpoints used by :class:`toggl2pl.Client`.
+
+        :param dataset: The dataset to serve.
+        :type dataset: :class:`Dataset`
+        """
+        self.clients = [dict(client) for client in dataset.clients]
+        self.dataset = dataset
+        self.lock = Lock()
+        self.projects = [dict(project) for project in dataset.toggl_projects]
+        self.starts = [entry['start'][:10] for entry in dataset.entries]
+
+    def __call__(self, method, path, query, body, headers):
+        wid = self.dataset.workspace['id']
+        if path == '/api/v8/me':
+            return 200, {'data': self.dataset.me}
+        if path == '/api/v8/workspaces':
+            return 200, [self.dataset.workspace]
+        if path == '/api/v8/workspaces/{wid}/clients'.format(wid=wid):
+            with self.lock:
+                return 200, list(self.clients)
+        if path == '/api/v8/workspaces/{wid}/projects'.format(wid=wid):
+            with self.lock:
+                return 200, list(self.projects)
+        if path == '/api/v8/clients' and method == 'POST':
+            with self.lock:
+                client = dict(body['client'], id=len(self.clients) + 100000)
+                self.clients.append(client)
+            return 200, {'data': client}
+        if path == '/api/v8/projects' and method == 'POST':
+            with self.lock:
+                self.projects.append(body['project'])
+            return 200, {'data': body['project']}
+        if path == '/reports/api/v2/details':
+            # Time entries are sorted by start time, so the requested range is found using binary search
+            first = bisect_left(self.starts, query['since'])
+            last = bisect_right(self.starts, query['until'])
+            offset = first + (int(query.get('page', 1)) - 1) * self.per_page
+            return 200, {
+                'data': self.dataset.entries[offset:min(offset + self.per_page, last)],
+                'per_page': self.per_page,
+                'total_count': last - first
+            }
+        if path == '/reports/api/v2/summary':
+            # Durations are summed per project and description the same way as Toggl groups them by time entries
+            durations = dict()
+            first, last = bisect_left(self.starts, query['since']), bisect_right(self.starts, query['until'])
+            for entry in self.dataset.entries[first:last]:
+                group = durations.setdefault((entry['client'], entry['project']), dict())
+                group[entry['description']] = group.get(entry['description'], 0) + entry['dur']
+            return 200, {
+                'data': [
+                    {
+                        'items': [
+                            {'time': duration, 'title': {'time_entry': description}}
+                            for description, duration in sorted(items.items())
+                        ],
+                        'time': sum(items.values()),
+                        'title': {'client': client, 'project': project}
+                    } for (client, project), items in sorted(durations.items())
+                ]
+            }
+        return 404, {'error': 'unknown endpoint {path}'.format(path=path)}
+
+
+class Recorder(object):
+
+    def __init__(self, target):
+        """
+        Proxy which forwards requests to the real upstream and records responses to replay them later.
+
+        :param target: The upstream root URL to forward requests to.
+        :type target: str
+        """
+        self.lock = Lock()
+        self.responses = dict()
+        self.session = requests.Session()
+        self.target = target.rstrip('/')
+
+    def __call__(self, method, path, query, body, headers):
+        response = self.session.request(
+            method=method,
+            url=self.target + path,
+            headers={key: value for key, value in headers.items() if key.lower() == 'authorization'},
+            json=body,
+            params=query
+        )
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = response.text
+        with self.lock:
+            self.responses[key(method=method, path=path, query=query, body=body)] = [
+                response.status_code,
+                redact(payload=payload)
+            ]
+        return response.status_code, payload
+
+
+class Replayer(object):
+
+    def __init__(self, responses):
+        """
+        Upstream stand-in which serves responses previously captured by :class:`Recorder`.
+
+        :param responses: Dictionary object with recorded responses by request keys.
+        :type responses: dict
+        """
+        self.responses = responses
+
+    def __call__(self, method, path, query, body, headers):
+        status, payload = self.responses.get(
+            key(method=method, path=path, query=query, body=body),
+            (404, {'error': 'request is not recorded: {method} {path}'.format(method=method, path=path)})
+        )
+        return status, payload
+
+
+class Server(object):
+
+    def __init__(self, handler, latency=0.0):
+        """
+        In-process HTTP server which dispatches requests to the handler and counts them by endpoints.
+
+        :param handler: Callable object which accepts method, path, query, body and headers and returns status and
+                        JSON serializable payload (e.g. :class:`FakePL` or :class:`FakeToggl`).
+        :type handler: callable
+        :param latency: The number of seconds to wait before every response to emulate network round trip.
+        :type latency: float
+        """
+        self.counters = Counter()
+        self.handler = handler
+        self.latency = latency
+        self.lock = Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RequestHandler)
+        self.server.app = self
+        self.server.daemon_threads = True
+        self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def dispatch(self, method, path, query, body, headers):
+        """
+        Count request, emulate latency and pass request to the handler.
+        """
+        with self.lock:
+            self.counters[path] += 1
+        if self.latency:
+            sleep(self.latency)
+        return self.handler(method, path, query, body, headers)
+
+    @property
+    def requests(self):
+        """
+        The total number of requests served.
+        """
+        with self.lock:
+            return sum(self.counters.values())
+
+    def reset(self):
+        """
+        Reset requests counters.
+        """
+        with self.lock:
+            self.counters.clear()
+
+    def start(self):
+        """
+        Start serving requests in background thread.
+
+        :return: The same instance of class object.
+        :rtype: :class:`Server`
+        """
+        self.thread = Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving requests and close listening socket.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def url(self):
+        """
+        The server root URL.
+        """
+        host, port = self.server.server_address[:2]
+        return 'http://{host}:{port}'.format(host=host, port=port)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+
+    # Keep-alive connections are required to benchmark clients connection pools, while Nagle's algorithm delays small
+    # responses sent over the same connection in two writes (headers and body)
+    disable_nagle_algorithm = True
+    protocol_version = 'HTTP/1.1'
+
+    def handle_request(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        status, payload = self.server.app.dispatch(
+            method=self.command,
+            path=url.path,
+            query=dict(parse_qsl(url.query)),
+            body=body,
+            headers=dict(self.headers)
+        )
+        content = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = handle_request
+
+    def log_message(self, format, *args):
+        pass
+
+
+def key(method, path, query, body):
+    """
+    Build stable request key without credentials to look up recorded responses.
+
+    :param method: The HTTP method.
+    :type method: str
+    :param path: The request path.
+    :type path: str
+    :param query: The request query parameters.
+    :type query: dict
+    :param body: The request JSON payload.
+    :return: The request key.
+    :rtype: str
+    """
+    def strip(items):
+        if not isinstance(items, dict):
+            return items
+        return {name: value for name, value in items.items() if name not in SECRETS}
+
+    return json.dumps([method, path, strip(query), strip(body)], sort_keys=True)
+
+
+def redact(payload):
+    """
+    Remove credentials (e.g. Toggl API token returned by `/api/v8/me`) from upstream response payload recursively.
+
+    :param payload: The decoded upstream response payload.
+    :return: Copy of the payload without :data:`SECRETS` fields.
+    """
+    if isinstance(payload, dict):
+        return {name: redact(payload=value) for name, value in payload.items() if name not in SECRETS}
+    if isinstance(payload, list):
+        return [redact(payload=value) for value in payload]
+    return payload
@@ -0,0 +1,292 @@
+from benchmarks.fakes import FakePL, FakeToggl, Replayer, Server
+from contextlib import contextmanager
+from time import perf_counter
+from toggl2pl import Aggregator, Client, TogglReportsClient
+from unittest import mock
+import tracemalloc
+
+# Rate limits high enough to measure the client itself instead of the configured Toggl and PL throttling
+LIMITS = {
+    'pl': {
+        'burst': 10000,
+        'rate': 10000
+    },
+    'toggl': {
+        'burst': 10000,
+        'rate': 10000
+    }
+}
+
+
+class Environment(object):
+
+    def __init__(self, dataset, latency=0.0, fixture=None, trace=False):
+        """
+        Benchmark environment with PL and Toggl stand-in servers started for a single scenario run.
+
+        :param dataset: The dataset to serve by fake upstreams.
+        :type dataset: :class:`benchmarks.fakes.Dataset`
+        :param latency: The number of seconds each fake upstream waits before response.
+        :type latency: float
+        :param fixture: Optional responses recorded by :class:`benchmarks.fakes.Recorder` to serve instead of dataset.
+        :type fixture: dict
+        :param trace: Optional flag to measure peak memory instead of wall time (memory tracing slows execution down).
+        :type trace: bool
+        """
+        self.dataset = dataset
+        self.fixture = fixture
+        if fixture is None:
+            self.pl = Server(handler=FakePL(dataset=dataset), latency=latency)
+            self.toggl = Server(handler=FakeToggl(dataset=dataset), latency=latency)
+        else:
+            self.pl = Server(handler=Replayer(responses=fixture['pl']), latency=latency)
+            self.toggl = Server(handler=Replayer(responses=fixture['toggl']), latency=latency)
+        self.metrics = dict()
+        self.trace = trace
+
+    def __enter__(self):
+        self.pl.start()
+        self.toggl.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.pl.stop()
+        self.toggl.stop()
+
+    @property
+    def credentials(self):
+        """
+        The keyword arguments to create :class:`toggl2pl.Client` connected to the stand-in servers.
+        """
+        meta = self.fixture['meta'] if self.fixture else dict()
+        return {
+            'api_token': 'benchmark',
+            'base_url': self.pl.url,
+            'excluded_projects': meta.get('excluded_projects'),
+            'limits': LIMITS,
+            'toggl_url': self.toggl.url,
+            'user_key': 'benchmark',
+            'workspace': meta.get('workspace', self.dataset.workspace['name'])
+        }
+
+    @property
+    def since(self):
+        return self.fixture['meta']['since'] if self.fixture else self.dataset.dates[0]
+
+    @property
+    def until(self):
+        return self.fixture['meta']['until'] if self.fixture else self.dataset.until
+
+    def client(self):
+        """
+        Create a new client connected to the stand-in servers (without persistent metadata cache).
+
+        :return: The client object.
+        :rtype: :class:`toggl2pl.Client`
+        """
+        return Client(**self.credentials)
+
+    @contextmanager
+    def measure(self):
+        """
+        Measure wall time and upstream requests (or peak memory in tracing mode) of the code executed in the context.
+        """
+        self.pl.reset()
+        self.toggl.reset()
+        if self.trace:
+            tracemalloc.start()
+            try:
+                yield
+            finally:
+                self.metrics = {'peak_mb': round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)}
+                tracemalloc.stop()
+            return
+        started = perf_counter()
+        yield
+        self.metrics = {
+            'pl_requests': self.pl.requests,
+            'seconds': round(perf_counter() - started, 3),
+            'toggl_requests': self.toggl.requests
+        }
+
+
+@contextmanager
+def service(env):
+    """
+    Configure API service application to use the stand-in servers and do not send analytics to Elasticsearch.
+
+    :param env: The benchmark environment.
+    :type env: :class:`Environment`
+    :return: Flask test client.
+    """
+    from toggl2pl.__serve__ import clients, create_app, pulls, settings
+    overrides = {
+        'base_url': env.pl.url,
+        'limits': LIMITS,
+        'toggl_url': env.toggl.url
+    }
+    with mock.patch.dict(settings, overrides), mock.patch('toggl2pl.__serve__.index'):
+        clients.entries.clear()
+        pulls.entries.clear()
+        try:
+            yield create_app().test_client()
+        finally:
+            clients.entries.clear()
+            pulls.entries.clear()
+
+
+def aggregate(env):
+    """
+    Aggregate synthetic time entries stream into posts using :class:`toggl2pl.Aggregator` (no upstream requests).
+    """
+    with env.measure():
+        Aggregator().update(entries=env.dataset.stream()).posts()
+
+
+def aggregate_nested(env):
+    """
+    Aggregate the same time entries as :func:`aggregate` scenario using nested grouping to compare with.
+    """
+    with env.measure():
+        TogglReportsClient.summarize(tasks=TogglReportsClient.group(entries=env.dataset.stream()))
+
+
+def client_init(env):
+    """
+    Create :class:`toggl2pl.Client` (list PL projects and tasks of every project, Toggl user and workspace).
+    """
+    with env.measure():
+        env.client()
+
+
+def posts(env):
+    """
+    Fetch time entries for all days using single report and aggregate them into daily posts.
+    """
+    client = env.client()
+    with env.measure():
+        client.days(since=env.since, until=env.until)
+
+
+def posts_details(env):
+    """
+    Fetch time entries for the whole period page by page and aggregate them into posts (the default report).
+    """
+    client = env.client()
+    with env.measure():
+        client.toggl.posts(since=env.since, until=env.until, wid=client.workspace['id'], report='details')
+
+
+def posts_summary(env):
+    """
+    Fetch durations already summed by Toggl summary report for the whole period and build the same posts as
+    :func:`posts_details` scenario does (dataset durations are whole seconds, so truncation does not differ).
+    """
+    client = env.client()
+    expected = client.toggl.posts(since=env.since, until=env.until, wid=client.workspace['id'], report='details')
+    with env.measure():
+        posts = client.toggl.posts(
+            since=env.since,
+            until=env.until,
+            wid=client.workspace['id'],
+            report='summary',
+            user_ids=client.me['id']
+        )
+    assert posts == expected, 'summary report posts differ from details report posts'
+
+
+def sync(env):
+    """
+    Plan and apply synchronization of PL projects and tasks into Toggl clients and projects.
+    """
+    client = env.client()
+    with env.measure():
+        client.sync()
+
+
+def pull(env):
+    """
+    Pull daily posts via `/posts/pull` API service endpoint (including cached client creation).
+    """
+    credentials = env.credentials
+    payload = {
+        'api_token': credentials['api_token'],
+        'daily': True,
+        'excluded_projects': credentials['excluded_projects'],
+        'since': env.since,
+        'until': env.until,
+        'user_key': credentials['user_key'],
+        'workspace': credentials['workspace']
+    }
+    with service(env=env) as app, env.measure():
+        response = app.get('/posts/pull', json=payload)
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+
+def push(env):
+    """
+    Push posts one by one via `/posts/push` API service endpoint (the client is created before measurement).
+    """
+    items = payloads(env=env)
+    with service(env=env) as app:
+        app.put('/posts/push', json=items[0])
+        with env.measure():
+            for item in items[1:]:
+                response = app.put('/posts/push', json=item)
+                assert response.status_code == 200, response.get_data(as_text=True)
+
+
+def push_batch(env):
+    """
+    Push the same posts as :func:`push` scenario using single `/posts/push-batch` API service request.
+    """
+    items = payloads(env=env)
+    credentials = {key: items[0][key] for key in ('api_token', 'user_key', 'workspace')}
+    with service(env=env) as app:
+        app.put('/posts/push', json=items[0])
+        with env.measure():
+            response = app.put('/posts/push-batch', json=dict(credentials, posts=items[1:]))
+            assert all(result['status'] == 200 for result in response.get_json())
+
+
+def payloads(env, count=200):
+    """
+    Build `/posts/push` request payloads for the first PL tasks of the dataset.
+
+    :param env: The benchmark environment.
+    :type env: :class:`Environment`
+    :param count: The number of payloads to build.
+    :type count: int
+    :return: List of request payloads.
+    :rtype: list
+    """
+    credentials = env.credentials
+    tasks = [(project['name'], task['title']) for project in env.dataset.projects for task in project['tasks']]
+    return [
+        {
+            'api_token': credentials['api_token'],
+            'date': env.since,
+            'description': '* Work item {i}.'.format(i=i),
+            'duration': 60,
+            'project': project,
+            'rounded': 60,
+            'task': task,
+            'user_key': credentials['user_key'],
+            'workspace': credentials['workspace']
+        } for i, (project, task) in zip(range(count), tasks * (count // max(1, len(tasks)) + 1))
+    ]
+
+
+# Scenarios in execution order and flag which shows if scenario can be executed using recorded responses
+SCENARIOS = {
+    'aggregate': (aggregate, False),
+    'aggregate_nested': (aggregate_nested, False),
+    'client_init': (client_init, True),
+    'posts': (posts, True),
+    'posts_details': (posts_details, True),
+    'posts_summary': (posts_summary, False),
+    'pull': (pull, True),
+    'push': (push, False),
+    'push_batch': (push_batch, False),
+    'sync': (sync, False)
+}
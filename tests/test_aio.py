@@ -0,0 +1,222 @@
+from toggl2pl import RateLimiter, TogglReportsClient, UpstreamConnectionError, UpstreamError
+from toggl2pl.aio import AsyncClient, AsyncPL, AsyncTogglReportsClient, send
+from unittest import mock
+from urllib.parse import urlsplit
+import aiohttp
+import asyncio
+import json
+import unittest
+
+
+class FakeResponse(object):
+
+    def __init__(self, status, payload, headers=None):
+        self.headers = headers or dict()
+        self.payload = payload
+        self.status = status
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def read(self):
+        return json.dumps(self.payload).encode('utf-8')
+
+
+class FakeSession(object):
+
+    def __init__(self, responses):
+        self.calls = list()
+        self.closed = False
+        self.responses = responses
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        if callable(self.responses):
+            response = self.responses(method, urlsplit(url).path, kwargs.get('params') or dict())
+        else:
+            response = self.responses.pop(0)
+        if isinstance(response, BaseException):
+            raise response
+        return response
+
+    async def close(self):
+        self.closed = True
+
+
+async def immediately(delay):
+    pass
+
+
+class TestAsyncTogglReportsClient(unittest.TestCase):
+
+    entries = [
+        {'client': 'C', 'project': 'P', 'description': 'b', 'dur': 299500, 'start': '2020-01-01T10:00:00+00:00'},
+        {'client': 'C', 'project': 'P', 'description': 'a', 'dur': 600900, 'start': '2020-01-01T11:00:00+00:00'},
+        {'client': 'C', 'project': 'Q', 'description': 'c', 'dur': 120400, 'start': '2020-01-02T10:00:00+00:00'},
+        {'client': 'C', 'project': 'P', 'description': 'a', 'dur': 600700, 'start': '2020-01-02T11:00:00+00:00'},
+        {'client': 'C', 'project': 'P', 'description': 'b', 'dur': 1500, 'start': '2020-01-03T09:00:00+00:00'}
+    ]
+
+    per_page = 2
+
+    def report(self, endpoint, **kwargs):
+        if endpoint == 'summary':
+            durations = dict()
+            for entry in self.entries:
+                group = durations.setdefault((entry['client'], entry['project']), dict())
+                group[entry['description']] = group.get(entry['description'], 0) + entry['dur']
+            return {
+                'data': [
+                    {
+                        'items': [{'time': time, 'title': {'time_entry': title}} for title, time in items.items()],
+                        'title': {'client': client, 'project': project}
+                    } for (client, project), items in durations.items()
+                ]
+            }
+        offset = (int(kwargs['page']) - 1) * self.per_page
+        return {
+            'data': self.entries[offset:offset + self.per_page],
+            'per_page': self.per_page,
+            'total_count': len(self.entries)
+        }
+
+    def respond(self, method, path, params):
+        return FakeResponse(status=200, payload=self.report(endpoint=path.rsplit('/', 1)[-1], **params))
+
+    def run_async(self, method, **kwargs):
+        async def run():
+            session = FakeSession(responses=self.respond)
+            toggl = AsyncTogglReportsClient(api_token='token', user_agent='agent', session=session)
+            result = getattr(toggl, method)(since='2020-01-01', until='2020-01-03', wid=1, user_ids=1, **kwargs)
+            if method == 'stream':
+                return [day async for day in result], session
+            return await result, session
+
+        return asyncio.run(run())
+
+    def run_sync(self, method, **kwargs):
+        toggl = TogglReportsClient(api_token='token', user_agent='agent')
+        toggl.get = mock.Mock(side_effect=self.report)
+        result = getattr(toggl, method)(since='2020-01-01', until='2020-01-03', wid=1, user_ids=1, **kwargs)
+        return list(result) if method == 'stream' else result
+
+    def test_posts_match_sync_client(self):
+        posts, session = self.run_async(method='posts')
+        self.assertEqual(self.run_sync(method='posts'), posts)
+        pages = sorted(int(kwargs['params']['page']) for method, url, kwargs in session.calls)
+        self.assertEqual([1, 2, 3], pages)
+        summary, session = self.run_async(method='posts', report='summary')
+        self.assertEqual(self.run_sync(method='posts', report='summary'), summary)
+        self.assertEqual(1, len(session.calls))
+
+    def test_days_and_stream_match_sync_client(self):
+        days, session = self.run_async(method='days')
+        self.assertEqual(self.run_sync(method='days'), days)
+        self.assertEqual(['2020-01-01', '2020-01-02', '2020-01-03'], [date for date, posts in days])
+        streamed, session = self.run_async(method='stream')
+        self.assertEqual(self.run_sync(method='stream'), streamed)
+        self.assertEqual('date', session.calls[0][2]['params']['order_field'])
+
+    def test_session_closed_only_when_owned(self):
+        async def run():
+            owned = FakeSession(responses=[FakeResponse(status=200, payload={'data': {'id': 1}})])
+            with mock.patch('toggl2pl.aio.aiohttp.ClientSession', return_value=owned):
+                toggl = AsyncTogglReportsClient(api_token='token', user_agent='agent')
+                self.assertEqual({'id': 1}, await toggl.me())
+            await toggl.close()
+            self.assertTrue(owned.closed)
+            self.assertIsNone(toggl.session)
+            shared = FakeSession(responses=[])
+            pl = AsyncPL(app_key='app', base_url='http://localhost', user_key='key', session=shared)
+            await pl.close()
+            self.assertFalse(shared.closed)
+
+        asyncio.run(run())
+
+
+class TestAsyncClient(unittest.TestCase):
+
+    def test_close_releases_sessions(self):
+        async def run():
+            client = AsyncClient(api_token='token', base_url='http://localhost', user_key='key', workspace='W')
+            session = FakeSession(responses=[])
+            with mock.patch('toggl2pl.aio.aiohttp.ClientSession', return_value=session), \
+                    mock.patch('toggl2pl.aio.aiohttp.TCPConnector'), \
+                    mock.patch.object(AsyncClient, 'refresh', side_effect=UpstreamError('503', status_code=503)):
+                with self.assertRaises(UpstreamError):
+                    await client.open()
+            self.assertTrue(session.closed)
+            self.assertIsNone(client.session)
+
+        asyncio.run(run())
+
+
+class TestAsyncSend(unittest.TestCase):
+
+    def setUp(self):
+        self.sleep = mock.patch('toggl2pl.aio.asyncio.sleep', side_effect=immediately)
+        self.sleep.start()
+        self.limiter = RateLimiter(rate=1000, burst=10)
+
+    def tearDown(self):
+        self.sleep.stop()
+
+    def send(self, responses, method='GET', idempotent=True):
+        session = FakeSession(responses=responses)
+        result = asyncio.run(
+            send(
+                session=session,
+                method=method,
+                url='http://localhost/me',
+                limiter=self.limiter,
+                idempotent=idempotent,
+                retries=2
+            )
+        )
+        return result, session
+
+    def test_send_retries_idempotent_errors(self):
+        (status, content), session = self.send(
+            responses=[
+                asyncio.TimeoutError(),
+                FakeResponse(status=502, payload={}),
+                FakeResponse(status=200, payload={'id': 1})
+            ]
+        )
+        self.assertEqual((200, b'{"id": 1}'), (status, content))
+        self.assertEqual(3, len(session.calls))
+
+    def test_send_respects_retry_after(self):
+        (status, content), session = self.send(
+            responses=[
+                FakeResponse(status=429, payload={}, headers={'Retry-After': '3'}),
+                FakeResponse(status=200, payload={})
+            ],
+            method='POST',
+            idempotent=False
+        )
+        self.assertEqual(200, status)
+        self.assertGreater(self.limiter.blocked, 0)
+        self.assertLess(self.limiter.rate, self.limiter.max_rate)
+
+    def test_send_does_not_repeat_non_idempotent_requests(self):
+        (status, content), session = self.send(responses=[FakeResponse(status=502, payload={})], idempotent=False)
+        self.assertEqual(502, status)
+        self.assertEqual(1, len(session.calls))
+        with self.assertRaises(UpstreamConnectionError):
+            self.send(responses=[asyncio.TimeoutError()], method='POST', idempotent=False)
+        refused = aiohttp.ClientConnectorError(connection_key=mock.Mock(), os_error=OSError(111, 'refused'))
+        (status, content), session = self.send(
+            responses=[refused, FakeResponse(status=200, payload={})],
+            method='POST',
+            idempotent=False
+        )
+        self.assertEqual(200, status)
+        self.assertEqual(2, len(session.calls))
+
+
+if __name__ == '__main__':
+    unittest.main()
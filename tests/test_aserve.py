@@ -0,0 +1,144 @@
+from aiohttp import ClientSession
+from aiohttp.test_utils import AioHTTPTestCase
+from toggl2pl import UpstreamError
+from toggl2pl.__aserve__ import clients, create_app, pulls
+from unittest import mock
+import gzip
+import json
+import unittest
+
+
+class FakeAsyncClient(object):
+
+    def __init__(self, **kwargs):
+        self.me = {'email': 'john.doe@example.com'}
+        self.projects = {
+            'Project': {
+                'id': 1,
+                'tasks': {
+                    'Task': {
+                        'id': 2
+                    }
+                }
+            }
+        }
+
+    async def add_post(self, date, description, minutes, project, task):
+        if project == 'Down':
+            raise UpstreamError('503: unavailable', status_code=503)
+        return {
+            'project_id': self.projects[project]['id'],
+            'task_id': self.projects[project]['tasks'][task]['id']
+        }
+
+    async def close(self):
+        pass
+
+    @classmethod
+    async def create(cls, **kwargs):
+        return cls(**kwargs)
+
+    async def days(self, since, until):
+        return [('2020-01-01', [['Project', 'Task', '* Work.', 12, 10]])]
+
+    async def posts(self, since, until):
+        return [['Project', 'Task', '* Work.', 12, 10]]
+
+    async def refresh(self):
+        pass
+
+    async def stream(self, since, until):
+        yield '2020-01-01', [['Project', 'Task', '* Work.', 12, 10]]
+        yield '2020-01-02', [['Project', 'Task', '* Fix.', 6, 5]]
+
+
+class TestAsyncServe(AioHTTPTestCase):
+
+    credentials = {
+        'api_token': 'token',
+        'user_key': 'key',
+        'workspace': 'Workspace'
+    }
+
+    async def get_application(self):
+        return create_app()
+
+    def setUp(self):
+        self.patches = [
+            mock.patch.object(clients, 'factory', FakeAsyncClient.create),
+            mock.patch('toggl2pl.__aserve__.index')
+        ]
+        for patch in self.patches:
+            patch.start()
+        clients.entries.clear()
+        pulls.entries.clear()
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        for patch in self.patches:
+            patch.stop()
+
+    async def test_pull(self):
+        payload = dict(self.credentials, excluded_projects=[], since='2020-01-01', until='2020-01-01')
+        response = await self.client.request('GET', '/posts/pull', json=payload)
+        self.assertEqual(200, response.status)
+        self.assertEqual([['Project', 'Task', '* Work.', 12, 10]], await response.json())
+        response = await self.client.request('GET', '/posts/pull', json=dict(payload, daily=True))
+        self.assertEqual([['2020-01-01', [['Project', 'Task', '* Work.', 12, 10]]]], await response.json())
+        self.assertEqual(1, clients.stats()['misses'])
+
+    async def test_pull_ndjson_stream(self):
+        payload = dict(self.credentials, daily=True, excluded_projects=[], since='2020-01-01', until='2020-01-02')
+        headers = {'Accept': 'application/x-ndjson', 'Accept-Encoding': 'gzip'}
+        # NOTE: Decompression can not be disabled per request in aiohttp 3.8, so raw body is read by separate session
+        async with ClientSession(auto_decompress=False) as session:
+            async with session.get(self.client.make_url('/posts/pull'), json=payload, headers=headers) as response:
+                self.assertEqual(200, response.status)
+                self.assertEqual('gzip', response.headers['Content-Encoding'])
+                streamed = [json.loads(line) for line in gzip.decompress(await response.read()).splitlines()]
+        self.assertEqual(['2020-01-01', '2020-01-02'], [date for date, post in streamed])
+        self.assertEqual(['Project', 'Task', '* Work.', 12, 10], streamed[0][1])
+        response = await self.client.request('GET', '/posts/pull', json=payload, headers=headers)
+        etag = response.headers['ETag']
+        self.assertEqual(streamed, [json.loads(line) for line in (await response.read()).splitlines()])
+        headers['If-None-Match'] = etag
+        response = await self.client.request('GET', '/posts/pull', json=payload, headers=headers)
+        self.assertEqual(304, response.status)
+
+    async def test_push(self):
+        post = {'date': '2020-01-01', 'description': '* Work.', 'duration': 12, 'rounded': 10, 'task': 'Task'}
+        response = await self.client.put('/posts/push', json=dict(self.credentials, project='Project', **post))
+        self.assertEqual(200, response.status)
+        self.assertEqual({'project_id': 1, 'task_id': 2}, await response.json())
+        response = await self.client.put('/posts/push', json=dict(self.credentials, project='Unknown', **post))
+        self.assertEqual(404, response.status)
+        self.assertEqual('Unknown', (await response.json())['missing'])
+        response = await self.client.put('/posts/push', json=dict(self.credentials, project='Down', **post))
+        self.assertEqual(502, response.status)
+        self.assertEqual(503, (await response.json())['status_code'])
+
+    async def test_push_malformed(self):
+        post = {'date': '2020-01-01', 'duration': 12, 'project': 'Project', 'rounded': 10, 'task': 'Task'}
+        response = await self.client.put('/posts/push', json=dict(self.credentials, **post))
+        self.assertEqual(400, response.status)
+        self.assertEqual(['description'], (await response.json())['fields'])
+        self.assertEqual(0, len(clients.entries))
+
+    async def test_push_batch(self):
+        posts = [
+            {'description': '* Work.', 'duration': 12, 'project': 'Project', 'rounded': 10, 'task': 'Task'},
+            {'description': '* Work.', 'duration': 12, 'project': 'Project', 'rounded': 10, 'task': 'Unknown'},
+            {'description': '* Work.', 'duration': 12, 'project': 'Down', 'rounded': 10, 'task': 'Task'},
+            {'description': '* Work.', 'duration': 12, 'project': 'Project', 'task': 'Task'}
+        ]
+        payload = dict(self.credentials, date='2020-01-01', posts=posts)
+        response = await self.client.put('/posts/push-batch', json=payload)
+        self.assertEqual(200, response.status)
+        self.assertEqual([200, 404, 502, 400], [result['status'] for result in await response.json()])
+        response = await self.client.get('/metrics')
+        self.assertIn('route="/posts/push-batch",method="PUT",status="200"', await response.text())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+from benchmarks.fakes import Dataset, FakePL, FakeToggl, Recorder, Replayer, Server
+from benchmarks.scenarios import LIMITS, SCENARIOS, Environment
+from toggl2pl import Client
+import json
+import requests
+import unittest
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def setUp(self):
+        self.dataset = Dataset(projects=6, tasks=2, entries=120, days=2, streamed=1000)
+
+    def test_scenarios(self):
+        for name, (scenario, replayable) in SCENARIOS.items():
+            with Environment(dataset=self.dataset) as env:
+                scenario(env=env)
+            self.assertEqual({'pl_requests', 'seconds', 'toggl_requests'}, set(env.metrics), name)
+        with Environment(dataset=self.dataset) as env:
+            SCENARIOS['client_init'][0](env=env)
+        self.assertEqual(7, env.metrics['pl_requests'])
+        self.assertEqual(2, env.metrics['toggl_requests'])
+
+    def test_record_replay(self):
+        results = list()
+        pl, toggl = Server(handler=FakePL(dataset=self.dataset)), Server(handler=FakeToggl(dataset=self.dataset))
+        with pl, toggl:
+            recorders = (Recorder(target=pl.url), Recorder(target=toggl.url))
+            with Server(handler=recorders[0]) as pl_proxy, Server(handler=recorders[1]) as toggl_proxy:
+                client = Client(
+                    api_token='token',
+                    base_url=pl_proxy.url,
+                    limits=LIMITS,
+                    toggl_url=toggl_proxy.url,
+                    user_key='key',
+                    workspace='Workspace'
+                )
+                results.append(client.days(since=self.dataset.dates[0], until=self.dataset.until))
+        replayers = (Replayer(responses=recorders[0].responses), Replayer(responses=recorders[1].responses))
+        with Server(handler=replayers[0]) as pl, Server(handler=replayers[1]) as toggl:
+            client = Client(
+                api_token='other',
+                base_url=pl.url,
+                limits=LIMITS,
+                toggl_url=toggl.url,
+                user_key='other',
+                workspace='Workspace'
+            )
+            results.append(client.days(since=self.dataset.dates[0], until=self.dataset.until))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(2, len(results[0]))
+
+    def test_record_redacts_secrets(self):
+        toggl = FakeToggl(dataset=self.dataset)
+        self.dataset.me['api_token'] = 'secret'
+        with Server(handler=toggl) as upstream:
+            recorder = Recorder(target=upstream.url)
+            with Server(handler=recorder) as proxy:
+                self.assertEqual('secret', requests.get(proxy.url + '/api/v8/me').json()['data']['api_token'])
+        (status, payload), = recorder.responses.values()
+        self.assertEqual({'data': {'email': 'john.doe@example.com', 'id': 1}}, payload)
+        self.assertNotIn('secret', json.dumps(recorder.responses))
+
+
+if __name__ == '__main__':
+    unittest.main()
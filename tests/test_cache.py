@@ -0,0 +1,184 @@
+from toggl2pl.aio import AsyncClientCache
+from toggl2pl.cache import ClientCache, MetadataCache, ResponseCache
+import asyncio
+import os
+import tempfile
+import threading
+from unittest import mock
+import unittest
+
+
+class FakeClient(object):
+
+    def __init__(self, api_token):
+        self.api_token = api_token
+        self.refreshed = 0
+
+    def refresh(self):
+        self.refreshed += 1
+
+
+class TestClientCache(unittest.TestCase):
+
+    def test_get_reuses_client(self):
+        cache = ClientCache(factory=FakeClient)
+        self.assertIs(cache.get(api_token='a'), cache.get(api_token='a'))
+        self.assertIsNot(cache.get(api_token='a'), cache.get(api_token='b'))
+
+    def test_get_evicts_least_recently_used(self):
+        cache = ClientCache(factory=FakeClient, maxsize=2)
+        first = cache.get(api_token='a')
+        cache.get(api_token='b')
+        cache.get(api_token='a')
+        cache.get(api_token='c')
+        self.assertIs(first, cache.get(api_token='a'))
+        self.assertEqual(2, len(cache.entries))
+
+    def test_get_creates_single_client_concurrently(self):
+        created = list()
+        release = threading.Event()
+
+        def factory(api_token):
+            release.wait(timeout=1)
+            created.append(FakeClient(api_token=api_token))
+            return created[-1]
+
+        cache = ClientCache(factory=factory)
+        clients = list()
+        threads = [threading.Thread(target=lambda: clients.append(cache.get(api_token='a'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(timeout=1)
+        self.assertEqual(1, len(created))
+        self.assertEqual([created[0]] * 8, clients)
+        self.assertEqual({}, cache.pending)
+
+    def test_get_releases_pending_on_failure(self):
+        cache = ClientCache(factory=mock.Mock(side_effect=[ConnectionError('unavailable'), 'client']))
+        with self.assertRaises(ConnectionError):
+            cache.get(api_token='a')
+        self.assertEqual({}, cache.pending)
+        self.assertEqual('client', cache.get(api_token='a'))
+
+    def test_invalidate(self):
+        cache = ClientCache(factory=FakeClient)
+        first = cache.get(api_token='a')
+        self.assertTrue(cache.invalidate(api_token='a'))
+        self.assertFalse(cache.invalidate(api_token='a'))
+        self.assertIsNot(first, cache.get(api_token='a'))
+
+    def test_stale_client_refreshed(self):
+        cache = ClientCache(factory=FakeClient, ttl=-1)
+        client = cache.get(api_token='a')
+        threads = set(threading.enumerate())
+        cache.get(api_token='a')
+        for thread in set(threading.enumerate()) - threads:
+            thread.join(timeout=1)
+        self.assertEqual(1, client.refreshed)
+
+
+class TestAsyncClientCache(unittest.TestCase):
+
+    def test_get_creates_single_client_concurrently(self):
+        created = list()
+
+        async def factory(api_token):
+            await asyncio.sleep(0.01)
+            created.append(FakeClient(api_token=api_token))
+            return created[-1]
+
+        async def run():
+            cache = AsyncClientCache(factory=factory)
+            first = await asyncio.gather(*(cache.get(api_token='a') for _ in range(8)))
+            self.assertEqual({}, cache.pending)
+            return first + [await cache.get(api_token='a')]
+
+        clients = asyncio.run(run())
+        self.assertEqual(1, len(created))
+        self.assertEqual([created[0]] * 9, clients)
+
+
+class TestMetadataCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cache.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_fetch_persists_between_instances(self):
+        loader = mock.Mock(return_value={'id': 1})
+        self.assertEqual({'id': 1}, MetadataCache(path=self.path, namespace='a').fetch(name='me', loader=loader))
+        self.assertEqual({'id': 1}, MetadataCache(path=self.path, namespace='a').fetch(name='me', loader=loader))
+        self.assertEqual(1, loader.call_count)
+        MetadataCache(path=self.path, namespace='b').fetch(name='me', loader=loader)
+        self.assertEqual(2, loader.call_count)
+
+    def test_fetch_refresh_and_ttl(self):
+        loader = mock.Mock(return_value=[1])
+        MetadataCache(path=self.path, namespace='a').fetch(name='projects', loader=loader)
+        cache = MetadataCache(path=self.path, namespace='a', refresh=True)
+        cache.fetch(name='projects', loader=loader)
+        cache.fetch(name='projects', loader=loader)
+        self.assertEqual(2, loader.call_count)
+        MetadataCache(path=self.path, namespace='a', ttl=0).fetch(name='projects', loader=loader)
+        self.assertEqual(3, loader.call_count)
+
+    def test_invalidate(self):
+        loader = mock.Mock(return_value=[1])
+        cache = MetadataCache(path=self.path, namespace='a')
+        cache.fetch(name='clients', loader=loader)
+        cache.invalidate('clients')
+        cache.fetch(name='clients', loader=loader)
+        self.assertEqual(2, loader.call_count)
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_put_and_get(self):
+        cache = ResponseCache()
+        entry = cache.put(key='k', scope='s', since='2020-01-01', until='2020-01-07', content=b'[]')
+        self.assertIs(entry, cache.get(key='k'))
+        other = ResponseCache().put(key='x', scope='t', since='2020-01-01', until='2020-01-01', content=b'[]')
+        self.assertEqual(entry['etag'], other['etag'])
+        self.assertIsNone(cache.get(key='other'))
+        self.assertEqual({'evictions': 0, 'hits': 1, 'invalidations': 0, 'misses': 1}, cache.counters)
+
+    def test_invalidate_by_date(self):
+        cache = ResponseCache()
+        cache.put(key='a', scope='s', since='2020-01-01', until='2020-01-07', content=b'1')
+        cache.put(key='b', scope='s', since='2020-01-08', until='2020-01-14', content=b'2')
+        cache.put(key='c', scope='t', since='2020-01-01', until='2020-01-07', content=b'3')
+        self.assertEqual(1, cache.invalidate(scope='s', date='2020-01-03'))
+        self.assertIsNone(cache.get(key='a'))
+        self.assertIsNotNone(cache.get(key='b'))
+        self.assertIsNotNone(cache.get(key='c'))
+
+    def test_put_keeps_unchanged_variants(self):
+        cache = ResponseCache(ttl=0)
+        entry = cache.put(key='a', scope='s', since='2020-01-01', until='2020-01-01', content=b'1', ttl=60)
+        entry['variants'] = {'': b'1', '-gzip': b'compressed'}
+        self.assertIs(entry, cache.get(key='a'))
+        refreshed = cache.put(key='a', scope='s', since='2020-01-01', until='2020-01-01', content=b'1', ttl=60)
+        self.assertIs(entry['variants'], refreshed['variants'])
+        changed = cache.put(key='a', scope='s', since='2020-01-01', until='2020-01-01', content=b'2', ttl=60)
+        self.assertNotIn('variants', changed)
+        self.assertIs(changed, cache.peek(key='a'))
+        self.assertEqual(0, cache.counters['misses'])
+
+    def test_put_skips_invalidated_generation(self):
+        cache = ResponseCache()
+        generation = cache.generation(scope='s')
+        cache.invalidate(scope='s')
+        cache.put(key='a', scope='s', since='2020-01-01', until='2020-01-07', content=b'1', generation=generation)
+        self.assertIsNone(cache.get(key='a'))
+        cache = ResponseCache(ttl=0)
+        cache.put(key='a', scope='s', since='2020-01-01', until='2020-01-07', content=b'1')
+        self.assertIsNone(cache.get(key='a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+from datetime import datetime
+from toggl2pl.indexer import Indexer
+import os
+import tempfile
+from unittest import mock
+import unittest
+
+
+class TestIndexer(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.indexer = Indexer(
+            hosts=['http://localhost:9200'],
+            batch_size=2,
+            flush_interval=0.05,
+            maxsize=4,
+            spill_path=os.path.join(self.directory.name, 'spill.jsonl')
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_put_batches_documents(self):
+        batches = list()
+        self.indexer.flush_interval = 60
+        with mock.patch.object(self.indexer, 'bulk', side_effect=lambda documents: batches.append(documents) or 2):
+            for i in range(3):
+                self.assertTrue(self.indexer.put(document={'i': i}))
+            self.indexer.close(timeout=1)
+        self.assertEqual([[{'i': 0}, {'i': 1}], [{'i': 2}]], batches)
+        self.assertEqual(0, self.indexer.stats()['queued'])
+
+    def test_bulk_sends_typed_actions(self):
+        actions = list()
+        elasticsearch = mock.Mock()
+        elasticsearch.helpers.bulk.side_effect = lambda **kwargs: (
+            actions.extend(kwargs['actions']) or len(actions),
+            []
+        )
+        with mock.patch.dict('sys.modules', {'elasticsearch': elasticsearch}):
+            self.assertEqual(1, self.indexer.bulk(documents=[{'i': 0}]))
+        self.assertEqual([{'_index': 'toggl', '_source': {'i': 0}, '_type': 'toggl'}], actions)
+
+    def test_put_drops_documents_when_queue_is_full(self):
+        with mock.patch.object(self.indexer, 'start'):
+            results = [self.indexer.put(document={'i': i}) for i in range(6)]
+        self.assertEqual([True] * 4 + [False] * 2, results)
+        self.assertEqual(2, self.indexer.stats()['dropped'])
+        self.assertEqual(4, self.indexer.stats()['queued'])
+
+    def test_flush_spills_and_replays_documents(self):
+        documents = [{'timestamp': datetime(2020, 1, 1)}, {'timestamp': datetime(2020, 1, 2)}]
+        with mock.patch.object(self.indexer, 'bulk', side_effect=ConnectionError('unavailable')):
+            self.indexer.flush(documents=documents)
+        self.assertEqual(2, self.indexer.stats()['spilled'])
+        self.assertTrue(os.path.exists(self.indexer.spill_path))
+        batches = list()
+        with mock.patch.object(self.indexer, 'bulk', side_effect=lambda documents: batches.append(documents) or 1):
+            self.indexer.flush(documents=[{'i': 0}])
+        self.assertEqual([{'i': 0}], batches[0])
+        self.assertEqual('2020-01-01T00:00:00', batches[1][0]['timestamp'])
+        self.assertFalse(os.path.exists(self.indexer.spill_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
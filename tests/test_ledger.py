@@ -0,0 +1,53 @@
+from toggl2pl.__main__ import parse_arguments
+from toggl2pl.ledger import Ledger
+import os
+import tempfile
+import unittest
+
+
+class TestLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'ledger.sqlite3')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_pending_skips_published_posts(self):
+        items = [
+            ('2020-01-01', ['P', 'T', '* Work.', 12, 10]),
+            ('2020-01-01', ['P', 'T', '* Fix.', 6, 5]),
+            ('2020-01-02', ['P', 'T', '* Work.', 12, 10])
+        ]
+        ledger = Ledger(path=self.path, namespace='a')
+        ledger.record(date=items[0][0], post=items[0][1], minutes=10, response={'post': {'id': 1}})
+        ledger.close()
+        ledger = Ledger(path=self.path, namespace='a')
+        self.assertEqual(items[1:], list(ledger.pending(items=items)))
+        self.assertEqual(1, ledger.skipped)
+        self.assertEqual(items, list(Ledger(path=self.path, namespace='b').pending(items=items)))
+
+    def test_posts(self):
+        ledger = Ledger(path=self.path, namespace='a')
+        ledger.record(date='2020-01-02', post=['P', 'T', '* Fix.', 6, 5], minutes=5)
+        ledger.record(date='2020-01-01', post=['P', 'T', '* Work.', 12, 10], minutes=10, response={'id': 1})
+        ledger.record(date='2020-01-01', post=['P', 'T', '* Work.', 14, 15], minutes=15)
+        posts = ledger.posts(since='2020-01-01')
+        self.assertEqual(1, len(posts))
+        self.assertEqual({'id': 1}, posts[0]['response'])
+        self.assertEqual(10, posts[0]['minutes'])
+        posts = ledger.posts(since='2020-01-01', until='2020-01-03')
+        self.assertEqual(['2020-01-01', '2020-01-02'], [post['date'] for post in posts])
+
+    def test_ledger_command_arguments(self):
+        known_args, _ = parse_arguments().parse_known_args(['ledger', '-d', '2020-01-01'])
+        self.assertEqual('2020-01-01', known_args.date)
+        self.assertEqual('history', known_args.func.__name__)
+        known_args, _ = parse_arguments().parse_known_args(['ledger'])
+        self.assertIsNotNone(known_args.date)
+        self.assertIsNone(known_args.since)
+
+
+if __name__ == '__main__':
+    unittest.main()
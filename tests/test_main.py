@@ -1,5 +1,22 @@
+from email.utils import formatdate
+from time import time
+from toggl2pl import (
+    Aggregator, Client, PL, RateLimiter, ServiceClient, TogglReportsClient, Transport, UpstreamConnectionError,
+    UpstreamError, retry_delay
+)
+from toggl2pl import metrics
+from toggl2pl.__main__ import publish
+from toggl2pl.cache import MetadataCache
+from toggl2pl.models import PLProject, PLTask, Post, TimeEntry
+from unittest import mock
+import io
+import json
+import os
+import random
+import requests
+import tempfile
 import unittest
-from toggl2pl import Client
+import urllib3
 
 
 class TestCLI(unittest.TestCase):
@@ -19,6 +36,355 @@ class TestCLI(unittest.TestCase):
         result = Client.check_workspace(workspace=workspace)
         self.assertEqual(workspace, result)
 
+    def test_plan_uses_snapshot(self):
+        client = Client.__new__(Client)
+        client.cache = mock.Mock()
+        client.cache.fetch.side_effect = lambda name, loader: {'clients': {'A': {'id': 1}}, 'projects': [[1, ['a']]]}
+        client.projects = {'A': PLProject(id=1, name='A', tasks={'a': PLTask(id=1, title='a')})}
+        client.toggl = mock.Mock()
+        client.workspace = {'id': 1}
+        self.assertEqual({'clients': [], 'projects': []}, client.plan())
+        client.toggl.clients.assert_not_called()
+        client.projects = {
+            'A': PLProject(id=1, name='A', tasks={'a': PLTask(id=1, title='a'), 'b': PLTask(id=2, title='b')}),
+            'B': PLProject(id=2, name='B', tasks={'c': PLTask(id=3, title='c')})
+        }
+        client.cache.fetch.side_effect = lambda name, loader: loader() if client.cache.invalidate.called else {
+            'clients': {'A': {'id': 1}},
+            'projects': [[1, ['a']]]
+        }
+        client.toggl.clients.return_value = {'A': {'id': 1}}
+        client.toggl.projects.return_value = {1: ['a', 'b']}
+        self.assertEqual({'clients': ['B'], 'projects': [['B', 'c']]}, client.plan())
+        client.cache.invalidate.assert_called_once_with('toggl.snapshot')
+
+
+class TestPL(unittest.TestCase):
+
+    def test_projects_order(self):
+        pl = PL(app_key='app', base_url='http://pl.test', user_key='user', max_workers=4)
+        names = ['project-{}'.format(i) for i in range(20)]
+        pl.list_projects = mock.Mock(return_value={'projects': [{'id': i, 'name': n} for i, n in enumerate(names)]})
+        pl.list_tasks = mock.Mock(
+            side_effect=lambda project_id: {'tasks': {'data': [{'id': project_id, 'title': 'task'}]}}
+        )
+        projects = pl.projects(excluded_projects=['project-3'])
+        self.assertEqual([n for n in names if n != 'project-3'], list(projects))
+        expected = PLProject(id=7, name='project-7', tasks={'task': PLTask(id=7, title='task')})
+        self.assertEqual(expected, projects['project-7'])
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_reserve_burst(self):
+        limiter = RateLimiter(rate=10, burst=2)
+        self.assertEqual(0, limiter.reserve())
+        self.assertEqual(0, limiter.reserve())
+        self.assertAlmostEqual(0.1, limiter.reserve(), places=2)
+        self.assertAlmostEqual(0.2, limiter.reserve(), places=2)
+
+    def test_backoff_and_recover(self):
+        limiter = RateLimiter(rate=16, burst=1)
+        limiter.backoff(delay=2)
+        self.assertEqual(8, limiter.rate)
+        self.assertGreater(limiter.reserve(), 1.9)
+        limiter.recover()
+        self.assertEqual(9, limiter.rate)
+
+    def test_shared(self):
+        limiter = RateLimiter.shared(key=('test', 'a'), rate=4)
+        self.assertIs(limiter, RateLimiter.shared(key=('test', 'a'), rate=2, burst=3))
+        self.assertEqual((2, 2, 3), (limiter.max_rate, limiter.rate, limiter.burst))
+        self.assertIsNot(limiter, RateLimiter.shared(key=('test', 'b'), rate=1))
+        self.assertIs(limiter, RateLimiter.lookup(key=('test', 'a')))
+        self.assertNotIn(('test', 'a'), RateLimiter.limiters)
+        del limiter
+        self.assertIsNone(RateLimiter.lookup(key=('test', 'a')))
+
+    def test_retry_delay(self):
+        self.assertIsNone(retry_delay(status_code=400, headers={}, attempt=0))
+        self.assertEqual(3, retry_delay(status_code=429, headers={'Retry-After': '3'}, attempt=0, idempotent=False))
+        self.assertEqual(2, retry_delay(status_code=502, headers={}, attempt=2))
+        self.assertIsNone(retry_delay(status_code=502, headers={}, attempt=0, idempotent=False))
+        self.assertEqual(60, retry_delay(status_code=429, headers={'Retry-After': '86400'}, attempt=0))
+        self.assertEqual(5, retry_delay(status_code=429, headers={'Retry-After': 'inf'}, attempt=0, max_delay=5))
+        self.assertEqual(1, retry_delay(status_code=429, headers={'Retry-After': 'soon'}, attempt=1))
+        self.assertEqual(0, retry_delay(status_code=429, headers={'Retry-After': '-5'}, attempt=0))
+        self.assertEqual(
+            0,
+            retry_delay(status_code=503, headers={'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}, attempt=0)
+        )
+        retry_after = formatdate(timeval=time() + 30, usegmt=True)
+        self.assertAlmostEqual(
+            30,
+            retry_delay(status_code=503, headers={'Retry-After': retry_after}, attempt=0),
+            delta=2
+        )
+
+
+class TestTogglReportsClient(unittest.TestCase):
+
+    def test_aggregator_matches_nested_grouping(self):
+        generator = random.Random(0)
+        entries = [
+            TimeEntry(
+                client=generator.choice('ABC'),
+                project=generator.choice('PQ'),
+                description=generator.choice(['fix', 'review', 'a very long description ' * 5]),
+                dur=generator.randrange(1, 7200000),
+                date='2020-01-0{day}'.format(day=generator.randrange(1, 4)),
+                id=None
+            ) for _ in range(500)
+        ]
+        expected = TogglReportsClient.summarize(tasks=TogglReportsClient.group(entries=entries))
+        self.assertEqual(expected, Aggregator().update(entries=iter(entries)).posts())
+        days = Aggregator(daily=True).update(entries=entries).days()
+        for date, posts in days:
+            day = [entry for entry in entries if entry.date == date]
+            self.assertEqual(TogglReportsClient.summarize(tasks=TogglReportsClient.group(entries=day)), posts)
+        with self.assertRaises(AssertionError):
+            Aggregator().update(entries=[entries[0]._replace(project=None)])
+
+    def test_aggregator_stream_emits_completed_days(self):
+        entries = [
+            TimeEntry(client='C', project='P', description='fix', dur=60000, date='2020-01-01', id=1),
+            TimeEntry(client='C', project='P', description='fix', dur=60000, date='2020-01-01', id=2),
+            TimeEntry(client='C', project='Q', description='fix', dur=60000, date='2020-01-03', id=3)
+        ]
+        aggregator = Aggregator(daily=True)
+        self.assertEqual([], aggregator.feed(entry=entries[0]))
+        self.assertEqual([], aggregator.feed(entry=entries[1]))
+        self.assertEqual(['2020-01-01'], [date for date, posts in aggregator.feed(entry=entries[2])])
+        expected = Aggregator(daily=True).update(entries=entries).days()
+        self.assertEqual(expected, list(Aggregator(daily=True).stream(entries=entries)))
+
+    def test_details_pagination(self):
+        entries = [{'client': 'C', 'project': 'P', 'description': str(i), 'dur': 60000} for i in range(120)]
+        toggl = TogglReportsClient(api_token='token', user_agent='agent')
+        toggl.me = mock.Mock(return_value={'id': 1})
+        toggl.get = mock.Mock(
+            side_effect=lambda endpoint, page, **kwargs: {
+                'data': entries[(page - 1) * 50:page * 50],
+                'per_page': 50,
+                'total_count': len(entries)
+            }
+        )
+        self.assertEqual(
+            [TimeEntry.from_json(data=entry) for entry in entries],
+            list(toggl.details(wid=1, since='2020-01-01', until='2020-01-01'))
+        )
+        self.assertEqual(3, toggl.get.call_count)
+        posts = toggl.posts(since='2020-01-01', until='2020-01-01', wid=1)
+        self.assertEqual(1, len(posts))
+        self.assertEqual(120, posts[0][3])
+
+    def test_days_partitioning(self):
+        entries = [
+            {'client': 'C', 'project': 'P', 'description': 'a', 'dur': 600000, 'start': '2020-01-02T10:00:00+02:00'},
+            {'client': 'C', 'project': 'P', 'description': 'b', 'dur': 300000, 'start': '2020-01-01T23:30:00+02:00'},
+            {'client': 'C', 'project': 'Q', 'description': 'c', 'dur': 120000, 'start': '2020-01-02T11:00:00+02:00'},
+            {'client': 'C', 'project': 'P', 'description': 'a', 'dur': 600000, 'start': '2020-01-02T12:00:00+02:00'}
+        ]
+        toggl = TogglReportsClient(api_token='token', user_agent='agent')
+        toggl.get = mock.Mock(return_value={'data': entries, 'per_page': 50, 'total_count': len(entries)})
+        days = toggl.days(since='2020-01-01', until='2020-01-02', wid=1, user_ids=1)
+        self.assertEqual(1, toggl.get.call_count)
+        self.assertEqual(['2020-01-01', '2020-01-02'], [date for date, posts in days])
+        self.assertEqual([Post('C', 'P', '* b.', 5, 5)], days[0][1])
+        self.assertEqual([Post('C', 'P', '* a.', 20, 20), Post('C', 'Q', '* c.', 2, 0)], days[1][1])
+
+
+    def test_summary_matches_details(self):
+        entries = [
+            {'client': 'C', 'project': 'P', 'description': 'a', 'dur': 600000, 'start': '2020-01-01T10:00:00+00:00'},
+            {'client': 'C', 'project': 'Q', 'description': 'b', 'dur': 301000, 'start': '2020-01-01T11:00:00+00:00'},
+            {'client': 'C', 'project': 'P', 'description': 'a', 'dur': 45000, 'start': '2020-01-02T10:00:00+00:00'}
+        ]
+        summary = {
+            'data': [
+                {'title': {'client': 'C', 'project': 'P'}, 'items': [{'title': {'time_entry': 'a'}, 'time': 645000}]},
+                {'title': {'client': 'C', 'project': 'Q'}, 'items': [{'title': {'time_entry': 'b'}, 'time': 301000}]}
+            ]
+        }
+        reports = {'details': {'data': entries, 'per_page': 50, 'total_count': len(entries)}, 'summary': summary}
+        toggl = TogglReportsClient(api_token='token', user_agent='agent')
+        toggl.get = mock.Mock(side_effect=lambda endpoint, **kwargs: reports[endpoint])
+        expected = toggl.posts(since='2020-01-01', until='2020-01-02', wid=1, user_ids=1)
+        self.assertEqual('details', toggl.get.call_args[1]['endpoint'])
+        self.assertEqual(
+            expected,
+            toggl.posts(since='2020-01-01', until='2020-01-02', wid=1, report='summary', user_ids=1)
+        )
+        self.assertEqual('summary', toggl.get.call_args[1]['endpoint'])
+        self.assertEqual('time_entries', toggl.get.call_args[1]['subgrouping'])
+        toggl.get.side_effect = [UpstreamError('404: not found', status_code=404), reports['details']]
+        self.assertEqual(
+            expected,
+            toggl.posts(since='2020-01-01', until='2020-01-02', wid=1, report='summary', user_ids=1)
+        )
+        toggl.get.side_effect = UpstreamError('429: too many requests', status_code=429)
+        with self.assertRaises(UpstreamError):
+            toggl.posts(since='2020-01-01', until='2020-01-02', wid=1, report='summary', user_ids=1)
+        summary['data'][0]['items'][0]['title']['time_entry'] = None
+        toggl.get.side_effect = lambda endpoint, **kwargs: reports[endpoint]
+        with self.assertRaises(AssertionError):
+            toggl.posts(since='2020-01-01', until='2020-01-02', wid=1, report='summary', user_ids=1)
+
+    def test_summary_truncates_summed_durations(self):
+        entries = [
+            {'client': 'C', 'project': 'P', 'description': 'a', 'dur': 49900, 'start': '2020-01-01T10:00:00+00:00'},
+            {'client': 'C', 'project': 'P', 'description': 'a', 'dur': 49900, 'start': '2020-01-01T11:00:00+00:00'},
+            {'client': 'C', 'project': 'P', 'description': 'a', 'dur': 51300, 'start': '2020-01-02T10:00:00+00:00'}
+        ]
+        summary = {
+            'data': [
+                {'title': {'client': 'C', 'project': 'P'}, 'items': [{'title': {'time_entry': 'a'}, 'time': 151100}]}
+            ]
+        }
+        reports = {'details': {'data': entries, 'per_page': 50, 'total_count': len(entries)}, 'summary': summary}
+        toggl = TogglReportsClient(api_token='token', user_agent='agent')
+        toggl.get = mock.Mock(side_effect=lambda endpoint, **kwargs: reports[endpoint])
+        # NOTE: Details report truncates every time entry to seconds (49 + 49 + 51), while summary report truncates the
+        # sum of milliseconds once (151), so the summary report is opt-in and details report stays the default.
+        self.assertEqual(
+            [Post('C', 'P', '* a.', 2, 0)],
+            toggl.posts(since='2020-01-01', until='2020-01-02', wid=1, user_ids=1)
+        )
+        self.assertEqual(
+            [Post('C', 'P', '* a.', 3, 5)],
+            toggl.posts(since='2020-01-01', until='2020-01-02', wid=1, report='summary', user_ids=1)
+        )
+
+
+class TestTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.sleep = mock.patch('toggl2pl.sleep')
+        self.sleep.start()
+        self.transport = Transport(limiter=RateLimiter(rate=1000, burst=10), retries=2)
+        self.transport.session = mock.Mock()
+
+    def tearDown(self):
+        self.sleep.stop()
+
+    @staticmethod
+    def response(status_code, content=b'{}'):
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = content
+        return response
+
+    def test_request_retries_idempotent_errors(self):
+        self.transport.session.request.side_effect = [
+            requests.exceptions.ReadTimeout('timeout'),
+            self.response(status_code=502),
+            self.response(status_code=200, content=b'{"id": 1}')
+        ]
+        self.assertEqual({'id': 1}, self.transport.request(method='GET', url='http://localhost/me'))
+        self.assertEqual(3, self.transport.session.request.call_count)
+        self.assertEqual(self.transport.timeout, self.transport.session.request.call_args[1]['timeout'])
+
+    def test_request_raises_upstream_errors(self):
+        self.transport.session.request.side_effect = [self.response(status_code=502)]
+        with self.assertRaises(UpstreamError) as context:
+            self.transport.request(method='POST', url='http://localhost/posts/add', idempotent=False)
+        self.assertEqual(502, context.exception.status_code)
+        self.transport.session.request.side_effect = [requests.exceptions.ReadTimeout('timeout')]
+        with self.assertRaises(UpstreamConnectionError):
+            self.transport.request(method='POST', url='http://localhost/posts/add', idempotent=False)
+        self.assertEqual(2, self.transport.session.request.call_count)
+
+    def test_request_leaves_connect_errors_to_adapter(self):
+        reason = urllib3.exceptions.NewConnectionError(None, 'refused')
+        self.transport.session.request.side_effect = [
+            requests.exceptions.ConnectionError(urllib3.exceptions.MaxRetryError(None, '/me', reason=reason))
+        ]
+        with self.assertRaises(UpstreamConnectionError):
+            self.transport.request(method='GET', url='http://localhost/me')
+        self.transport.session.request.side_effect = [requests.exceptions.ConnectTimeout('timeout')]
+        with self.assertRaises(UpstreamConnectionError):
+            self.transport.request(method='GET', url='http://localhost/me')
+        self.assertEqual(2, self.transport.session.request.call_count)
+
+    def test_request_metrics(self):
+        self.transport.name = 'test'
+        self.transport.session.request.side_effect = [requests.exceptions.ReadTimeout('timeout')]
+        with self.assertRaises(UpstreamConnectionError):
+            self.transport.request(
+                method='POST',
+                url='http://localhost/posts/add',
+                endpoint='posts/add',
+                idempotent=False
+            )
+        self.assertEqual(1, metrics.upstream_requests.values[('test', 'posts/add', 'POST', 'error')])
+        self.assertEqual(1, sum(metrics.upstream_duration.values[('test', 'posts/add', 'POST')][:-1]))
+
+
+class TestPublish(unittest.TestCase):
+
+    def test_publish_collects_failures(self):
+        def add_post(**kwargs):
+            if kwargs['task'] == 'B':
+                raise UpstreamError('500: error', status_code=500)
+            return {}
+
+        client = mock.Mock()
+        client.add_post.side_effect = add_post
+        posts = [['P', task, '* Work.', 12, 10] for task in 'ABCB']
+        items = [('2020-01-0{day}'.format(day=day), post) for day, post in enumerate(posts, start=1)]
+        failed = publish(client=client, items=items, jobs=3, rounding=True)
+        self.assertEqual(4, client.add_post.call_count)
+        self.assertEqual([posts[1], posts[3]], [item['post'] for item in failed])
+        self.assertEqual(['2020-01-02', '2020-01-04'], [item['date'] for item in failed])
+        self.assertEqual('500: error', failed[0]['error'])
+        self.assertEqual(10, client.add_post.call_args[1]['minutes'])
+
+    def test_publish_records_published_posts(self):
+        client = mock.Mock()
+        client.add_post.side_effect = [{'post': {'id': 1}}, UpstreamError('500: error', status_code=500)]
+        ledger = mock.Mock()
+        items = [('2020-01-01', ['P', 'A', '* Work.', 12, 10]), ('2020-01-01', ['P', 'B', '* Work.', 12, 10])]
+        failed = publish(client=client, items=items, ledger=ledger)
+        self.assertEqual(1, len(failed))
+        ledger.record.assert_called_once_with(
+            date='2020-01-01',
+            post=items[0][1],
+            minutes=12,
+            response={'post': {'id': 1}}
+        )
+
+
+class TestServiceClient(unittest.TestCase):
+
+    def test_pull_revalidates_cached_posts(self):
+        items = [('2020-01-01', ['P', 'T', '* Work.', 12, 10]), ('2020-01-02', ['P', 'T', '* Fix.', 6, 5])]
+        with tempfile.TemporaryDirectory() as directory:
+            cache = MetadataCache(path=os.path.join(directory, 'cache.json'), namespace='service')
+            client = ServiceClient(api_token='t', api_url='http://localhost', user_key='k', workspace='W', cache=cache)
+            client.session = mock.Mock()
+            fresh, unchanged = requests.Response(), requests.Response()
+            content = b''.join(json.dumps(item).encode() + b'\n' for item in items)
+            fresh.status_code, fresh.raw = 200, io.BytesIO(content)
+            fresh.headers.update({'Content-Type': 'application/x-ndjson', 'ETag': '"abc"'})
+            unchanged.status_code = 304
+            client.session.request.side_effect = [fresh, unchanged]
+            expected = [(date, Post.from_json(data=post)) for date, post in items]
+            self.assertEqual(expected, list(client.pull(since='2020-01-01', until='2020-01-02')))
+            self.assertEqual(expected, list(client.pull(since='2020-01-01', until='2020-01-02')))
+            self.assertEqual('"abc"', client.session.request.call_args[1]['headers']['If-None-Match'])
+
+    def test_pull_stream_error(self):
+        client = ServiceClient(api_token='t', api_url='http://localhost', user_key='k', workspace='W')
+        client.session = mock.Mock()
+        response = requests.Response()
+        response.status_code, response.headers['Content-Type'] = 200, 'application/x-ndjson'
+        response.raw = io.BytesIO(b'["2020-01-01", ["P", "T", "* Work.", 12, 10]]\n{"error": "-", "status_code": 504}')
+        client.session.request.return_value = response
+        pulled = client.pull(since='2020-01-01', until='2020-01-02')
+        self.assertEqual('2020-01-01', next(pulled)[0])
+        with self.assertRaises(UpstreamError) as context:
+            next(pulled)
+        self.assertEqual(504, context.exception.status_code)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,43 @@
+from toggl2pl.metrics import Registry, endpoint
+import unittest
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter(self):
+        counter = self.registry.counter(name='test_total', documentation='Test.', labels=('path',))
+        counter.inc('a"b')
+        counter.inc('a"b', amount=2)
+        self.assertIs(counter, self.registry.counter(name='test_total', documentation='Test.', labels=('path',)))
+        self.assertEqual(
+            '# HELP test_total Test.\n# TYPE test_total counter\ntest_total{path="a\\"b"} 3\n',
+            self.registry.expose()
+        )
+
+    def test_endpoint(self):
+        self.assertEqual('workspaces/:id/clients', endpoint(path='workspaces/123/clients'))
+        self.assertEqual('projects/list', endpoint(path='projects/list'))
+        self.assertEqual('/api/v8/me', endpoint(path='/api/v8/me'))
+
+    def test_histogram(self):
+        histogram = self.registry.histogram(name='test_seconds', documentation='Test.', buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value)
+        lines = self.registry.expose().splitlines()
+        self.assertEqual(
+            [
+                'test_seconds_bucket{le="0.1"} 2',
+                'test_seconds_bucket{le="1"} 3',
+                'test_seconds_bucket{le="+Inf"} 4',
+                'test_seconds_count 4',
+                'test_seconds_sum 2.65'
+            ],
+            lines[2:]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+from toggl2pl.models import PLProject, PLTask, Post, TimeEntry
+import json
+import unittest
+
+
+class TestModels(unittest.TestCase):
+
+    def test_pl_project_json(self):
+        payload = {
+            'id': 1,
+            'name': 'P',
+            'status': 'active',
+            'tasks': {
+                'T': {'id': 2, 'title': 'T', 'description': 'long task description'}
+            }
+        }
+        project = PLProject.from_json(data=payload)
+        self.assertEqual(PLProject(id=1, name='P', tasks={'T': PLTask(id=2, title='T')}), project)
+        self.assertEqual(project, PLProject.from_json(data=json.loads(json.dumps(project))))
+
+    def test_post_json(self):
+        post = Post(project='P', task='T', description='* Work.', duration=12, rounded=10)
+        self.assertEqual('["P", "T", "* Work.", 12, 10]', json.dumps(post))
+        self.assertEqual(post, Post.from_json(data=json.loads(json.dumps(post))))
+        self.assertFalse(hasattr(post, '__dict__'))
+
+    def test_time_entry_json(self):
+        entry = TimeEntry.from_json(
+            data={
+                'client': 'C',
+                'description': 'fix',
+                'dur': 60000,
+                'id': 1,
+                'project': 'P',
+                'start': '2020-01-01T10:00:00+00:00',
+                'tags': ['a', 'b'],
+                'user': 'user'
+            }
+        )
+        expected = TimeEntry(client='C', project='P', description='fix', dur=60000, date='2020-01-01', id=1)
+        self.assertEqual(expected, entry)
+        self.assertIsNone(TimeEntry.from_json(data={'client': 'C', 'project': 'P', 'description': 'a', 'dur': 1}).date)
+        self.assertFalse(hasattr(entry, '__dict__'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+from toggl2pl.prefetch import Prefetcher
+from unittest import mock
+import unittest
+
+
+class TestPrefetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.fetched = list()
+        self.prefetcher = Prefetcher(fetch=self.fetch, budget=2, interval=60)
+
+    def fetch(self, data):
+        self.fetched.append(data['user'])
+        if data['user'] == 'broken':
+            raise RuntimeError('unavailable')
+        return 'prefetched'
+
+    def test_cycle_respects_budget(self):
+        for user in ('a', 'b', 'c'):
+            self.prefetcher.observe(key=user, data={'user': user})
+        self.prefetcher.observe(key='a', data={'user': 'a'})
+        self.prefetcher.cycle()
+        self.assertEqual({'a', 'c'}, set(self.fetched))
+        stats = self.prefetcher.stats()
+        self.assertEqual(1, stats['cycles'])
+        self.assertEqual(2, stats['prefetched'])
+        self.assertEqual(1, stats['skipped'])
+        self.assertEqual(3, stats['active'])
+
+    def test_cycle_forgets_inactive_users(self):
+        self.prefetcher.observe(key='a', data={'user': 'a'})
+        self.prefetcher.observe(key='broken', data={'user': 'broken'})
+        with mock.patch('toggl2pl.prefetch.monotonic', return_value=10 ** 9):
+            self.prefetcher.cycle()
+        self.assertEqual([], self.fetched)
+        self.assertEqual(0, self.prefetcher.stats()['active'])
+        self.prefetcher.observe(key='broken', data={'user': 'broken'})
+        self.prefetcher.cycle()
+        self.assertEqual(1, self.prefetcher.stats()['failed'])
+
+    def test_disabled(self):
+        prefetcher = Prefetcher(fetch=self.fetch)
+        prefetcher.observe(key='a', data={'user': 'a'})
+        prefetcher.start()
+        self.assertEqual({'active': 0, 'cycles': 0, 'failed': 0, 'running': False, 'skipped': 0}, prefetcher.stats())
+
+
+if __name__ == '__main__':
+    unittest.main()
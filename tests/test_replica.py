@@ -0,0 +1,119 @@
+from datetime import date
+from toggl2pl import Aggregator, TogglReportsClient
+from toggl2pl.models import TimeEntry
+from toggl2pl.replica import Replica
+from unittest import mock
+import os
+import random
+import tempfile
+import unittest
+
+
+class FakeDate(date):
+
+    @classmethod
+    def today(cls):
+        return cls(2020, 1, 10)
+
+
+class TestReplica(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'replica.sqlite3')
+        generator = random.Random(0)
+        self.entries = sorted(
+            (
+                TimeEntry.from_json(
+                    data={
+                        'client': generator.choice('AB'),
+                        'description': generator.choice(['fix', 'review']),
+                        'dur': generator.randrange(1, 7200000),
+                        'id': i,
+                        'project': generator.choice('PQ'),
+                        'start': '2020-01-{day:02d}T10:00:00+00:00'.format(day=generator.randrange(1, 11))
+                    }
+                ) for i in range(200)
+            ),
+            key=lambda entry: entry.date
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def details(self, since, until, **kwargs):
+        return [entry for entry in self.entries if since <= entry.date <= until]
+
+    def test_plan(self):
+        replica = Replica(path=self.path, namespace='a', recheck=2)
+        self.assertEqual([('2020-01-05', '2020-01-07')], replica.plan(since='2020-01-05', until='2020-01-07'))
+        replica.store(since='2020-01-05', until='2020-01-07', entries=[], today='2020-01-10')
+        self.assertEqual(('2020-01-05', '2020-01-07'), replica.watermarks())
+        self.assertEqual([], replica.plan(since='2020-01-05', until='2020-01-07'))
+        self.assertEqual(
+            [('2020-01-01', '2020-01-04'), ('2020-01-08', '2020-01-09')],
+            replica.plan(since='2020-01-01', until='2020-01-09')
+        )
+        self.assertEqual([('2020-01-01', '2020-01-04')], replica.plan(since='2020-01-01', until='2020-01-02'))
+        replica.store(since='2020-01-08', until='2020-01-10', entries=[], today='2020-01-10')
+        self.assertEqual(('2020-01-05', '2020-01-08'), replica.watermarks())
+        self.assertEqual([('2020-01-09', '2020-01-10')], replica.plan(since='2020-01-10', until='2020-01-10'))
+        replica.refresh = True
+        self.assertEqual([('2020-01-06', '2020-01-06')], replica.plan(since='2020-01-06', until='2020-01-06'))
+        recent = Replica(path=self.path, namespace='b')
+        recent.store(since='2020-01-09', until='2020-01-10', entries=[], today='2020-01-10')
+        self.assertEqual(('2020-01-09', None), recent.watermarks())
+        self.assertEqual([('2020-01-09', '2020-01-10')], recent.plan(since='2020-01-09', until='2020-01-10'))
+        self.assertEqual([('2020-01-09', '2020-01-10')], recent.plan(since='2020-01-10', until='2020-01-10'))
+        self.assertEqual([('2020-01-05', '2020-01-08')], recent.plan(since='2020-01-05', until='2020-01-06'))
+
+    def test_store_keeps_recent_days_not_final(self):
+        replica = Replica(path=self.path, namespace='a', recheck=2)
+        replica.store(since='2020-01-10', until='2020-01-10', entries=[], today='2020-01-10')
+        for since, until in replica.plan(since='2020-01-09', until='2020-01-10'):
+            replica.store(since=since, until=until, entries=[], today='2020-01-10')
+        self.assertEqual(('2020-01-09', None), replica.watermarks())
+        self.assertEqual([('2020-01-09', '2020-01-11')], replica.plan(since='2020-01-09', until='2020-01-11'))
+        replica.store(since='2020-01-09', until='2020-01-11', entries=[], today='2020-01-12')
+        self.assertEqual(('2020-01-09', '2020-01-10'), replica.watermarks())
+
+    def test_store_replaces_fetched_days(self):
+        replica = Replica(path=self.path, namespace='a')
+        replica.store(since='2020-01-01', until='2020-01-10', entries=self.entries, today='2020-01-10')
+        removed = [entry for entry in self.entries if entry.date == '2020-01-10']
+        replica.store(since='2020-01-10', until='2020-01-10', entries=removed[1:], today='2020-01-10')
+        expected = Aggregator(daily=True).update(entries=[entry for entry in self.entries if entry is not removed[0]])
+        self.assertEqual(
+            sorted(expected.durations.items()),
+            replica.durations(since='2020-01-01', until='2020-01-10', daily=True)
+        )
+
+    def test_reports_from_replica(self):
+        expected = TogglReportsClient(api_token='token', user_agent='agent')
+        expected.details = mock.Mock(side_effect=self.details)
+        replica = Replica(path=self.path, namespace='a')
+        toggl = TogglReportsClient(api_token='token', user_agent='agent', replica=replica)
+        toggl.details = mock.Mock(side_effect=self.details)
+        with mock.patch('toggl2pl.replica.date', FakeDate):
+            self.assertEqual(
+                expected.days(since='2020-01-01', until='2020-01-10', wid=1),
+                toggl.days(since='2020-01-01', until='2020-01-10', wid=1)
+            )
+            self.assertEqual(
+                expected.posts(since='2020-01-02', until='2020-01-05', wid=1, report='details'),
+                toggl.posts(since='2020-01-02', until='2020-01-05', wid=1)
+            )
+            self.assertEqual(
+                expected.tasks(since='2020-01-03', until='2020-01-09', wid=1),
+                toggl.tasks(since='2020-01-03', until='2020-01-09', wid=1)
+            )
+        self.assertEqual(2, toggl.details.call_count)
+        self.assertEqual({'since': '2020-01-09', 'until': '2020-01-09', 'wid': 1}, toggl.details.call_args[1])
+        self.entries.append(self.entries[0]._replace(id=1000, project=None))
+        toggl.replica.refresh = True
+        with self.assertRaises(AssertionError):
+            toggl.posts(since='2020-01-01', until='2020-01-10', wid=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
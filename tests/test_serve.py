@@ -0,0 +1,156 @@
+from datetime import date
+from toggl2pl import RateLimiter
+from toggl2pl.__serve__ import clients, create_app, prefetch, prefetcher, pulls
+from unittest import mock
+import gzip
+import json
+import unittest
+
+
+class FakeClient(object):
+
+    def __init__(self, **kwargs):
+        self.me = {'email': 'john.doe@example.com'}
+        self.projects = {
+            'Project': {
+                'id': 1,
+                'tasks': {
+                    'Task': {
+                        'id': 2
+                    }
+                }
+            }
+        }
+
+    def add_post(self, date, description, minutes, project, task):
+        return {
+            'project_id': self.projects[project]['id'],
+            'task_id': self.projects[project]['tasks'][task]['id']
+        }
+
+    def days(self, since, until):
+        return [[since, [['Project', 'Task', '* Work.', 12, 10]]]]
+
+    def posts(self, since, until):
+        return [['Project', 'Task', '* Work.', 12, 10]]
+
+    def stream(self, since, until):
+        yield '2020-01-01', [['Project', 'Task', '* Work.', 12, 10]]
+        yield '2020-01-02', [['Project', 'Task', '* Fix.', 6, 5]]
+
+    def refresh(self):
+        pass
+
+
+class TestServe(unittest.TestCase):
+
+    credentials = {
+        'api_token': 'token',
+        'user_key': 'key',
+        'workspace': 'Workspace'
+    }
+
+    def setUp(self):
+        self.factory = mock.patch.object(clients, 'factory', FakeClient)
+        self.factory.start()
+        self.index = mock.patch('toggl2pl.__serve__.index')
+        self.index.start()
+        clients.entries.clear()
+        pulls.entries.clear()
+        self.app = create_app().test_client()
+
+    def tearDown(self):
+        self.factory.stop()
+        self.index.stop()
+
+    def test_pull_etag(self):
+        payload = dict(self.credentials, excluded_projects=None, since='2020-01-01', until='2020-01-07')
+        with mock.patch.object(FakeClient, 'posts', autospec=True, side_effect=FakeClient.posts) as posts:
+            response = self.app.get('/posts/pull', json=payload)
+            self.assertEqual(200, response.status_code)
+            self.assertEqual([['Project', 'Task', '* Work.', 12, 10]], response.get_json())
+            etag = response.headers['ETag']
+            response = self.app.get('/posts/pull', json=payload, headers={'If-None-Match': etag})
+            self.assertEqual(304, response.status_code)
+            self.assertEqual(etag, response.headers['ETag'])
+            self.assertEqual(1, posts.call_count)
+            post = {'description': '* Work.', 'duration': 12, 'project': 'Project', 'rounded': 10, 'task': 'Task'}
+            self.app.put('/posts/push', json=dict(self.credentials, date='2020-01-03', **post))
+            response = self.app.get('/posts/pull', json=payload, headers={'If-None-Match': etag})
+            self.assertEqual(304, response.status_code)
+            self.assertEqual(2, posts.call_count)
+
+    def test_pull_ndjson_stream(self):
+        payload = dict(self.credentials, daily=True, excluded_projects=None, since='2020-01-01', until='2020-01-02')
+        headers = {'Accept': 'application/x-ndjson', 'Accept-Encoding': 'gzip'}
+        response = self.app.get('/posts/pull', json=payload, headers=headers)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('gzip', response.headers['Content-Encoding'])
+        self.assertNotIn('ETag', response.headers)
+        streamed = [json.loads(line) for line in gzip.decompress(response.get_data()).splitlines()]
+        self.assertEqual(['2020-01-01', ['Project', 'Task', '* Work.', 12, 10]], streamed[0])
+        self.assertEqual(2, len(streamed))
+        response = self.app.get('/posts/pull', json=payload, headers={'Accept': 'application/x-ndjson'})
+        self.assertEqual(streamed, [json.loads(line) for line in response.get_data().splitlines()])
+        self.assertTrue(response.headers['ETag'].endswith('-ndjson"'))
+        response = self.app.get('/posts/pull', json=payload)
+        self.assertEqual([[date, [post]] for date, post in streamed], response.get_json())
+
+    def test_prefetch(self):
+        today = date.today().isoformat()
+        payload = dict(self.credentials, daily=True, excluded_projects=None, since=today, until=today)
+        with mock.patch.object(prefetcher, 'interval', 60):
+            self.app.get('/posts/pull', json=payload)
+            self.assertEqual(1, prefetcher.stats()['active'])
+            (data, seen), = prefetcher.active.values()
+            prefetcher.active.clear()
+        pulls.entries.clear()
+        self.assertEqual('prefetched', prefetch(data=data))
+        self.assertEqual('unchanged', prefetch(data=data))
+        with mock.patch.object(FakeClient, 'days', side_effect=AssertionError({'id': 1})):
+            self.assertEqual('incomplete', prefetch(data=data))
+        limiter = RateLimiter.shared(key=('toggl', 'token'), rate=1)
+        limiter.backoff(delay=60)
+        self.assertEqual('throttled', prefetch(data=data))
+        del limiter
+        with mock.patch.object(FakeClient, 'days', side_effect=AssertionError) as days:
+            response = self.app.get('/posts/pull', json=payload)
+            self.assertEqual(0, days.call_count)
+        self.assertEqual([[today, [['Project', 'Task', '* Work.', 12, 10]]]], response.get_json())
+
+    def test_push_malformed(self):
+        post = {'date': '2020-01-01', 'description': '* Work.', 'duration': 12, 'project': 'Project', 'task': 'Task'}
+        with mock.patch.object(clients, 'invalidate') as invalidate:
+            response = self.app.put('/posts/push', json=dict(self.credentials, **post))
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(['rounded'], response.get_json()['fields'])
+        self.assertEqual(0, invalidate.call_count)
+        self.assertEqual(0, len(clients.entries))
+
+    def test_push_batch(self):
+        posts = [
+            {'description': '* Work.', 'duration': 12, 'project': 'Project', 'rounded': 10, 'task': 'Task'},
+            {'description': '* Work.', 'duration': 12, 'project': 'Project', 'rounded': 10, 'task': 'Unknown'},
+            {'description': '* Work.', 'duration': 12, 'project': 'Project', 'task': 'Task'}
+        ]
+        response = self.app.put('/posts/push-batch', json=dict(self.credentials, date='2020-01-01', posts=posts))
+        self.assertEqual(200, response.status_code)
+        results = response.get_json()
+        self.assertEqual([200, 404, 400], [result['status'] for result in results])
+        self.assertEqual({'project_id': 1, 'task_id': 2}, results[0]['response'])
+
+    def test_metrics(self):
+        post = {'date': '2020-01-01', 'description': '* Work.', 'duration': 12, 'project': 'Project', 'rounded': 10}
+        self.app.put('/posts/push', json=dict(self.credentials, task='Task', **post))
+        response = self.app.get('/metrics')
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        content = response.get_data(as_text=True)
+        self.assertIn('toggl2pl_request_duration_seconds_count{route="/posts/push",method="PUT",status="200"}', content)
+        self.assertIn('toggl2pl_client_cache_events_total{event="misses"}', content)
+        self.assertIn('toggl2pl_indexer_documents_total{outcome="dropped"}', content)
+        self.assertIn('toggl2pl_requests_in_flight 1', content)
+
+
+if __name__ == '__main__':
+    unittest.main()
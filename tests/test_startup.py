@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import unittest
+
+
+class TestStartup(unittest.TestCase):
+
+    # The maximum cumulative import time of the CLI module in milliseconds (several times more than it takes on a
+    # developer machine to stay stable on shared CI runners, set lower value on dedicated benchmark machine)
+    budget = float(os.getenv('STARTUP_BUDGET_MS', 2000))
+
+    # Modules only needed in server mode or to render output, so they must not be imported on CLI startup
+    deferred = (
+        'aiohttp', 'elasticsearch', 'flask', 'paste.translogger', 'tabulate', 'toggl2pl.__aserve__',
+        'toggl2pl.__serve__', 'tqdm', 'waitress'
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        output = subprocess.run(
+            args=[sys.executable, '-X', 'importtime', '-c', 'import toggl2pl.__main__'],
+            check=True,
+            stderr=subprocess.PIPE,
+            universal_newlines=True
+        ).stderr
+        cls.modules = dict()
+        for line in output.splitlines():
+            if not line.startswith('import time:') or line.endswith('| imported package'):
+                continue
+            _, cumulative, name = line.split('|')
+            cls.modules[name.strip()] = int(cumulative)
+
+    def test_deferred_modules(self):
+        imported = [name for name in self.modules if name.startswith(self.deferred)]
+        self.assertEqual([], imported)
+
+    def test_deferred_modules_not_loaded(self):
+        loaded = subprocess.run(
+            args=[sys.executable, '-c', 'import sys, toggl2pl.__main__; print(" ".join(sys.modules))'],
+            check=True,
+            stdout=subprocess.PIPE,
+            universal_newlines=True
+        ).stdout.split()
+        self.assertEqual([], [name for name in loaded if name.startswith(self.deferred)])
+
+    def test_import_time(self):
+        self.assertLess(self.modules['toggl2pl.__main__'], self.budget * 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
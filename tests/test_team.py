@@ -0,0 +1,62 @@
+from benchmarks.fakes import Dataset, FakePL, FakeToggl, Server
+from benchmarks.scenarios import LIMITS
+from toggl2pl.team import Member, Team, discover
+import os
+import tempfile
+import unittest
+
+
+class TestTeam(unittest.TestCase):
+
+    def setUp(self):
+        self.dataset = Dataset(projects=6, tasks=2, entries=60, days=2)
+
+    def member(self, name, pl, toggl, **kwargs):
+        credentials = {
+            'api_token': name,
+            'base_url': pl.url,
+            'limits': LIMITS,
+            'toggl_url': toggl.url,
+            'user_key': name,
+            'workspace': 'Workspace'
+        }
+        credentials.update(kwargs)
+        return Member(name=name, credentials=credentials)
+
+    def test_export(self):
+        pl, toggl = Server(handler=FakePL(dataset=self.dataset)), Server(handler=FakeToggl(dataset=self.dataset))
+        with pl, toggl:
+            excluded = [self.dataset.projects[0]['name']]
+            members = [
+                self.member(name='alice', pl=pl, toggl=toggl),
+                self.member(name='bob', pl=pl, toggl=toggl, excluded_projects=excluded),
+                self.member(name='eve', pl=pl, toggl=toggl, workspace='Unknown')
+            ]
+            team = Team(members=members, jobs=3)
+            team.connect()
+            self.assertEqual(1, pl.counters['/projects/list'])
+            self.assertNotIn(excluded[0], members[1].client.projects)
+            self.assertIn(excluded[0], members[0].client.projects)
+            items = team.pull(since=self.dataset.dates[0], until=self.dataset.until)
+            self.assertEqual({'alice', 'bob'}, set(member.name for member, date, post in items))
+            ticks = list()
+            failed = team.push(items=items, progress=lambda: ticks.append(1))
+            self.assertEqual(len(items), len(ticks))
+        summary = {item['name']: item for item in team.summary()}
+        self.assertIsNotNone(summary['eve']['error'])
+        self.assertEqual(0, summary['eve']['posts'])
+        published = summary['alice']['published'] + summary['bob']['published']
+        self.assertEqual(len(items) - len(failed), published)
+        self.assertGreater(summary['alice']['throughput'], 0)
+
+    def test_discover(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for path in ('bob.yml', 'alice/config.yml', 'notes.txt'):
+                os.makedirs(os.path.dirname(os.path.join(directory, path)), exist_ok=True)
+                open(os.path.join(directory, path), 'w').close()
+            found = discover(paths=[directory, os.path.join(directory, 'bob.yml')])
+        self.assertEqual(['alice', 'bob', 'bob'], [name for name, path in found])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,328 @@
+from aiohttp import web
+from time import perf_counter
+from toggl2pl import UpstreamError
+from toggl2pl.__serve__ import (
+    NDJSON, caches, credentials, index, indexer, invalidate, lines, malformed, negotiate, observe, prefetcher,
+    pull_key, pull_scope, pulls, registry, representation, request_duration, requests_in_flight, settings
+)
+from toggl2pl.aio import AsyncClient, AsyncClientCache
+import asyncio
+import json
+import zlib
+
+clients = AsyncClientCache(
+    factory=AsyncClient.create,
+    maxsize=settings['client_cache_size'],
+    ttl=settings['client_cache_ttl']
+)
+caches.append(clients)
+
+routes = web.RouteTableDef()
+
+
+def create_app():
+    """
+    Create a new instance of asynchronous application with the same routes and JSON contract as the Flask application
+    created by :func:`toggl2pl.__serve__.create_app`, but with handlers which await upstream requests instead of
+    blocking a thread per request.
+
+    :return: Instance of :class:`aiohttp.web.Application`.
+    """
+    app = web.Application(middlewares=[instrument, upstream_error])
+    app.add_routes(routes)
+    app.on_cleanup.append(cleanup)
+    # GOTCHA: Prefetcher runs in its own thread using synchronous clients, it only shares pull responses cache and Toggl
+    # rate limiters with asynchronous handlers.
+    prefetcher.start()
+    return app
+
+
+async def add_post(client, data):
+    """
+    Create a new Project Laboratory post from the `/posts/push` request payload.
+
+    :param client: The client object to use to publish post.
+    :type client: :class:`toggl2pl.aio.AsyncClient`
+    :param data: The request JSON payload with post details.
+    :type data: dict
+    :return: Dictionary object with PL API response content.
+    :rtype: dict
+    """
+    return await client.add_post(
+        date=data['date'],
+        description=data['description'],
+        minutes=data['rounded'],
+        project=data['project'],
+        task=data['task']
+    )
+
+
+async def cleanup(app):
+    """
+    Close cached clients and their connection pools on application shutdown.
+
+    :param app: The application being shut down.
+    """
+    await clients.clear()
+
+
+@web.middleware
+async def instrument(request, handler):
+    """
+    Track in-flight requests and record requests duration by route, method and response status code.
+    """
+    started = perf_counter()
+    status = 500
+    requests_in_flight.inc()
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as he:
+        status = he.status
+        raise
+    finally:
+        requests_in_flight.dec()
+        route = request.match_info.route.resource
+        request_duration.observe(
+            perf_counter() - started,
+            route.canonical if route is not None else 'unmatched',
+            request.method,
+            str(status)
+        )
+
+
+@routes.get('/metrics')
+async def metrics(request):
+    """
+    Expose service metrics in Prometheus text format (please see :func:`toggl2pl.__serve__.metrics`).
+    """
+    return web.Response(
+        body=registry.expose().encode('utf-8'),
+        headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+    )
+
+
+async def publish(client, items):
+    """
+    Publish list of posts concurrently (limited by `push_concurrency` setting) and collect per-item results instead of
+    failing on the first error.
+
+    :param client: The client object to use to publish posts.
+    :type client: :class:`toggl2pl.aio.AsyncClient`
+    :param items: List of request payloads with posts details.
+    :type items: list
+    :return: List of dictionaries with publishing status and PL API response or error description for each post.
+    :rtype: list
+    """
+    semaphore = asyncio.Semaphore(max(1, settings['push_concurrency']))
+
+    async def worker(item):
+        missing = malformed(data=item)
+        if missing:
+            return {'status': 400, 'error': 'missing post fields: {fields}'.format(fields=', '.join(missing))}
+        async with semaphore:
+            try:
+                return {'status': 200, 'response': await add_post(client=client, data=item)}
+            except KeyError as ke:
+                return {'status': 404, 'error': 'not found: {missing}'.format(missing=ke.args[0])}
+            except UpstreamError as ue:
+                return {'status': 502, 'error': str(ue)}
+
+    return list(await asyncio.gather(*[worker(item) for item in items]))
+
+
+@routes.get('/posts/pull')
+async def pull(request):
+    """
+    Pull list of Toggl posts in period between specified since and until dates (please see
+    :func:`toggl2pl.__serve__.pull` for request and response format and content negotiation).
+    """
+    data = await request.json()
+    daily = bool(data.get('daily'))
+    streamed, compressed = negotiate(headers=request.headers)
+    key, scope = pull_key(data=data), pull_scope(data=data)
+    observe(data=data)
+    entry = pulls.get(key=key)
+    if entry is None:
+        generation = pulls.generation(scope=scope)
+        client = await clients.get(**credentials(data=data, excluded_projects=data['excluded_projects']))
+        try:
+            if daily and streamed:
+                days = client.stream(since=data['since'], until=data['until'])
+                # GOTCHA: The same as for synchronous server, the first day is fetched before response is started
+                try:
+                    first = await days.__anext__()
+                except StopAsyncIteration:
+                    first = None
+            elif daily:
+                result = await client.days(since=data['since'], until=data['until'])
+            else:
+                result = await client.posts(since=data['since'], until=data['until'])
+        except AssertionError as ae:
+            return web.json_response(ae.args[0], status=500)
+        if daily and streamed:
+            return await stream(
+                request=request,
+                days=days,
+                first=first,
+                data=data,
+                generation=generation,
+                compressed=compressed
+            )
+        entry = pulls.put(
+            key=key,
+            scope=scope,
+            since=data['since'],
+            until=data['until'],
+            content=json.dumps(result).encode('utf-8'),
+            generation=generation
+        )
+    content, etag = representation(entry=entry, daily=daily, ndjson=streamed, gzip=compressed)
+    headers = {'ETag': '"{etag}"'.format(etag=etag), 'Vary': 'Accept, Accept-Encoding'}
+    if compressed:
+        headers['Content-Encoding'] = 'gzip'
+    if any(item.value in (etag, '*') for item in request.if_none_match or ()):
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=content, content_type=NDJSON if streamed else 'application/json', headers=headers)
+
+
+@routes.put('/posts/push')
+async def push(request):
+    """
+    Push single Project Laboratory task information (please see :func:`toggl2pl.__serve__.push` for request and
+    response format).
+    """
+    data = await request.json()
+    missing = malformed(data=data)
+    if missing:
+        return web.json_response({'error': 'missing post fields', 'fields': missing}, status=400)
+    kwargs = credentials(data=data)
+    client = await clients.get(**kwargs)
+    try:
+        response = web.json_response(await add_post(client=client, data=data))
+    except KeyError:
+        # GOTCHA: The same as for synchronous server, project or task may be created in PL after the client was cached.
+        clients.invalidate(**kwargs)
+        client = await clients.get(**kwargs)
+        try:
+            response = web.json_response(await add_post(client=client, data=data))
+        except KeyError as ke:
+            error = {
+                'missing': ke.args[0],
+                'project': data['project'],
+                'task': data['task']
+            }
+            return web.json_response(error, status=404)
+    invalidate(data=data, posts=[data])
+    index(client=client, posts=[data])
+    return response
+
+
+@routes.put('/posts/push-batch')
+async def push_batch(request):
+    """
+    Push list of Project Laboratory tasks information using bounded number of concurrent PL API requests (please see
+    :func:`toggl2pl.__serve__.push_batch` for request and response format).
+    """
+    data = await request.json()
+    kwargs = credentials(data=data)
+    client = await clients.get(**kwargs)
+    items = [dict(post, date=post.get('date', data.get('date'))) for post in data['posts']]
+    results = await publish(client=client, items=items)
+    missing = [i for i, result in enumerate(results) if result['status'] == 404]
+    if missing:
+        clients.invalidate(**kwargs)
+        client = await clients.get(**kwargs)
+        for i, result in zip(missing, await publish(client=client, items=[items[i] for i in missing])):
+            results[i] = result
+    published = [item for item, result in zip(items, results) if result['status'] == 200]
+    invalidate(data=data, posts=published)
+    index(client=client, posts=published)
+    return web.json_response(results)
+
+
+async def stream(request, days, first, data, generation, compressed=False):
+    """
+    Send streamed days as newline delimited JSON (optionally compressed with gzip flushed after every day) and store
+    the complete response in pull responses cache once the last day is sent (please see
+    :func:`toggl2pl.__serve__.stream`).
+
+    :param request: The `/posts/pull` request.
+    :param days: Asynchronous generator of `(date, posts)` pairs returned by :meth:`toggl2pl.aio.AsyncClient.stream`.
+    :type days: async_generator
+    :param first: The first day already received from generator or `None` in case there are no posts.
+    :type first: tuple
+    :param data: The `/posts/pull` request JSON payload.
+    :type data: dict
+    :param generation: The pull responses cache scope generation before posts were requested.
+    :type generation: int
+    :param compressed: Optional flag to compress response with gzip.
+    :type compressed: bool
+    :return: The streamed response.
+    :rtype: :class:`aiohttp.web.StreamResponse`
+    """
+    response = web.StreamResponse(headers={'Content-Type': NDJSON, 'Vary': 'Accept, Accept-Encoding'})
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compressed else None
+    if compressed:
+        response.headers['Content-Encoding'] = 'gzip'
+    await response.prepare(request)
+
+    async def write(chunk):
+        if compressor is not None:
+            chunk = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        await response.write(chunk)
+
+    collected = list()
+    try:
+        if first is not None:
+            collected.append(first)
+            await write(lines(posts=first[1], date=first[0]))
+            async for date, posts in days:
+                collected.append((date, posts))
+                await write(lines(posts=posts, date=date))
+    except AssertionError as ae:
+        await write(lines(posts=[{'error': ae.args[0]}]))
+        collected = None
+    except UpstreamError as ue:
+        await write(lines(posts=[{'error': str(ue), 'status_code': ue.status_code}]))
+        collected = None
+    if compressor is not None:
+        await response.write(compressor.flush())
+    await response.write_eof()
+    if collected is not None:
+        pulls.put(
+            key=pull_key(data=data),
+            scope=pull_scope(data=data),
+            since=data['since'],
+            until=data['until'],
+            content=json.dumps(collected).encode('utf-8'),
+            generation=generation
+        )
+    return response
+
+
+@routes.get('/status')
+async def status(request):
+    """
+    Show service status information useful for monitoring (please see :func:`toggl2pl.__serve__.status`).
+    """
+    return web.json_response(
+        {
+            'clients': clients.stats(),
+            'indexer': indexer.stats(),
+            'prefetch': prefetcher.stats(),
+            'pulls': pulls.stats()
+        }
+    )
+
+
+@web.middleware
+async def upstream_error(request, handler):
+    """
+    Report upstream API errors (PL or Toggl request failed or timed out) back to client as bad gateway.
+    """
+    try:
+        return await handler(request)
+    except UpstreamError as ue:
+        return web.json_response({'error': str(ue), 'status_code': ue.status_code}, status=502)
@@ -1,7 +1,19 @@
-from time import sleep
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from itertools import groupby
+from requests.adapters import HTTPAdapter
+from threading import Lock
+from time import monotonic, perf_counter, sleep, time
+from toggl2pl import metrics
+from toggl2pl.cache import fingerprint
+from toggl2pl.models import PLProject, PLTask, Post, TimeEntry
+from urllib3.util.retry import Retry
+from weakref import WeakValueDictionary
+import json
 import logging
+import math
 import requests
-import sys
 import textwrap
 import urllib3
 import yaml
@@ -10,9 +22,161 @@ import yaml
 APP_KEY = 'fba04c0786f881822dd9f7aa0d2530c6:o@$s^^JG8a4w9lgJcPH*'
 
 
+class Aggregator(object):
+
+    def __init__(self, daily=False):
+        """
+        Streaming aggregator of Toggl time entries into posts with memory usage bounded by the number of distinct tasks.
+
+        Time entries are consumed one by one and only the total duration per `(client, project, description)` key (with
+        leading date in daily mode) is kept in a flat dictionary, so neither time entries nor nested structures are
+        stored. Posts are built by a single pass over sorted keys and are identical to the result of
+        :meth:`TogglReportsClient.summarize` of the same time entries grouped by :meth:`TogglReportsClient.group`.
+
+        :param daily: Optional flag to partition time entries by their start dates (please see :meth:`days`).
+        :type daily: bool
+        """
+        self.current = None
+        self.daily = daily
+        self.durations = dict()
+
+    def days(self):
+        """
+        Build daily posts from time entries aggregated in daily mode.
+
+        :return: List of `(date, posts)` pairs sorted by date (days without time entries are omitted).
+        :rtype: list
+        """
+        return [
+            (date, self.emit(items=((key[1:], duration) for key, duration in items)))
+            for date, items in groupby(sorted(self.durations.items()), key=lambda item: item[0][0])
+        ]
+
+    @staticmethod
+    def emit(items):
+        """
+        Build posts from durations sorted by clients, projects and descriptions.
+
+        :param items: Iterable of `((client, project, description), seconds)` pairs sorted by keys.
+        :type items: iterable
+        :return: List of :class:`toggl2pl.models.Post` records aggregated by projects.
+        :rtype: list
+        """
+        posts = list()
+        for (client, project), group in groupby(items, key=lambda item: item[0][:2]):
+            durations = 0
+            descriptions = list()
+            for (_, _, description), duration in group:
+                durations += duration
+                descriptions.append(TogglReportsClient.fmt(description=description))
+            minutes, seconds = divmod(durations, 60)
+            duration = minutes + round(seconds / 60)
+            hours, minutes = divmod(duration, 60)
+            posts.append(
+                Post(
+                    project=client,
+                    task=project,
+                    description='\n'.join(descriptions),
+                    duration=duration,
+                    rounded=hours * 60 + rounded(minutes)
+                )
+            )
+        return posts
+
+    def feed(self, entry):
+        """
+        Consume single time entry in daily mode and build posts of days which can not get more time entries.
+
+        Time entries must be sorted by start time (the order of Toggl Reports API `details` report sorted by date), so
+        once time entry of a later date is received all earlier days are complete.
+
+        :param entry: The time entry built from Toggl Reports API `details` report.
+        :type entry: :class:`toggl2pl.models.TimeEntry`
+        :return: List of `(date, posts)` pairs of completed days (empty while the current day is not finished).
+        :rtype: list
+        """
+        date = entry.date
+        days = list()
+        if self.current is not None and date > self.current:
+            days = self.flush(before=date)
+        if self.current is None or date > self.current:
+            self.current = date
+        self.update(entries=(entry,))
+        return days
+
+    def flush(self, before=None):
+        """
+        Build daily posts and remove their durations from the aggregated totals.
+
+        :param before: Optional date in ISO 8601 (`YYYY-MM-DD`) format to flush only earlier days (default: all days).
+        :type before: str
+        :return: List of `(date, posts)` pairs sorted by date.
+        :rtype: list
+        """
+        keys = [key for key in self.durations if before is None or key[0] < before]
+        items = sorted((key, self.durations.pop(key)) for key in keys)
+        return [
+            (date, self.emit(items=((key[1:], duration) for key, duration in group)))
+            for date, group in groupby(items, key=lambda item: item[0][0])
+        ]
+
+    def posts(self):
+        """
+        Build posts from aggregated time entries (the same as :meth:`TogglReportsClient.posts` returns).
+
+        :return: Normalized list of Toggl tasks aggregated by projects.
+        :rtype: list
+        """
+        return self.emit(items=sorted(self.durations.items()))
+
+    def stream(self, entries):
+        """
+        Consume time entries sorted by start time in daily mode and yield daily posts as soon as each day is complete,
+        so the first days can be sent to client while time entries of the next days are still being fetched.
+
+        :param entries: Iterable of :class:`toggl2pl.models.TimeEntry` records sorted by start time.
+        :type entries: iterable
+        :return: Generator of `(date, posts)` pairs sorted by date (the same as :meth:`days` returns).
+        :rtype: generator
+        """
+        for entry in entries:
+            yield from self.feed(entry=entry)
+        yield from self.flush()
+
+    def update(self, entries):
+        """
+        Consume time entries and add their durations to the aggregated totals.
+
+        :param entries: Iterable of :class:`toggl2pl.models.TimeEntry` records (consumed lazily).
+        :type entries: iterable
+        :return: The same instance of class object.
+        :rtype: :class:`Aggregator`
+        :raises AssertionError: In case some time entry does not have client, project or description.
+        """
+        durations = self.durations
+        get = durations.get
+        for entry in entries:
+            key = (entry.client, entry.project, entry.description)
+            # GOTCHA: The same as for nested grouping, posts must not be built from incomplete time entries.
+            if None in key:
+                raise AssertionError(
+                    {
+                        'client': key[0],
+                        'project': key[1],
+                        'description': key[2]
+                    }
+                )
+            if self.daily:
+                key = (entry.date,) + key
+            durations[key] = get(key, 0) + int(entry.dur / 1000)
+        return self
+
+
 class Client(object):
 
-    def __init__(self, api_token, base_url, user_key, workspace, excluded_projects=None, log_level='info', verify=True):
+    def __init__(self, api_token, base_url, user_key, workspace, cache=None, excluded_projects=None, limits=None,
+                 log_level='info', max_workers=8, projects=None, replica=None, report='details', toggl_url=None,
+                 verify=True):
         """
         High-level class which aggregates common methods required to pull, push and sync data between Project Laboratory
         and Toggl.
@@ -25,24 +189,55 @@ class Client(object):
         :type user_key: str
         :param workspace: The Toggl workspace name (case sensitive) to pull information from.
         :type workspace: str
+        :param cache: Optional persistent cache to store rarely changed PL and Toggl metadata between runs.
+        :type cache: :class:`toggl2pl.cache.MetadataCache`
         :param excluded_projects: Optional list of Project Laboratory projects names to exclude from pull.
         :type excluded_projects: list
+        :param limits: Optional rate limits and timeouts (`rate`, `burst`, `connect_timeout` and `read_timeout` values)
+                       per upstream, e.g. `{'toggl': {'rate': 1}}`.
+        :type limits: dict
         :param log_level: Optional logging level name to configure logging verbosity (default: `info`).
         :type log_level: str
+        :param max_workers: Optional limit of concurrent requests to Project Laboratory API.
+        :type max_workers: int
+        :param projects: Optional PL projects with tasks returned by :meth:`PL.projects` (without exclusions) already
+                         loaded by another client of the same PL instance to use instead of loading them again.
+        :type projects: dict
+        :param replica: Optional local replica of Toggl time entries to pull posts from (please see
+                        :meth:`TogglReportsClient.replicated`).
+        :type replica: :class:`toggl2pl.replica.Replica`
+        :param report: Optional Toggl report to pull posts for the whole period from: `details` (default) or `summary`
+                       (please see :meth:`TogglReportsClient.posts`).
+        :type report: str
+        :param toggl_url: Optional Toggl root URL to use instead of the official one (e.g. local stand-in server).
+        :type toggl_url: str
         :param verify: Optional argument which allows to disable TLS connection verification and suppress warnings.
         :type verify: bool
         """
+        limits = limits or dict()
+        self.cache = cache
         self.pl = PL(
             app_key=APP_KEY,
             base_url=base_url,
             log_level=log_level,
+            max_workers=max_workers,
             user_key=user_key,
-            verify=verify
+            verify=verify,
+            **limits.get('pl', dict())
+        )
+        self.excluded_projects = excluded_projects
+        self.preloaded = projects
+        self.report = report
+        self.state = None
+        self.toggl = TogglReportsClient(
+            api_token=api_token,
+            user_agent=APP_KEY,
+            base_url=toggl_url,
+            replica=replica,
+            **limits.get('toggl', dict())
         )
-        self.projects = self.pl.projects(excluded_projects=excluded_projects)
-        self.toggl = TogglReportsClient(api_token=api_token, user_agent=APP_KEY)
-        self.me = self.toggl.me()
-        self.workspace = self.check_workspace(workspace=self.toggl.workspaces(name=workspace))
+        self.workspace_name = workspace
+        self.refresh()
 
     def add_post(self, date, description, minutes, project, task):
         """
@@ -65,10 +260,48 @@ class Client(object):
             date=date,
             description=description,
             minutes=minutes,
-            project_id=self.projects[project]['id'],
-            task_id=self.projects[project]['tasks'][task]['id']
+            project_id=self.projects[project].id,
+            task_id=self.projects[project].tasks[task].id
         )
 
+    def apply(self, plan, max_workers=4):
+        """
+        Create Toggl clients and projects according to the plan calculated by :meth:`plan` and update cached snapshot.
+
+        :param plan: Dictionary object returned by :meth:`plan`.
+        :type plan: dict
+        :param max_workers: Optional limit of concurrent create requests (the actual rate is limited by Toggl client).
+        :type max_workers: int
+        """
+        if not plan['clients'] and not plan['projects']:
+            return
+        wid = self.workspace['id']
+        clients, projects = self.state
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for client in executor.map(lambda name: self.toggl.create_client(name=name, wid=wid), plan['clients']):
+                clients[client.pop('name')] = client
+            for project in executor.map(
+                lambda item: self.toggl.create_project(cid=clients[item[0]]['id'], name=item[1], wid=wid),
+                plan['projects']
+            ):
+                projects.setdefault(project['cid'], list()).append(project['name'])
+        if self.cache is not None:
+            self.cache.store(name='toggl.snapshot', value={'clients': clients, 'projects': list(projects.items())})
+
+    def cached(self, name, loader):
+        """
+        Get metadata from the persistent cache (if configured) or load it using the provided callable object.
+
+        :param name: The cache entry name.
+        :type name: str
+        :param loader: Callable object to load metadata from remote API.
+        :type loader: callable
+        :return: Metadata loaded from cache or remote API.
+        """
+        if self.cache is None:
+            return loader()
+        return self.cache.fetch(name=name, loader=loader)
+
     @staticmethod
     def check_workspace(workspace):
         """
@@ -84,6 +317,62 @@ class Client(object):
             raise TypeError(yaml.dump(workspace))
         return workspace
 
+    def days(self, since, until):
+        """
+        Wrapper for :meth:`TogglReportsClient.days` to pull Toggl posts between since and until dates split by days.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type since: str
+        :param until: The end date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type until: str
+        :return: List of `(date, posts)` pairs sorted by date.
+        :rtype: list
+        """
+        return self.toggl.days(since=since, until=until, wid=self.workspace['id'], user_ids=self.me['id'])
+
+    def diff(self, clients, projects):
+        """
+        Calculate Project Laboratory projects and tasks missing in Toggl as clients and projects set differences.
+
+        :param clients: Dictionary object with Toggl clients by their names.
+        :type clients: dict
+        :param projects: Dictionary object with Toggl projects names by clients IDs.
+        :type projects: dict
+        :return: Dictionary object with list of clients names and list of `[client, project]` pairs to create.
+        :rtype: dict
+        """
+        existing = set()
+        for client, data in clients.items():
+            for name in projects.get(data['id'], list()):
+                existing.add((client, name))
+        wanted = set()
+        for project in self.projects:
+            for task in self.projects[project].tasks:
+                wanted.add((project, task))
+        return {
+            'clients': sorted(set(self.projects) - set(clients)),
+            'projects': [list(item) for item in sorted(wanted - existing)]
+        }
+
+    def plan(self):
+        """
+        Calculate the exact set of Toggl clients and projects which must be created to synchronize Toggl workspace with
+        Project Laboratory projects and tasks.
+
+        Cached snapshot of Toggl workspace is used to calculate the difference and only in case something is missing
+        the snapshot is reconciled with the actual Toggl state, so no-op plans do not require any Toggl API requests.
+
+        :return: Dictionary object with list of clients names and list of `[client, project]` pairs to create.
+        :rtype: dict
+        """
+        clients, projects, loaded = self.snapshot()
+        plan = self.diff(clients=clients, projects=projects)
+        if (plan['clients'] or plan['projects']) and not loaded:
+            clients, projects, loaded = self.snapshot(refresh=True)
+            plan = self.diff(clients=clients, projects=projects)
+        self.state = (clients, projects)
+        return plan
+
     def posts(self, since, until):
         """
         Wrapper for :meth:`TogglReportsClient.posts` to pull list of Toggl posts between since and until dates.
@@ -95,41 +384,94 @@ class Client(object):
         :return: Normalized list of Toggl tasks aggregated by projects.
         :rtype: list
         """
-        return self.toggl.posts(since=since, until=until, wid=self.workspace['id'])
+        return self.toggl.posts(
+            since=since,
+            until=until,
+            wid=self.workspace['id'],
+            report=self.report,
+            user_ids=self.me['id']
+        )
 
-    def sync(self):
+    def refresh(self):
         """
-        Synchronize projects and tasks from Project Laboratory into Toggl.
+        Reload Project Laboratory projects and Toggl user and workspace metadata (useful for long living instances).
         """
-        clients = self.toggl.clients(wid=self.workspace['id'])
-        projects = self.toggl.projects(wid=self.workspace['id'])
-        for project in self.projects:
-            if project not in clients:
-                client = self.toggl.create_client(name=project, wid=self.workspace['id'])
-                clients.update(
-                    {
-                        client['name']: client
-                    }
-                )
-                del clients[client['name']]['name']
-                sleep(0.5)
-            if clients[project]['id'] not in projects:
-                projects.update(
-                    {
-                        clients[project]['id']: [
+        if self.preloaded is not None:
+            excluded = set(self.excluded_projects or ())
+            self.projects = {name: project for name, project in self.preloaded.items() if name not in excluded}
+        else:
+            projects = self.cached(
+                name='pl.projects',
+                loader=lambda: self.pl.projects(excluded_projects=self.excluded_projects)
+            )
+            # GOTCHA: Records are stored in persistent cache as plain JSON arrays, so they are rebuilt after loading
+            self.projects = {name: PLProject.from_json(data=project) for name, project in projects.items()}
+        self.me = self.cached(name='toggl.me', loader=self.toggl.me)
+        self.workspace = self.cached(
+            name='toggl.workspace',
+            loader=lambda: self.check_workspace(workspace=self.toggl.workspaces(name=self.workspace_name))
+        )
 
-                        ]
-                    }
-                )
-            for item in self.projects[project]['tasks']:
-                if item not in projects[clients[project]['id']]:
-                    self.toggl.create_project(cid=clients[project]['id'], name=item, wid=self.workspace['id'])
-                    sleep(0.5)
+    def snapshot(self, refresh=False):
+        """
+        Get the last known state of Toggl clients and projects (from persistent cache if configured).
+
+        :param refresh: Optional flag to ignore cached snapshot and list clients and projects from Toggl again.
+        :type refresh: bool
+        :return: Tuple with clients dictionary (by names), projects dictionary (by client IDs) and flag which shows if
+                 snapshot was actually loaded from Toggl.
+        :rtype: tuple
+        """
+        wid = self.workspace['id']
+        loaded = list()
+
+        def loader():
+            loaded.append(True)
+            # GOTCHA: Toggl projects are grouped by integer clients IDs which can not be used as JSON object keys as is
+            return {
+                'clients': self.toggl.clients(wid=wid),
+                'projects': list(self.toggl.projects(wid=wid).items())
+            }
+
+        if refresh and self.cache is not None:
+            self.cache.invalidate('toggl.snapshot')
+        snapshot = self.cached(name='toggl.snapshot', loader=loader)
+        return snapshot['clients'], dict(snapshot['projects']), bool(loaded)
+
+    def stream(self, since, until):
+        """
+        Wrapper for :meth:`TogglReportsClient.stream` to pull Toggl posts between since and until dates day by day.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type since: str
+        :param until: The end date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type until: str
+        :return: Generator of `(date, posts)` pairs sorted by date.
+        :rtype: generator
+        """
+        return self.toggl.stream(since=since, until=until, wid=self.workspace['id'], user_ids=self.me['id'])
+
+    def sync(self, max_workers=4):
+        """
+        Synchronize projects and tasks from Project Laboratory into Toggl.
+
+        :param max_workers: Optional limit of concurrent create requests (the actual rate is limited by Toggl client).
+        :type max_workers: int
+        """
+        self.apply(plan=self.plan(), max_workers=max_workers)
 
 
 class PL(object):
 
-    def __init__(self, app_key, base_url, user_key, log_level='info', verify=True):
+    # The default number of requests per second and the maximum burst size allowed to send to PL API
+    burst = 20
+    rate = 10
+
+    # The number of times to retry throttled or failed idempotent requests
+    retries = 3
+
+    def __init__(self, app_key, base_url, user_key, burst=None, connect_timeout=None, log_level='info', max_workers=8,
+                 rate=None, read_timeout=None, verify=True):
         """
         Initialize a new instance of class object to communicate with PL.
 
@@ -139,6 +481,19 @@ class PL(object):
         :type base_url: str
         :param user_key: The Project Laboratory authentication token to use instead of username and password.
         :type user_key: str
+        :param burst: Optional maximum number of requests allowed to send at once (shared by all instances with the same
+                      credentials).
+        :type burst: int
+        :param connect_timeout: Optional number of seconds to wait for connection to PL API.
+        :type connect_timeout: float
+        :param log_level: Optional logging level name to configure logging verbosity (default: `info`).
+        :type log_level: str
+        :param max_workers: Optional limit of concurrent requests to PL API (also used as connection pool size).
+        :type max_workers: int
+        :param rate: Optional number of requests per second allowed to send to PL API.
+        :type rate: float
+        :param read_timeout: Optional number of seconds to wait for PL API response.
+        :type read_timeout: float
         :param verify: Optional argument which allows to disable TLS connection verification and suppress warnings.
         :type verify: bool
         """
@@ -148,10 +503,22 @@ class PL(object):
             'app-key': app_key,
             'user-key': user_key
         }
-        self.session = requests.Session()
+        self.max_workers = max(1, max_workers)
+        self.transport = Transport(
+            limiter=RateLimiter.shared(
+                key=('pl', base_url, user_key),
+                rate=rate or self.rate,
+                burst=burst or self.burst
+            ),
+            connect_timeout=connect_timeout,
+            name='pl',
+            pool_size=self.max_workers,
+            read_timeout=read_timeout,
+            retries=self.retries,
+            verify=verify
+        )
         if not verify:
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-        self.verify = verify
 
     def add_post(self, date, description, minutes, project_id, task_id):
         """
@@ -243,18 +610,15 @@ class PL(object):
         """
         kwargs = self.normalize(items=kwargs)
         kwargs.update(self.data)
-        try:
-            response = self.session.post(
-                url='{base_url}/{endpoint}'.format(base_url=self.base_url, endpoint=endpoint),
-                json=kwargs,
-                verify=self.verify
-            )
-            logging.debug(msg=kwargs)
-            if response.status_code != 200:
-                sys.exit('{status_code}: {content}'.format(status_code=response.status_code, content=response.content))
-            return response.json()
-        except Exception as ex:
-            sys.exit(ex)
+        logging.debug(msg=kwargs)
+        return self.transport.request(
+            method='POST',
+            url='{base_url}/{endpoint}'.format(base_url=self.base_url, endpoint=endpoint),
+            endpoint=endpoint,
+            # GOTCHA: PL API uses POST requests for everything, but only list requests are safe to repeat on errors
+            idempotent=endpoint.endswith('/list'),
+            json=kwargs
+        )
 
     def projects(self, excluded_projects=None):
         """
@@ -263,32 +627,345 @@ class PL(object):
 
         :param excluded_projects: List of PL projects names to exclude from result.
         :type excluded_projects: list
-        :return: Dictionary object with combined information about PL projects and their tasks.
+        :return: Dictionary object with :class:`toggl2pl.models.PLProject` records (with their tasks) by names.
         :rtype: dict
         """
         projects = dict()
+        items = list()
         for project in self.list_projects()['projects']:
             if excluded_projects and project['name'] in excluded_projects:
                 continue
-            project['tasks'] = dict()
-            for task in self.list_tasks(project_id=project['id'])['tasks']['data']:
-                project['tasks'][task['title']] = task
-            projects.update(
+            items.append(project)
+        # Tasks are requested concurrently using shared session connection pool, while executor preserves projects order
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for project, tasks in zip(items, executor.map(lambda item: self.list_tasks(project_id=item['id']), items)):
+                projects.update(
+                    {
+                        project['name']: PLProject(
+                            id=project['id'],
+                            name=project['name'],
+                            tasks={task['title']: PLTask.from_json(data=task) for task in tasks['tasks']['data']}
+                        )
+                    }
+                )
+        return projects
+
+
+class RateLimiter(object):
+
+    # The registry of rate limiters shared between clients using the same upstream and credentials (keyed by hash of
+    # credentials and kept only while some client holds the rate limiter, so it does not grow in serve mode)
+    limiters = WeakValueDictionary()
+    lock = Lock()
+
+    def __init__(self, rate, burst=1):
+        """
+        Thread-safe token bucket rate limiter which adapts its rate to upstream throttling responses.
+
+        The rate is halved every time upstream asks to slow down and then slowly grows back to the configured value with
+        every successful request.
+
+        :param rate: The maximum number of requests per second.
+        :type rate: float
+        :param burst: The maximum number of requests allowed to send at once.
+        :type burst: int
+        """
+        self.blocked = 0.0
+        self.burst = max(1, burst)
+        self.lock = Lock()
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.timestamp = monotonic()
+        self.tokens = float(self.burst)
+
+    def acquire(self):
+        """
+        Block current thread until request is allowed to send.
+        """
+        delay = self.reserve()
+        if delay > 0:
+            sleep(delay)
+
+    def available(self):
+        """
+        Get the number of requests which can be sent right now without waiting (nothing is reserved).
+
+        :return: The number of spare tokens (zero while requests are paused by upstream).
+        :rtype: float
+        """
+        with self.lock:
+            now = monotonic()
+            if self.blocked > now:
+                return 0.0
+            return max(0.0, min(self.burst, self.tokens + (now - self.timestamp) * self.rate))
+
+    def backoff(self, delay):
+        """
+        Pause all requests for the specified number of seconds and slow down the rate of the next requests.
+
+        :param delay: The number of seconds to pause requests (e.g. value of `Retry-After` header).
+        :type delay: float
+        """
+        with self.lock:
+            self.blocked = max(self.blocked, monotonic() + delay)
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+    def configure(self, rate, burst=1):
+        """
+        Change the configured limits (the current rate is lowered immediately, while higher rate is reached gradually).
+
+        :param rate: The maximum number of requests per second.
+        :type rate: float
+        :param burst: The maximum number of requests allowed to send at once.
+        :type burst: int
+        """
+        with self.lock:
+            self.burst = max(1, burst)
+            self.max_rate = float(rate)
+            self.rate = min(self.rate, self.max_rate)
+            self.tokens = min(self.tokens, float(self.burst))
+
+    @classmethod
+    def lookup(cls, key):
+        """
+        Get rate limiter shared between clients using the same key without creating a new one.
+
+        :param key: Hashable object which identifies upstream and credentials.
+        :type key: tuple
+        :return: Rate limiter object or `None` in case no client uses the key at the moment.
+        :rtype: :class:`RateLimiter`
+        """
+        with cls.lock:
+            return cls.limiters.get(fingerprint(key=key))
+
+    def recover(self):
+        """
+        Gradually restore the configured rate after successful request.
+        """
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 16)
+
+    def reserve(self):
+        """
+        Reserve a slot for the next request without blocking (useful for both threads and coroutines).
+
+        :return: The number of seconds to wait before send request.
+        :rtype: float
+        """
+        with self.lock:
+            now = monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.timestamp) * self.rate)
+            self.timestamp = now
+            self.tokens -= 1
+            return max(0.0, self.blocked - now) + max(0.0, -self.tokens / self.rate)
+
+    @classmethod
+    def shared(cls, key, rate, burst=1):
+        """
+        Get rate limiter shared between all clients using the same key (i.e. the same upstream and credentials).
+
+        :param key: Hashable object which identifies upstream and credentials.
+        :type key: tuple
+        :param rate: The maximum number of requests per second (applied to existing rate limiter as well).
+        :type rate: float
+        :param burst: The maximum number of requests allowed to send at once (applied to existing rate limiter as well).
+        :type burst: int
+        :return: Rate limiter object (callers must keep the reference, since registry does not keep rate limiters).
+        :rtype: :class:`RateLimiter`
+        """
+        key = fingerprint(key=key)
+        with cls.lock:
+            limiter = cls.limiters.get(key)
+            if limiter is None:
+                limiter = cls.limiters[key] = cls(rate=rate, burst=burst)
+                return limiter
+        if (limiter.max_rate, limiter.burst) != (float(rate), max(1, burst)):
+            limiter.configure(rate=rate, burst=burst)
+        return limiter
+
+
+class ServiceClient(object):
+
+    def __init__(self, api_token, api_url, user_key, workspace, cache=None):
+        """
+        Initialize a new instance of class object to communicate with toggl2pl API service over keep-alive session.
+
+        :param api_token: The Toggl authentication token to use instead of username and password.
+        :type api_token: str
+        :param api_url: The API service root URL to connect and communicate.
+        :type api_url: str
+        :param user_key: The Project Laboratory authentication token to use instead of username and password.
+        :type user_key: str
+        :param workspace: The Toggl workspace name (case sensitive) to pull information from.
+        :type workspace: str
+        :param cache: Optional persistent cache to keep pulled posts with their ETags and revalidate them on next pull.
+        :type cache: :class:`toggl2pl.cache.MetadataCache`
+        """
+        self.api_url = api_url
+        self.cache = cache
+        self.data = {
+            'api_token': api_token,
+            'user_key': user_key,
+            'workspace': workspace
+        }
+        self.session = requests.Session()
+
+    def pull(self, since, until, excluded_projects=None):
+        """
+        Pull Toggl posts between since and until dates from API service as newline delimited JSON stream, so posts of
+        the first days can be processed while API service is still fetching the next days from Toggl.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to pull posts from Toggl.
+        :type since: str
+        :param until: The last date in ISO 8601 (`YYYY-MM-DD`) format to pull posts from Toggl.
+        :type until: str
+        :param excluded_projects: List of Project Laboratory projects names to exclude from pull.
+        :type excluded_projects: list
+        :return: Generator of `(date, post)` pairs sorted by date (posts are :class:`toggl2pl.models.Post` records).
+        :rtype: generator
+        :raises UpstreamError: In case API service failed to pull posts after streaming started.
+        """
+        name = 'pull:{since}:{until}'.format(since=since, until=until)
+        cached = self.cache.get(name=name) if self.cache else None
+        if cached and cached.get('excluded_projects') != excluded_projects:
+            cached = None
+        headers = {'Accept': 'application/x-ndjson'}
+        if cached:
+            # GOTCHA: API service responds with 304 and empty body in case posts did not change since previous pull
+            headers['If-None-Match'] = '"{etag}"'.format(etag=cached['etag'])
+        response = self.send(
+            method='GET',
+            endpoint='posts/pull',
+            headers=headers,
+            stream=True,
+            daily=True,
+            excluded_projects=excluded_projects,
+            since=since,
+            until=until
+        )
+        if response.status_code == 304:
+            logging.debug(msg='using cached posts pulled between {since} and {until}'.format(since=since, until=until))
+            yield from ((date, Post.from_json(data=post)) for date, posts in cached['days'] for post in posts)
+            return
+        if response.headers.get('Content-Type', '').startswith('application/json'):
+            # API service versions without streaming support respond with JSON array of `[date, posts]` pairs
+            items = ([date, post] for date, posts in response.json() for post in posts)
+        else:
+            items = (json.loads(line) for line in response.iter_lines() if line)
+        collected = list()
+        for item in items:
+            if isinstance(item, dict):
+                raise UpstreamError(
+                    yaml.dump(item, allow_unicode=True),
+                    status_code=item.get('status_code'),
+                    url=self.api_url
+                )
+            collected.append(item)
+            yield item[0], Post.from_json(data=item[1])
+        etag = response.headers.get('ETag', '').strip('"')
+        if self.cache and etag:
+            days = [[date, [post for _, post in group]] for date, group in groupby(collected, key=lambda item: item[0])]
+            self.cache.store(name=name, value={'days': days, 'etag': etag, 'excluded_projects': excluded_projects})
+
+    def push(self, items):
+        """
+        Push list of posts into Project Laboratory via API service using single batch request.
+
+        :param items: List of `(date, post)` pairs where post is in format returned by :meth:`pull` method.
+        :type items: list
+        :return: List of dictionaries with publishing status of each post.
+        :rtype: list
+        """
+        posts = list()
+        for date, (project, task, description, duration, rounded) in items:
+            posts.append(
                 {
-                    project['name']: project
+                    'date': date,
+                    'description': description,
+                    'duration': duration,
+                    'project': project,
+                    'rounded': rounded,
+                    'task': task
                 }
             )
-        return projects
+        return self.request(method='PUT', endpoint='posts/push-batch', posts=posts)
+
+    def request(self, method, endpoint, **kwargs):
+        """
+        Send provided keyword arguments together with credentials to the API service endpoint.
+
+        :param method: The HTTP method to use.
+        :type method: str
+        :param endpoint: The API service endpoint to send request.
+        :type endpoint: str
+        :param kwargs: Request payload specific to each endpoint (please see the API service reference).
+        :return: Object with API service endpoint response content.
+        :rtype: list
+        """
+        return self.send(method=method, endpoint=endpoint, **kwargs).json()
+
+    def send(self, method, endpoint, headers=None, stream=False, **kwargs):
+        """
+        Send provided keyword arguments together with credentials to the API service endpoint and check response status.
+
+        :param method: The HTTP method to use.
+        :type method: str
+        :param endpoint: The API service endpoint to send request.
+        :type endpoint: str
+        :param headers: Optional HTTP headers to send (e.g. `If-None-Match`).
+        :type headers: dict
+        :param stream: Optional flag to read response content lazily (e.g. using :meth:`requests.Response.iter_lines`).
+        :type stream: bool
+        :param kwargs: Request payload specific to each endpoint (please see the API service reference).
+        :return: The API service response (with 200 or 304 status code).
+        :rtype: :class:`requests.Response`
+        :raises UpstreamError: In case API service responded with error.
+        :raises UpstreamConnectionError: In case API service is not reachable.
+        """
+        kwargs.update(self.data)
+        try:
+            response = self.session.request(
+                method=method,
+                url='{api_url}/{endpoint}'.format(api_url=self.api_url, endpoint=endpoint),
+                headers=headers,
+                json=kwargs,
+                stream=stream
+            )
+        except requests.exceptions.ConnectionError as ce:
+            raise UpstreamConnectionError(str(ce), url=self.api_url) from ce
+        if response.status_code not in (200, 304):
+            raise UpstreamError(
+                yaml.dump(response.json(), allow_unicode=True),
+                content=response.content,
+                status_code=response.status_code,
+                url=self.api_url
+            )
+        return response
 
 
 class TogglAPIClient(object):
 
     base_url = 'https://api.track.toggl.com'
 
+    # The default number of requests per second and the maximum burst size allowed to send to Toggl API
+    burst = 4
+    rate = 2
+
+    # The number of times to retry throttled or failed idempotent requests
+    retries = 3
+
+    reports_api_version = 2
+    reports_api_url = '{base_url}/reports/api/v{reports_api_version}'.format(
+        base_url=base_url,
+        reports_api_version=reports_api_version
+    )
+
     toggl_api_version = 8
     toggl_api_url = '{base_url}/api/v{toggl_api_version}'.format(base_url=base_url, toggl_api_version=toggl_api_version)
 
-    def __init__(self, api_token, user_agent):
+    def __init__(self, api_token, user_agent, base_url=None, burst=None, connect_timeout=None, pool_size=10, rate=None,
+                 read_timeout=None):
         """
         Initialize a new instance of class object to communicate with Toggl.
 
@@ -296,9 +973,39 @@ class TogglAPIClient(object):
         :type api_token: str
         :param user_agent: The required user agent identifier used to gather application usage statistic.
         :type user_agent: str
+        :param base_url: Optional Toggl root URL to use instead of the official one (e.g. local stand-in server).
+        :type base_url: str
+        :param burst: Optional maximum number of requests allowed to send at once (shared by all instances with the same
+                      API token).
+        :type burst: int
+        :param connect_timeout: Optional number of seconds to wait for connection to Toggl API.
+        :type connect_timeout: float
+        :param pool_size: Optional maximum number of keep-alive connections to Toggl API.
+        :type pool_size: int
+        :param rate: Optional number of requests per second allowed to send to Toggl API.
+        :type rate: float
+        :param read_timeout: Optional number of seconds to wait for Toggl API response.
+        :type read_timeout: float
         """
         self.auth = (api_token, 'api_token')
-        self.session = requests.Session()
+        if base_url:
+            self.base_url = base_url.rstrip('/')
+            self.reports_api_url = '{base_url}/reports/api/v{reports_api_version}'.format(
+                base_url=self.base_url,
+                reports_api_version=self.reports_api_version
+            )
+            self.toggl_api_url = '{base_url}/api/v{toggl_api_version}'.format(
+                base_url=self.base_url,
+                toggl_api_version=self.toggl_api_version
+            )
+        self.transport = Transport(
+            limiter=RateLimiter.shared(key=('toggl', api_token), rate=rate or self.rate, burst=burst or self.burst),
+            connect_timeout=connect_timeout,
+            name='toggl',
+            pool_size=pool_size,
+            read_timeout=read_timeout,
+            retries=self.retries
+        )
         self.user_agent = user_agent
 
     def clients(self, wid):
@@ -357,30 +1064,26 @@ class TogglAPIClient(object):
             }
         )['data']
 
-    def get(self, endpoint, url=toggl_api_url, **kwargs):
+    def get(self, endpoint, url=None, **kwargs):
         """
         Send provided keyword arguments to the combination of Toggl API URL and endpoint using HTTP GET request.
 
         :param endpoint: The Toggl API endpoint to send data using HTTP GET request.
         :type endpoint: str
-        :param url: The Toggl API URL to send HTTP GET requests.
+        :param url: Optional Toggl API URL to send HTTP GET requests (default: :attr:`toggl_api_url`).
         :type url: str
         :param kwargs: Request parameters specific to each endpoint (please see the official Toggl API reference).
         :return: Dictionary object with Toggl API endpoint response content.
         :rtype: dict
         """
-        try:
-            response = self.session.get(
-                url='{url}/{endpoint}'.format(url=url, endpoint=endpoint),
-                auth=self.auth,
-                params=kwargs
-            )
-            logging.debug(msg=kwargs)
-            if response.status_code != 200:
-                sys.exit('{status_code}: {content}'.format(status_code=response.status_code, content=response.content))
-            return response.json()
-        except Exception as ex:
-            sys.exit(ex)
+        logging.debug(msg=kwargs)
+        return self.transport.request(
+            method='GET',
+            url='{url}/{endpoint}'.format(url=url or self.toggl_api_url, endpoint=endpoint),
+            endpoint=endpoint,
+            auth=self.auth,
+            params=kwargs
+        )
 
     def list_clients(self, wid):
         """
@@ -405,30 +1108,27 @@ class TogglAPIClient(object):
         """
         return self.get(endpoint='me')['data']
 
-    def post(self, endpoint, url=toggl_api_url, **kwargs):
+    def post(self, endpoint, url=None, **kwargs):
         """
         Send provided keyword arguments to the combination of Toggl API URL and endpoint using HTTP POST request.
 
         :param endpoint: The Toggl API endpoint to send data using HTTP POST request.
         :type endpoint: str
-        :param url: The Toggl API URL to send HTTP POST requests.
+        :param url: Optional Toggl API URL to send HTTP POST requests (default: :attr:`toggl_api_url`).
         :type url: str
         :param kwargs: Request payload specific to each endpoint (please see the official Toggl API reference).
         :return: Dictionary object with Toggl API endpoint response content.
         :rtype: dict
         """
-        try:
-            response = self.session.post(
-                url='{url}/{endpoint}'.format(url=url, endpoint=endpoint),
-                auth=self.auth,
-                json=kwargs
-            )
-            logging.debug(msg=kwargs)
-            if response.status_code != 200:
-                sys.exit('{status_code}: {content}'.format(status_code=response.status_code, content=response.content))
-            return response.json()
-        except Exception as ex:
-            sys.exit(ex)
+        logging.debug(msg=kwargs)
+        return self.transport.request(
+            method='POST',
+            url='{url}/{endpoint}'.format(url=url or self.toggl_api_url, endpoint=endpoint),
+            endpoint=endpoint,
+            idempotent=False,
+            auth=self.auth,
+            json=kwargs
+        )
 
     def workspaces(self, name=None):
         """
@@ -449,13 +1149,21 @@ class TogglAPIClient(object):
 
 class TogglReportsClient(TogglAPIClient):
 
-    base_url = 'https://api.track.toggl.com'
+    def __init__(self, api_token, user_agent, replica=None, **kwargs):
+        """
+        Initialize a new instance of class object to fetch Toggl reports.
 
-    reports_api_version = 2
-    reports_api_url = '{base_url}/reports/api/v{reports_api_version}'.format(
-        base_url=base_url,
-        reports_api_version=reports_api_version
-    )
+        :param api_token: The unique authentication token to use instead of username and password.
+        :type api_token: str
+        :param user_agent: The required user agent identifier used to gather application usage statistic.
+        :type user_agent: str
+        :param replica: Optional local replica of time entries to build reports from (only days which are not
+                        replicated yet or may still change are fetched from Toggl).
+        :type replica: :class:`toggl2pl.replica.Replica`
+        :param kwargs: Additional keyword arguments to pass to :class:`TogglAPIClient` constructor.
+        """
+        super().__init__(api_token=api_token, user_agent=user_agent, **kwargs)
+        self.replica = replica
 
     @staticmethod
     def fmt(description, width=80):
@@ -475,41 +1183,155 @@ class TogglReportsClient(TogglAPIClient):
             description += '.'
         return '\n'.join(textwrap.wrap(description.strip(), width=width))
 
-    def get(self, endpoint, url=reports_api_url, **kwargs):
+    def get(self, endpoint, url=None, **kwargs):
         """
         Send provided keyword arguments to the combination of Toggl Reports API URL and endpoint using HTTP GET request.
 
         :param endpoint: The Toggl Reports API endpoint to send data using HTTP GET request.
         :type endpoint: str
-        :param url: The Toggl Reports API URL to send HTTP GET requests.
+        :param url: Optional Toggl Reports API URL to send HTTP GET requests (default: :attr:`reports_api_url`).
         :type url: str
         :param kwargs: Request parameters specific to each endpoint (please see the official Toggl API reference).
         :return: Dictionary object with Toggl Reports API endpoint response content.
         :rtype: dict
         """
-        return super().get(endpoint=endpoint, url=url, **kwargs)
+        return super().get(endpoint=endpoint, url=url or self.reports_api_url, **kwargs)
 
-    def details(self, wid, **kwargs):
+    def details(self, wid, max_workers=2, **kwargs):
         """
-        Fetch detailed information about tasks related to the specified Toggl workspace.
+        Fetch detailed information about tasks related to the specified Toggl workspace page by page.
+
+        The first page is used to calculate the total number of pages, then the rest of pages are requested concurrently
+        using a small sliding window, so only a few pages are kept in memory at the same time.
 
         :param wid: The Toggl workspace ID to query information about tasks.
         :type wid: int
+        :param max_workers: Optional limit of concurrently requested pages (keep it low to respect Toggl rate limits).
+        :type max_workers: int
         :param kwargs: Parameters to query Toggl Reports API (please see official Toggl Reports API for details).
-        :return: Dictionary object with detailed information about recorded tasks.
-        :rtype: dict
+        :return: Generator of :class:`toggl2pl.models.TimeEntry` records in order returned by Toggl Reports API.
+        :rtype: generator
         """
+        if 'user_ids' not in kwargs:
+            kwargs['user_ids'] = self.me()['id']
         kwargs.update(
             {
                 'user_agent': self.user_agent,
-                'user_ids': self.me()['id'],
                 'workspace_id': wid
             }
         )
-        return self.get(
-            endpoint='details',
-            **kwargs
-        )
+        report = self.get(endpoint='details', page=1, **kwargs)
+        yield from (TimeEntry.from_json(data=entry) for entry in report['data'])
+        pages = math.ceil(report.get('total_count', 0) / (report.get('per_page') or len(report['data']) or 1))
+        if pages < 2:
+            return
+        max_workers = max(1, max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = deque()
+            for page in range(2, pages + 1):
+                futures.append(executor.submit(self.get, endpoint='details', page=page, **kwargs))
+                if len(futures) >= max_workers:
+                    yield from (TimeEntry.from_json(data=entry) for entry in futures.popleft().result()['data'])
+            while futures:
+                yield from (TimeEntry.from_json(data=entry) for entry in futures.popleft().result()['data'])
+
+    def days(self, since, until, wid, **kwargs):
+        """
+        Fetch Toggl tasks for the whole date range using a single :meth:`details` pass and split them into daily posts.
+
+        Time entries are partitioned by their start date (in the Toggl user timezone), so each post covers exactly one
+        day, client and project and can be published using its own date.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type since: str
+        :param until: The end date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type until: str
+        :param wid: The unique Toggl workspace ID to list tasks.
+        :type wid: int
+        :param kwargs: Additional parameters to pass to :meth:`details` method.
+        :return: List of `(date, posts)` pairs sorted by date (days without time entries are omitted).
+        :rtype: list
+        """
+        if self.replica is not None:
+            return self.replicated(since=since, until=until, wid=wid, daily=True, **kwargs).days()
+        return Aggregator(daily=True).update(entries=self.details(since=since, until=until, wid=wid, **kwargs)).days()
+
+    @staticmethod
+    def flatten(report):
+        """
+        Convert Toggl Reports API `summary` report grouped by projects and time entries into time entries in `details`
+        format (one entry per client, project and description with the total duration), so they can be aggregated the
+        same way as detailed time entries.
+
+        :param report: The `summary` report requested with `projects` grouping and `time_entries` subgrouping.
+        :type report: dict
+        :return: List of :class:`toggl2pl.models.TimeEntry` records without dates and IDs.
+        :rtype: list
+        :raises KeyError: In case report does not have expected structure (e.g. different grouping).
+        """
+        return [
+            TimeEntry(
+                client=group['title']['client'],
+                project=group['title']['project'],
+                description=item['title']['time_entry'],
+                dur=item['time'],
+                date=None,
+                id=None
+            ) for group in report['data'] for item in group['items']
+        ]
+
+    @staticmethod
+    def group(entries, tasks=None):
+        """
+        Group Toggl time entries by clients, projects and descriptions and sum their durations.
+
+        :param entries: Iterable of :class:`toggl2pl.models.TimeEntry` records (consumed lazily).
+        :type entries: iterable
+        :param tasks: Optional dictionary object returned by previous call to continue aggregation with.
+        :type tasks: dict
+        :return: Dictionary object with machine-readable information about Toggl tasks durations in seconds.
+        :rtype: dict
+        :raises AssertionError: In case some time entry does not have client, project or description.
+        """
+        if tasks is None:
+            tasks = dict()
+        for task in entries:
+            # GOTCHA: We want to have at least the next information about task: client, project and description. In case
+            # some field is not filed the program must exit and ask to fill task details before continue with export.
+            if None in (task.client, task.project, task.description):
+                raise AssertionError(
+                    {
+                        'client': task.client,
+                        'project': task.project,
+                        'description': task.description
+                    }
+                )
+            duration = int(task.dur / 1000)
+            if task.client not in tasks:
+                tasks.update(
+                    {
+                        task.client: {
+                            task.project: {
+                                task.description: duration
+                            }
+                        }
+                    }
+                )
+                continue
+            if task.project not in tasks[task.client]:
+                tasks[task.client][task.project] = {
+                    task.description: duration
+                }
+                continue
+            if task.description not in tasks[task.client][task.project]:
+                tasks[task.client][task.project].update(
+                    {
+                        task.description: duration
+                    }
+                )
+                continue
+            tasks[task.client][task.project][task.description] += duration
+        return tasks
 
     def list_clients(self, wid):
         """
@@ -534,10 +1356,16 @@ class TogglReportsClient(TogglAPIClient):
         """
         return super().get(endpoint='me')['data']
 
-    def posts(self, since, until, wid):
+    def posts(self, since, until, wid, report='details', **kwargs):
         """
-        High-level wrapper for :meth:`tasks` method to aggregate Toggl tasks by projects, format descriptions and round
-        total amount of minutes per project.
+        Stream Toggl time entries through :class:`Aggregator` to aggregate them by projects, format descriptions and
+        round total amount of minutes per project.
+
+        By default time entries are fetched page by page using :meth:`details` report. The :meth:`summary` report is
+        opt-in: durations are already summed by Toggl, so only one entry per client, project and description is
+        transferred, but the sum is truncated to seconds once instead of every time entry duration, so posts may be a
+        few seconds longer (and rarely get different rounded minutes) in case Toggl durations have milliseconds. The
+        :meth:`details` report is used in case summary report is not available or has unexpected format.
 
         :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
         :type since: str
@@ -545,30 +1373,28 @@ class TogglReportsClient(TogglAPIClient):
         :type until: str
         :param wid: The unique Toggl workspace ID to list tasks.
         :type wid: int
+        :param report: Optional report to fetch time entries from: `details` (default) or `summary` (with fallback).
+        :type report: str
+        :param kwargs: Additional parameters to pass to :meth:`summary` or :meth:`details` method.
         :return: Normalized list of Toggl tasks aggregated by projects.
         :rtype: list
         """
-        posts = list()
-        for client, projects in sorted(self.tasks(since, until, wid).items()):
-            for project, data in sorted(projects.items()):
-                durations = 0
-                descriptions = list()
-                for description, duration in sorted(data.items()):
-                    durations += duration
-                    descriptions.append(self.fmt(description=description))
-                minutes, seconds = divmod(durations, 60)
-                duration = minutes + round(seconds / 60)
-                hours, minutes = divmod(duration, 60)
-                posts.append(
-                    [
-                        client,
-                        project,
-                        '\n'.join(descriptions),
-                        duration,
-                        hours * 60 + rounded(minutes)
-                    ]
-                )
-        return posts
+        if self.replica is not None:
+            return self.replicated(since=since, until=until, wid=wid, **kwargs).posts()
+        if report == 'summary':
+            try:
+                entries = self.summary(since=since, until=until, wid=wid, **kwargs)
+            except UpstreamError as ue:
+                # GOTCHA: Authentication and throttling errors would be the same for details report, so only errors of
+                # summary report itself fall back to details report.
+                if ue.status_code in (401, 403, 429):
+                    raise
+                logging.warning(msg='summary report failed, falling back to details report: {ue}'.format(ue=ue))
+            except (KeyError, TypeError) as ex:
+                logging.warning(msg='unexpected summary report, falling back to details report: {ex}'.format(ex=ex))
+            else:
+                return Aggregator().update(entries=entries).posts()
+        return Aggregator().update(entries=self.details(since=since, until=until, wid=wid, **kwargs)).posts()
 
     def projects(self, wid):
         """
@@ -597,7 +1423,100 @@ class TogglReportsClient(TogglAPIClient):
             return projects
         return projects
 
-    def tasks(self, since, until, wid):
+    def replicated(self, since, until, wid, daily=False, **kwargs):
+        """
+        Sync local replica with Toggl (days which are not replicated yet or may still change are fetched using
+        :meth:`details` report) and sum replicated time entries durations of the period.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type since: str
+        :param until: The end date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type until: str
+        :param wid: The unique Toggl workspace ID to list tasks.
+        :type wid: int
+        :param daily: Optional flag to sum durations of every day separately.
+        :type daily: bool
+        :param kwargs: Additional parameters to pass to :meth:`details` method.
+        :return: Aggregator with durations of the period to build posts from.
+        :rtype: :class:`Aggregator`
+        """
+        for start, end in self.replica.plan(since=since, until=until):
+            entries = self.details(since=start, until=end, wid=wid, **kwargs)
+            logging.debug(
+                msg='replicated {count} time entries from {start} to {end}'.format(
+                    count=self.replica.store(since=start, until=end, entries=entries),
+                    end=end,
+                    start=start
+                )
+            )
+        aggregator = Aggregator(daily=daily)
+        aggregator.durations.update(self.replica.durations(since=since, until=until, daily=daily))
+        return aggregator
+
+    def stream(self, since, until, wid, **kwargs):
+        """
+        Fetch Toggl tasks sorted by start time and yield daily posts as soon as all time entries of the day are fetched.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type since: str
+        :param until: The end date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type until: str
+        :param wid: The unique Toggl workspace ID to list tasks.
+        :type wid: int
+        :param kwargs: Additional parameters to pass to :meth:`details` method.
+        :return: Generator of `(date, posts)` pairs sorted by date (days without time entries are omitted).
+        :rtype: generator
+        """
+        if self.replica is not None:
+            return iter(self.replicated(since=since, until=until, wid=wid, daily=True, **kwargs).days())
+        # GOTCHA: Days are emitted once time entry of a later date is received, so the report order must be ascending
+        kwargs.update({'order_desc': 'off', 'order_field': 'date'})
+        entries = self.details(since=since, until=until, wid=wid, **kwargs)
+        return Aggregator(daily=True).stream(entries=entries)
+
+    @staticmethod
+    def summarize(tasks):
+        """
+        Aggregate Toggl tasks by projects, format descriptions and round total amount of minutes per project.
+
+        :param tasks: Dictionary object with Toggl tasks durations in format returned by :meth:`group`.
+        :type tasks: dict
+        :return: Normalized list of Toggl tasks aggregated by projects.
+        :rtype: list
+        """
+        return Aggregator.emit(
+            items=(
+                ((client, project, description), duration)
+                for client, projects in sorted(tasks.items())
+                for project, data in sorted(projects.items())
+                for description, duration in sorted(data.items())
+            )
+        )
+
+    def summary(self, wid, **kwargs):
+        """
+        Fetch durations of tasks related to the specified Toggl workspace already summed by Toggl per project and time
+        entry description using single `summary` report request.
+
+        :param wid: The Toggl workspace ID to query information about tasks.
+        :type wid: int
+        :param kwargs: Parameters to query Toggl Reports API (please see official Toggl Reports API for details).
+        :return: List of time entries in :meth:`flatten` format (one entry per client, project and description).
+        :rtype: list
+        """
+        if 'user_ids' not in kwargs:
+            kwargs['user_ids'] = self.me()['id']
+        kwargs.update(
+            {
+                'grouping': 'projects',
+                'subgrouping': 'time_entries',
+                'user_agent': self.user_agent,
+                'workspace_id': wid
+            }
+        )
+        return self.flatten(report=self.get(endpoint='summary', **kwargs))
+
+    def tasks(self, since, until, wid, **kwargs):
         """
         Combine clients, projects and tasks information into single object with machine-readable format.
 
@@ -607,47 +1526,147 @@ class TogglReportsClient(TogglAPIClient):
         :type until: str
         :param wid: The unique Toggl workspace ID to list tasks.
         :type wid: int
+        :param kwargs: Additional parameters to pass to :meth:`details` method.
         :return: Dictionary object with machine-readable information about Toggl tasks during specified range of dates.
         :rtype: dict
         """
-        tasks = dict()
-        for task in self.details(wid=wid, since=since, until=until)['data']:
-            # GOTCHA: We want to have at least the next information about task: client, project and description. In case
-            # some field is not filed the program must exit and ask to fill task details before continue with export.
-            if None in (task['client'], task['project'], task['description']):
-                raise AssertionError(
-                    {
-                        'client': task['client'],
-                        'project': task['project'],
-                        'description': task['description']
-                    }
-                )
-            duration = int(task['dur'] / 1000)
-            if task['client'] not in tasks:
-                tasks.update(
-                    {
-                        task['client']: {
-                            task['project']: {
-                                task['description']: duration
-                            }
-                        }
-                    }
-                )
-                continue
-            if task['project'] not in tasks[task['client']]:
-                tasks[task['client']][task['project']] = {
-                    task['description']: duration
-                }
-                continue
-            if task['description'] not in tasks[task['client']][task['project']]:
-                tasks[task['client']][task['project']].update(
-                    {
-                        task['description']: duration
-                    }
-                )
-                continue
-            tasks[task['client']][task['project']][task['description']] += duration
-        return tasks
+        if self.replica is not None:
+            tasks = dict()
+            aggregator = self.replicated(since=since, until=until, wid=wid, **kwargs)
+            for (client, project, description), duration in aggregator.durations.items():
+                tasks.setdefault(client, dict()).setdefault(project, dict())[description] = duration
+            return tasks
+        return self.group(entries=self.details(wid=wid, since=since, until=until, **kwargs))
+
+
+class Transport(object):
+
+    # The default number of seconds to wait for connection establishment and for upstream response
+    connect_timeout = 5
+    read_timeout = 60
+
+    def __init__(self, limiter, connect_timeout=None, name='upstream', pool_size=10, read_timeout=None, retries=3,
+                 verify=True):
+        """
+        HTTP transport shared by upstream API clients with keep-alive connection pool, timeouts and retry policy.
+
+        Failed connection attempts are retried for any request (since request was not sent yet), while timeouts and
+        server errors are retried with exponential backoff for idempotent requests only. Upstream errors are raised as
+        :class:`UpstreamError` exceptions, so callers may decide to retry, skip particular item or stop. Requests
+        outcomes and durations are recorded into :mod:`toggl2pl.metrics` registry.
+
+        :param limiter: The rate limiter to acquire before every request.
+        :type limiter: :class:`RateLimiter`
+        :param connect_timeout: Optional number of seconds to wait for connection establishment.
+        :type connect_timeout: float
+        :param name: Optional upstream name used as metrics label (e.g. `pl` or `toggl`).
+        :type name: str
+        :param pool_size: Optional maximum number of keep-alive connections per host (set it to the number of workers).
+        :type pool_size: int
+        :param read_timeout: Optional number of seconds to wait for upstream response.
+        :type read_timeout: float
+        :param retries: Optional number of times to retry failed requests.
+        :type retries: int
+        :param verify: Optional argument which allows to disable TLS connection verification.
+        :type verify: bool
+        """
+        self.limiter = limiter
+        self.name = name
+        self.retries = retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_maxsize=max(1, pool_size),
+            max_retries=Retry(total=retries, connect=retries, read=False, redirect=False, status=0, backoff_factor=0.5)
+        )
+        self.session.mount(prefix='http://', adapter=adapter)
+        self.session.mount(prefix='https://', adapter=adapter)
+        self.timeout = (connect_timeout or self.connect_timeout, read_timeout or self.read_timeout)
+        self.verify = verify
+
+    def request(self, method, url, endpoint=None, idempotent=True, **kwargs):
+        """
+        Send HTTP request to upstream API and decode JSON response content.
+
+        :param method: The HTTP method to use.
+        :type method: str
+        :param url: The URL to send request.
+        :type url: str
+        :param endpoint: Optional API endpoint to use as metrics label (default: the URL path).
+        :type endpoint: str
+        :param idempotent: Optional flag which shows if request is safe to repeat on server errors and timeouts.
+        :type idempotent: bool
+        :param kwargs: Additional keyword arguments to pass to :meth:`requests.Session.request`.
+        :return: Object with upstream API response content.
+        :raises UpstreamError: In case upstream API responded with unexpected status code or content.
+        :raises UpstreamConnectionError: In case upstream API is not reachable or did not respond in time.
+        """
+        started = perf_counter()
+        status = 'error'
+        try:
+            response = send(
+                session=self.session,
+                method=method,
+                url=url,
+                limiter=self.limiter,
+                idempotent=idempotent,
+                retries=self.retries,
+                max_delay=self.timeout[1],
+                timeout=self.timeout,
+                verify=self.verify,
+                **kwargs
+            )
+            status = response.status_code
+        finally:
+            metrics.observe_upstream(
+                upstream=self.name,
+                path=endpoint or urllib3.util.parse_url(url).path or '/',
+                method=method,
+                status=status,
+                seconds=perf_counter() - started
+            )
+        if response.status_code != 200:
+            raise UpstreamError(
+                '{status_code}: {content}'.format(status_code=response.status_code, content=response.content),
+                content=response.content,
+                status_code=response.status_code,
+                url=url
+            )
+        try:
+            return response.json()
+        except ValueError as ve:
+            raise UpstreamError(
+                'invalid response: {content}'.format(content=response.content),
+                content=response.content,
+                status_code=response.status_code,
+                url=url
+            ) from ve
+
+
+class UpstreamError(Exception):
+
+    def __init__(self, message, content=None, status_code=None, url=None):
+        """
+        Exception raised in case upstream API (PL, Toggl or toggl2pl API service) request failed.
+
+        :param message: Human-readable error description.
+        :type message: str
+        :param content: Optional upstream response content.
+        :type content: bytes
+        :param status_code: Optional upstream response HTTP status code (not set in case response was not received).
+        :type status_code: int
+        :param url: Optional URL of the failed request.
+        :type url: str
+        """
+        super().__init__(message)
+        self.content = content
+        self.status_code = status_code
+        self.url = url
+
+
+class UpstreamConnectionError(UpstreamError):
+    """
+    Exception raised in case upstream API is not reachable or did not respond in time.
+    """
 
 
 def rounded(minutes, base=5):
@@ -665,3 +1684,118 @@ def rounded(minutes, base=5):
     if round(float(mod) / base):
         return div * base + 5
     return div * base
+
+
+def retry_delay(status_code, headers, attempt, idempotent=True, backoff=0.5, max_delay=60):
+    """
+    Calculate delay before retry of the failed request (`Retry-After` header value or exponential backoff).
+
+    The `Retry-After` header may contain either the number of seconds or HTTP date, while malformed values are ignored
+    in favor of exponential backoff. The delay is limited by `max_delay`, so misbehaving upstream can not make the
+    caller sleep for hours.
+
+    :param status_code: The HTTP response status code.
+    :type status_code: int
+    :param headers: The HTTP response headers.
+    :type headers: dict
+    :param attempt: The number of the current attempt (starting from zero).
+    :type attempt: int
+    :param idempotent: Optional flag which shows if request is safe to repeat on server errors.
+    :type idempotent: bool
+    :param backoff: Optional base number of seconds for exponential backoff.
+    :type backoff: float
+    :param max_delay: Optional maximum number of seconds to wait (e.g. the upstream response timeout).
+    :type max_delay: float
+    :return: The number of seconds to wait before retry or `None` in case request must not be retried.
+    :rtype: float
+    """
+    if status_code != 429 and not (idempotent and status_code >= 500):
+        return None
+    delay = backoff * 2 ** attempt
+    value = headers.get('Retry-After')
+    if value is not None:
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(value).timestamp() - time()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                pass
+    if not math.isfinite(delay):
+        delay = max_delay
+    return min(max(0.0, delay), max_delay)
+
+
+def connect_failed(ex):
+    """
+    Check if request failed before it was sent to upstream (connection was refused or not established in time).
+
+    :param ex: The exception raised by :meth:`requests.Session.request`.
+    :type ex: :class:`requests.exceptions.RequestException`
+    :return: Boolean flag which shows if connection to upstream was not established.
+    :rtype: bool
+    """
+    if isinstance(ex, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(ex.args[0], 'reason', None) if ex.args else None
+    # NOTE: New connection errors are connect timeout errors subclasses in urllib3
+    return isinstance(reason, urllib3.exceptions.ConnectTimeoutError)
+
+
+def send(session, method, url, limiter, idempotent=True, retries=3, backoff=0.5, max_delay=60, **kwargs):
+    """
+    Send HTTP request respecting rate limits and retry throttled (and failed idempotent) requests.
+
+    :param session: The HTTP session to use.
+    :type session: :class:`requests.Session`
+    :param method: The HTTP method to use.
+    :type method: str
+    :param url: The URL to send request.
+    :type url: str
+    :param limiter: The rate limiter to acquire before every attempt.
+    :type limiter: :class:`RateLimiter`
+    :param idempotent: Optional flag which shows if request is safe to repeat on server errors and timeouts.
+    :type idempotent: bool
+    :param retries: Optional number of times to retry failed request.
+    :type retries: int
+    :param backoff: Optional base number of seconds for exponential backoff.
+    :type backoff: float
+    :param max_delay: Optional maximum number of seconds to wait before retry (even if upstream asks to wait longer).
+    :type max_delay: float
+    :param kwargs: Additional keyword arguments to pass to :meth:`requests.Session.request`.
+    :return: The HTTP response of the last attempt.
+    :rtype: :class:`requests.Response`
+    :raises UpstreamConnectionError: In case connection failed or timed out and request must not be retried.
+    """
+    for attempt in range(retries + 1):
+        limiter.acquire()
+        try:
+            response = session.request(method=method, url=url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as ex:
+            # GOTCHA: Failed connection attempts are already retried by transport adapter, so they are raised as is and
+            # only requests which could reach upstream are repeated here (and only if they are safe to repeat).
+            if not idempotent or attempt == retries or connect_failed(ex=ex):
+                raise UpstreamConnectionError(str(ex), url=url) from ex
+            delay = backoff * 2 ** attempt
+            logging.debug(msg='{ex}: retry {url} in {delay} seconds'.format(ex=ex, url=url, delay=delay))
+            sleep(delay)
+            continue
+        delay = retry_delay(
+            status_code=response.status_code,
+            headers=response.headers,
+            attempt=attempt,
+            idempotent=idempotent,
+            backoff=backoff,
+            max_delay=max_delay
+        )
+        if delay is None:
+            limiter.recover()
+            return response
+        if attempt == retries:
+            return response
+        logging.debug(msg='{status_code}: retry {url} in {delay} seconds'.format(
+            status_code=response.status_code,
+            url=url,
+            delay=delay
+        ))
+        limiter.backoff(delay=delay)
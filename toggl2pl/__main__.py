@@ -1,17 +1,16 @@
+# GOTCHA: Presentation and server mode dependencies (tabulate, tqdm, Flask, Elasticsearch, waitress and paste) are
+# imported by functions which actually use them to keep client mode startup fast. Please keep module level imports
+# limited to what every command needs (the startup budget is checked by tests).
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from paste.translogger import TransLogger
+from itertools import groupby
 from pathlib import Path
-from requests.exceptions import ConnectionError
-from tabulate import tabulate
-from toggl2pl.__serve__ import create_app
-from tqdm import tqdm
-from toggl2pl import Client
-from waitress import serve
+from toggl2pl.cache import MetadataCache, fingerprint
+from toggl2pl import Client, ServiceClient, UpstreamError
 import argparse
 import logging
 import os
 import platform
-import requests
 import sys
 import yaml
 
@@ -20,8 +19,158 @@ CONFIG_PATH = '/.toggl2pl/config.yml'
 if platform.system() == 'Windows':
     CONFIG_PATH = CONFIG_PATH.replace('/', '\\')
 
+CACHE_TTL = 86400
+
+# The number of posts pushed via API service at once (each batch is recorded in the push ledger before the next one)
+PUSH_BATCH_SIZE = 20
+
 ROUND_BASE = os.getenv('ROUND_BASE', 5)
 
+# The number of days which must pass before replicated day is not fetched from Toggl again (it may still change)
+REPLICA_RECHECK = 2
+
+
+def confirm(why_run=False):
+    """
+    Ask about confirmation before actual data export (or exit in `why-run` mode once data is previewed).
+
+    :param why_run: Optional flag to enable `why-run` mode (preview posts without publishing).
+    :type why_run: bool
+    """
+    if why_run:
+        sys.exit()
+    try:
+        input('\nPress Enter to continue or Ctrl-C to abort...')
+    except KeyboardInterrupt:
+        sys.exit('\nExport interrupted, cancelling operation...')
+
+
+def credentials(config, jobs=1):
+    """
+    Build keyword arguments to create :class:`toggl2pl.Client` from configuration options.
+
+    :param config: Dictionary object with configuration options loaded from file.
+    :type config: dict
+    :param jobs: Optional number of posts to publish concurrently (used as the minimal PL connection pool size).
+    :type jobs: int
+    :return: Dictionary object with client keyword arguments except persistent cache.
+    :rtype: dict
+    """
+    return {
+        'api_token': config['toggl']['api_token'],
+        'base_url': config['pl']['base_url'],
+        'excluded_projects': config['pl']['excluded_projects'],
+        'limits': {
+            'pl': config['pl'].get('limits', dict()),
+            'toggl': config['toggl'].get('limits', dict())
+        },
+        'log_level': config['log_level'],
+        'max_workers': max(config['pl'].get('max_workers', 8), jobs),
+        'report': config['toggl'].get('report', 'details'),
+        'toggl_url': config['toggl'].get('base_url'),
+        'user_key': config['pl']['user_key'],
+        'verify': config['pl']['verify'],
+        'workspace': config['toggl']['workspace']
+    }
+
+
+def export_team(known_args, tablefmt='fancy_grid'):
+    """
+    Export posts of several team members at once: PL projects are loaded once and shared by all members, posts are
+    pulled concurrently, reviewed using single consolidated table and published using single bounded pool of workers.
+
+    :param known_args: The argument parser namespace object with supplied arguments.
+    :type known_args: :obj:`argparse.Namespace`
+    :param tablefmt: The table format to use (recommended formats are: plain, simple, rst and fancy_grid).
+    :type tablefmt: str
+    """
+    from tabulate import tabulate
+    from toggl2pl.team import Member, Team, discover
+    from tqdm import tqdm
+    since = known_args.since or known_args.date
+    until = known_args.until or known_args.date
+    if since > until:
+        sys.exit('The --since date {since} is later than the --until date {until}'.format(since=since, until=until))
+    members = list()
+    for name, path in discover(paths=known_args.configs):
+        config = load_config(config=path)
+        members.append(
+            Member(
+                name=name,
+                credentials=dict(
+                    credentials(config=config),
+                    replica=toggl_replica(config=config, path=path, refresh=known_args.refresh_cache)
+                ),
+                cache=metadata_cache(config=config, path=path, refresh=known_args.refresh_cache),
+                ledger=push_ledger(config=config, path=path)
+            )
+        )
+    if not members:
+        sys.exit('No team members configuration files found.')
+    team = Team(members=members, jobs=known_args.jobs, rounding=known_args.round)
+    team.connect()
+    items = team.pull(since=since, until=until)
+    print(
+        tabulate(
+            tabular_data=[[member.name, date] + list(post) for member, date, post in items],
+            headers=('User', 'Date', 'Project', 'Task', 'Description', 'Real Duration (min)', 'Rounded Duration (min)'),
+            tablefmt=tablefmt
+        )
+    )
+    failed = list()
+    if not known_args.why_run:
+        confirm()
+        with tqdm(total=len(items), desc='posts') as progress:
+            failed = team.push(items=items, progress=lambda: progress.update(1))
+    rows = [
+        (
+            item['name'],
+            item['posts'],
+            item['skipped'],
+            round(item['pull'], 2),
+            item['published'],
+            item['failed'],
+            round(item['throughput'], 2),
+            round(item['latency_mean'] * 1000),
+            round(item['latency_max'] * 1000),
+            item['error'] or ''
+        ) for item in team.summary()
+    ]
+    headers = (
+        'User', 'Posts', 'Skipped', 'Pull (s)', 'Published', 'Failed', 'Posts/s', 'Mean Latency (ms)',
+        'Max Latency (ms)', 'Error'
+    )
+    print(tabulate(tabular_data=rows, headers=headers, tablefmt=tablefmt))
+    if failed:
+        sys.exit(yaml.dump(failed, allow_unicode=True))
+
+
+def history(known_args):
+    """
+    Show posts recorded in the push ledger as published for the work done in the specified period.
+
+    :param known_args: The argument parser namespace object with supplied arguments.
+    :type known_args: :obj:`argparse.Namespace`
+    """
+    from tabulate import tabulate
+    config = load_config(config=known_args.config)
+    ledger = push_ledger(config=config, path=known_args.config)
+    if ledger is None:
+        sys.exit('The push ledger is disabled in configuration file.')
+    posts = ledger.posts(since=known_args.since or known_args.date, until=known_args.until or known_args.date)
+    rows = [
+        (
+            post['date'],
+            post['project'],
+            post['task'],
+            post['description'],
+            post['minutes'],
+            datetime.fromtimestamp(post['published']).strftime('%Y-%m-%d %H:%M:%S')
+        ) for post in posts
+    ]
+    headers = ('Date', 'Project', 'Task', 'Description', 'Published Duration (min)', 'Published At')
+    print(tabulate(tabular_data=rows, headers=headers, tablefmt='fancy_grid'))
+
 
 def load_config(config):
     """
@@ -39,6 +188,37 @@ def load_config(config):
         sys.exit(nf)
 
 
+def metadata_cache(config, path, refresh=False):
+    """
+    Create persistent metadata cache stored next to the configuration file (unless disabled with zero `cache_ttl`).
+
+    :param config: Dictionary object with configuration options loaded from file.
+    :type config: dict
+    :param path: The path to configuration file used to load configuration options.
+    :type path: str
+    :param refresh: Optional flag to ignore existing cache entries and fetch metadata again.
+    :type refresh: bool
+    :return: Metadata cache object or `None` in case cache is disabled.
+    :rtype: :class:`toggl2pl.cache.MetadataCache`
+    """
+    ttl = config.get('cache_ttl', CACHE_TTL)
+    if not ttl:
+        return None
+    namespace = fingerprint(
+        api_token=config['toggl']['api_token'],
+        base_url=config['pl']['base_url'],
+        excluded_projects=config['pl']['excluded_projects'],
+        user_key=config['pl']['user_key'],
+        workspace=config['toggl']['workspace']
+    )
+    return MetadataCache(
+        path=os.path.join(os.path.dirname(os.path.abspath(path)), 'cache.json'),
+        namespace=namespace,
+        refresh=refresh,
+        ttl=ttl
+    )
+
+
 def parse_arguments():
     """
     Function to handle argument parser configuration (argument definitions, default values and so on).
@@ -61,6 +241,29 @@ def parse_arguments():
         type=str,
         default=datetime.now().strftime('%Y-%m-%d')
     )
+    parser.add_argument(
+        '--since',
+        help='The first date of range to export in `YYYY-MM-DD` format (default: the value of --date).',
+        type=str
+    )
+    parser.add_argument(
+        '--until',
+        help='The last date of range to export in `YYYY-MM-DD` format (default: the value of --date).',
+        type=str
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        help='The number of posts to publish concurrently (default: 1).',
+        type=int,
+        default=1
+    )
+    parser.add_argument(
+        '--refresh-cache',
+        help='Ignore cached PL and Toggl metadata (projects, tasks, clients and so on) and replicated time entries and '
+             'fetch them again.',
+        action='store_true'
+    )
     parser.add_argument(
         '-r',
         '--round',
@@ -76,43 +279,221 @@ def parse_arguments():
     parser.add_argument(
         '-w',
         '--why-run',
-        help='Run client in why-run mode to preview posts without publishing.',
+        help='Run client in why-run mode to preview posts (and synchronization plan) without publishing.',
         action='store_true'
     )
     parser.set_defaults(func=run)
+    # GOTCHA: Subcommand options override parent options with the same destination, so subcommands options do not have
+    # defaults to keep the defaults configured by the main parser (e.g. the current day as --date).
+    period = argparse.ArgumentParser(add_help=False)
+    period.add_argument(
+        '-d',
+        '--date',
+        help='The date when work was actually done in `YYYY-MM-DD` format (default: current day).',
+        type=str,
+        default=argparse.SUPPRESS
+    )
+    period.add_argument(
+        '--since',
+        help='The first date of range in `YYYY-MM-DD` format (default: the value of --date).',
+        type=str,
+        default=argparse.SUPPRESS
+    )
+    period.add_argument(
+        '--until',
+        help='The last date of range in `YYYY-MM-DD` format (default: the value of --date).',
+        type=str,
+        default=argparse.SUPPRESS
+    )
     subparsers = parser.add_subparsers()
+    ledger = subparsers.add_parser(
+        name='ledger',
+        help='Show posts already published according to the push ledger.',
+        parents=[period]
+    )
+    ledger.set_defaults(func=history)
     serve = subparsers.add_parser(name='serve', help='Start application in server mode (not yet implemented).')
+    serve.add_argument(
+        '--async',
+        help='Serve requests using asynchronous handlers on event loop instead of thread per request.',
+        action='store_true',
+        dest='asynchronous'
+    )
     serve.add_argument('-i', '--ipv4', type=str, help='The IPv4 address to run application on.', default='0.0.0.0')
     serve.add_argument('-p', '--port', type=int, help='The TCP port to run application on.', default=5000)
     serve.set_defaults(func=start)
+    team = subparsers.add_parser(
+        name='team',
+        help='Export posts of several team members at once using their configuration files.',
+        parents=[period]
+    )
+    team.add_argument(
+        'configs',
+        help='Paths to team members configuration files or directories with `*.yml` or `*/config.yml` files.',
+        nargs='+'
+    )
+    team.add_argument(
+        '-j',
+        '--jobs',
+        help='The number of posts to publish concurrently (shared by all team members).',
+        type=int,
+        default=argparse.SUPPRESS
+    )
+    team.add_argument(
+        '--refresh-cache',
+        help='Ignore cached Toggl metadata and replicated time entries and fetch them again.',
+        action='store_true',
+        default=argparse.SUPPRESS
+    )
+    team.add_argument(
+        '-r',
+        '--round',
+        help='Round the number of minutes spent on each project to +/- {} minutes.'.format(ROUND_BASE),
+        action='store_true',
+        default=argparse.SUPPRESS
+    )
+    team.add_argument(
+        '-w',
+        '--why-run',
+        help='Preview posts of all team members without publishing.',
+        action='store_true',
+        default=argparse.SUPPRESS
+    )
+    team.set_defaults(func=export_team)
     return parser
 
 
-def review(posts, tablefmt='fancy_grid', why_run=False):
+def preview(plan, tablefmt='fancy_grid'):
+    """
+    Print synchronization plan into standard output (useful in `why-run` mode to see what is going to be created).
+
+    :param plan: Dictionary object returned by :meth:`toggl2pl.Client.plan`.
+    :type plan: dict
+    :param tablefmt: The table format to use (recommended formats are: plain, simple, rst and fancy_grid).
+    :type tablefmt: str
+    """
+    from tabulate import tabulate
+    if not plan['clients'] and not plan['projects']:
+        print('Toggl workspace is already synchronized with PL.\n')
+        return
+    rows = [('client', client, '') for client in plan['clients']]
+    rows.extend(('project', client, project) for client, project in plan['projects'])
+    print(tabulate(tabular_data=rows, headers=('Create', 'Client', 'Project'), tablefmt=tablefmt), end='\n\n')
+
+
+def publish(client, items, jobs=1, rounding=False, ledger=None):
+    """
+    Publish reviewed posts using a pool of workers sharing the same PL session and collect failed posts.
+
+    :param client: The client object to use to publish posts.
+    :type client: :class:`toggl2pl.Client`
+    :param items: List of reviewed `(date, post)` pairs to publish (date is the day when work was actually done).
+    :type items: list
+    :param jobs: Optional number of posts to publish concurrently.
+    :type jobs: int
+    :param rounding: Optional flag to publish rounded number of minutes instead of real.
+    :type rounding: bool
+    :param ledger: Optional push ledger to record every published post as soon as it is published.
+    :type ledger: :class:`toggl2pl.ledger.Ledger`
+    :return: List of dictionaries with failed posts and error descriptions (empty in case all posts are published).
+    :rtype: list
+    """
+    from tqdm import tqdm
+    failed = list()
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = dict()
+        for i, (date, post) in enumerate(items):
+            project, task, description, duration, rounded = post
+            future = executor.submit(
+                client.add_post,
+                date=date,
+                description=description,
+                minutes=rounded if rounding else duration,
+                project=project,
+                task=task
+            )
+            futures[future] = i
+        for future in tqdm(as_completed(futures), desc='posts', total=len(futures)):
+            try:
+                response = future.result()
+            except KeyError as ke:
+                failed.append((futures[future], 'not found: {missing}'.format(missing=ke.args[0])))
+            except UpstreamError as ue:
+                # Only the particular post is marked as failed, so the rest of posts are still published
+                failed.append((futures[future], str(ue)))
+            else:
+                if ledger is not None:
+                    date, post = items[futures[future]]
+                    ledger.record(date=date, post=post, minutes=post[4] if rounding else post[3], response=response)
+    # GOTCHA: Post records are converted into lists, so failed posts are dumped as plain YAML sequences
+    return [{'date': items[i][0], 'error': error, 'post': list(items[i][1])} for i, error in sorted(failed)]
+
+
+def push_ledger(config, path):
+    """
+    Open push ledger stored next to the configuration file (unless disabled with `ledger: false` option).
+
+    :param config: Dictionary object with configuration options loaded from file.
+    :type config: dict
+    :param path: The path to configuration file used to load configuration options.
+    :type path: str
+    :return: Push ledger object or `None` in case ledger is disabled.
+    :rtype: :class:`toggl2pl.ledger.Ledger`
+    """
+    from toggl2pl.ledger import Ledger
+    if not config.get('ledger', True):
+        return None
+    return Ledger(
+        path=os.path.join(os.path.dirname(os.path.abspath(path)), 'ledger.sqlite3'),
+        namespace=fingerprint(base_url=config['pl']['base_url'], user_key=config['pl']['user_key'])
+    )
+
+
+def review(items, tablefmt='fancy_grid', why_run=False):
     """
     Print data into standard output and ask about confirmation before actual data import/export.
 
-    :param posts: List of posts imported from source time tracker and to be published into target tracker during export.
-    :type posts: list
+    Items may be consumed lazily (e.g. streamed from API service), so multi-day exports are printed day by day as soon
+    as posts of the next day start arriving instead of waiting for the last post.
+
+    :param items: Iterable of `(date, post)` pairs sorted by date imported from source time tracker to be published
+                  into target tracker.
+    :type items: iterable
     :param tablefmt: The table format to use (recommended formats are: plain, simple, rst and fancy_grid).
     :type tablefmt: str
     :param why_run: Optional flag to enable `why-run` mode (preview posts without publishing).
     :type why_run: bool
-    :return: The provided list of posts without any modifications.
+    :return: List of the provided `(date, post)` pairs without any modifications.
     :rtype: list
     """
+    from tabulate import tabulate
     headers = ('Project', 'Task', 'Description', 'Real Duration (min)', 'Rounded Duration (min)')
-    print(tabulate(tabular_data=posts, headers=headers, tablefmt=tablefmt))
-    if not why_run:
-        try:
-            input('\nPress Enter to continue or Ctrl-C to abort...')
-        except KeyboardInterrupt:
-            sys.exit('\nExport interrupted, cancelling operation...')
-        return posts
-    sys.exit()
+    reviewed = list()
+    pending = list()
+    for date, group in groupby(items, key=lambda item: item[0]):
+        if pending:
+            # The date column is shown only for multi-day exports to keep the usual single day table compact, so the
+            # previous day is printed once it is known that there are more days
+            print(
+                tabulate(
+                    tabular_data=[[day] + list(post) for day, post in pending],
+                    headers=('Date',) + headers,
+                    tablefmt=tablefmt
+                )
+            )
+        pending = list(group)
+        reviewed.extend(pending)
+    if len(reviewed) > len(pending):
+        rows, headers = [[date] + list(post) for date, post in pending], ('Date',) + headers
+    else:
+        rows = [post for date, post in pending]
+    print(tabulate(tabular_data=rows, headers=headers, tablefmt=tablefmt))
+    confirm(why_run=why_run)
+    return reviewed
 
 
-def serverful(api_token, api_url, since, until, user_key, workspace, excluded_projects=None, why_run=False):
+def serverful(api_token, api_url, since, until, user_key, workspace, cache=None, excluded_projects=None, ledger=None,
+               why_run=False):
     """
     Run application as API service client to use centralized logging and publishing features.
 
@@ -128,47 +509,34 @@ def serverful(api_token, api_url, since, until, user_key, workspace, excluded_pr
     :type user_key: str
     :param workspace: The Toggl workspace name (case sensitive) to pull information from.
     :type workspace: str
+    :param cache: Optional persistent cache to revalidate previously pulled posts instead of downloading them again.
+    :type cache: :class:`toggl2pl.cache.MetadataCache`
     :param excluded_projects: List of Project Laboratory projects names to exclude from pull.
     :type excluded_projects: list
+    :param ledger: Optional push ledger to skip already published posts and record published ones.
+    :type ledger: :class:`toggl2pl.ledger.Ledger`
     :param why_run: Optional argument to enable why-run mode useful to review posts without publishing.
     :type why_run: bool
     """
-    # TODO: The code below must be moved to some class representing API service client.
-    try:
-        posts = requests.get(
-            url=f'{api_url}/posts/pull',
-            json={
-                'api_token': api_token,
-                'excluded_projects': excluded_projects,
-                'since': since,
-                'until': until,
-                'user_key': user_key,
-                'workspace': workspace
-            }
-        )
-        if posts.status_code != 200:
-            sys.exit(yaml.dump(posts.json(), allow_unicode=True))
-        posts = review(posts=posts.json(), why_run=why_run)
-        for post in tqdm(posts, desc='posts'):
-            project, task, description, duration, rounded = post
-            response = requests.put(
-                url=f'{api_url}/posts/push',
-                json={
-                    'api_token': api_token,
-                    'date': since,
-                    'description': description,
-                    'duration': duration,
-                    'rounded': rounded,
-                    'project': project,
-                    'task': task,
-                    'user_key': user_key,
-                    'workspace': workspace
-                }
-            )
-            if response.status_code != 200:
-                sys.exit(yaml.dump(response.json(), allow_unicode=True))
-    except ConnectionError as ce:
-        sys.exit(ce)
+    from tqdm import tqdm
+    service = ServiceClient(api_token=api_token, api_url=api_url, cache=cache, user_key=user_key, workspace=workspace)
+    items = service.pull(since=since, until=until, excluded_projects=excluded_projects)
+    items = review(items=ledger.pending(items=items) if ledger is not None else items, why_run=why_run)
+    failed = list()
+    with tqdm(total=len(items), desc='posts') as progress:
+        # Posts are pushed by small batches and recorded in the ledger after each of them, so interrupted export is
+        # resumed from the first batch which was not confirmed by API service
+        for i in range(0, len(items), PUSH_BATCH_SIZE):
+            batch = items[i:i + PUSH_BATCH_SIZE]
+            for (date, post), result in zip(batch, service.push(items=batch)):
+                if result['status'] != 200:
+                    failed.append(dict(date=date, post=list(post), **result))
+                elif ledger is not None:
+                    ledger.record(date=date, post=post, minutes=post[4], response=result.get('response'))
+            progress.update(len(batch))
+    skipped(ledger=ledger)
+    if failed:
+        sys.exit(yaml.dump(failed, allow_unicode=True))
     sys.exit()
 
 
@@ -180,48 +548,60 @@ def run(known_args):
     :type known_args: :obj:`argparse.Namespace`
     """
     config = load_config(config=known_args.config)
+    since = known_args.since or known_args.date
+    until = known_args.until or known_args.date
+    if since > until:
+        sys.exit('The --since date {since} is later than the --until date {until}'.format(since=since, until=until))
     # TODO: Create API endpoint to synchronize projects and tasks between time trackers.
     if 'api_url' in config and not known_args.sync:
         serverful(
             api_token=config['toggl']['api_token'],
             api_url=config['api_url'],
-            since=known_args.date,
-            until=known_args.date,
+            since=since,
+            until=until,
             user_key=config['pl']['user_key'],
             workspace=config['toggl']['workspace'],
+            cache=metadata_cache(config=config, path=known_args.config, refresh=known_args.refresh_cache),
             excluded_projects=config['pl']['excluded_projects'],
+            ledger=push_ledger(config=config, path=known_args.config),
             why_run=known_args.why_run
         )
     # Server less client work handled below, i.e. client communicates directly with time trackers
     client = Client(
-        api_token=config['toggl']['api_token'],
-        base_url=config['pl']['base_url'],
-        excluded_projects=config['pl']['excluded_projects'],
-        log_level=config['log_level'],
-        user_key=config['pl']['user_key'],
-        verify=config['pl']['verify'],
-        workspace=config['toggl']['workspace']
+        cache=metadata_cache(config=config, path=known_args.config, refresh=known_args.refresh_cache),
+        replica=toggl_replica(config=config, path=known_args.config, refresh=known_args.refresh_cache),
+        **credentials(config=config, jobs=known_args.jobs)
     )
     if known_args.sync:
-        client.sync()
+        plan = client.plan()
+        if known_args.why_run:
+            preview(plan=plan)
+        else:
+            client.apply(plan=plan)
     try:
-        posts = review(
-            posts=client.posts(
-                since=known_args.date,
-                until=known_args.date
-            ),
-            why_run=known_args.why_run
-        )
+        # All days are fetched using a single paginated report and partitioned by time entries start dates
+        days = client.days(since=since, until=until)
     except AssertionError as ae:
         sys.exit(yaml.dump(ae.args[0], allow_unicode=True))
-    for post in tqdm(posts, desc='posts'):
-        project, task, description, duration, rounded = post
-        client.add_post(
-            date=known_args.date,
-            description=description,
-            minutes=rounded if known_args.round else duration,
-            project=project,
-            task=task,
+    items = [(date, post) for date, posts in days for post in posts]
+    ledger = push_ledger(config=config, path=known_args.config)
+    items = review(items=ledger.pending(items=items) if ledger is not None else items, why_run=known_args.why_run)
+    failed = publish(client=client, items=items, jobs=known_args.jobs, rounding=known_args.round, ledger=ledger)
+    skipped(ledger=ledger)
+    if failed:
+        sys.exit(yaml.dump(failed, allow_unicode=True))
+
+
+def skipped(ledger):
+    """
+    Print the number of posts skipped because they had been already published according to the push ledger.
+
+    :param ledger: The push ledger used to filter posts (nothing is printed in case ledger is not used).
+    :type ledger: :class:`toggl2pl.ledger.Ledger`
+    """
+    if ledger is not None and ledger.skipped:
+        print(
+            '{count} already published posts skipped (run `toggl2pl ledger` to list them).'.format(count=ledger.skipped)
         )
 
 
@@ -234,12 +614,53 @@ def start(known_args):
     """
     bind_address = '{}:{}'.format(known_args.ipv4, known_args.port)
     logging.info(msg=f'starting application on {bind_address}')
+    if known_args.asynchronous:
+        from aiohttp import web
+        from toggl2pl.__aserve__ import create_app
+        web.run_app(app=create_app(), host=known_args.ipv4, port=known_args.port, print=None)
+        return
+    from paste.translogger import TransLogger
+    from toggl2pl.__serve__ import create_app
+    from waitress import serve
     serve(app=TransLogger(application=create_app()), listen=bind_address)
 
 
+def toggl_replica(config, path, refresh=False):
+    """
+    Open local replica of Toggl time entries stored next to the configuration file (only if enabled with `replica: true`
+    option).
+
+    :param config: Dictionary object with configuration options loaded from file.
+    :type config: dict
+    :param path: The path to configuration file used to load configuration options.
+    :type path: str
+    :param refresh: Optional flag to fetch all requested days again instead of only not replicated and recent ones.
+    :type refresh: bool
+    :return: Replica object or `None` in case replica is disabled.
+    :rtype: :class:`toggl2pl.replica.Replica`
+    """
+    from toggl2pl.replica import Replica
+    if not config.get('replica', False):
+        return None
+    namespace = fingerprint(
+        api_token=config['toggl']['api_token'],
+        base_url=config['toggl'].get('base_url'),
+        workspace=config['toggl']['workspace']
+    )
+    return Replica(
+        path=os.path.join(os.path.dirname(os.path.abspath(path)), 'replica.sqlite3'),
+        namespace=namespace,
+        recheck=config.get('replica_recheck', REPLICA_RECHECK),
+        refresh=refresh
+    )
+
+
 def main():
     """
     Main entry point used by toggl2pl script to process command line arguments and start application.
     """
     known_args, unknown_args = parse_arguments().parse_known_args()
-    known_args.func(known_args=known_args)
+    try:
+        known_args.func(known_args=known_args)
+    except UpstreamError as ue:
+        sys.exit(str(ue))
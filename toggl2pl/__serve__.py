@@ -1,18 +1,174 @@
-from elasticsearch import Elasticsearch
-from flask import Blueprint, Flask, abort, make_response, jsonify, request
-from toggl2pl import Client
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, Flask, Response, abort, g, make_response, jsonify, request
+from itertools import chain
+from time import perf_counter
+from toggl2pl import Client, RateLimiter, UpstreamError
+from toggl2pl.cache import ClientCache, ResponseCache, fingerprint
+from toggl2pl.indexer import Indexer
+from toggl2pl.metrics import registry
+from toggl2pl.prefetch import Prefetcher
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
 import ast
-from datetime import datetime
-import logging
+import atexit
+from datetime import date, datetime
+import json
 import os
+import zlib
+
+# The media type of newline delimited JSON (one post per line) supported by `/posts/pull` endpoint
+NDJSON = 'application/x-ndjson'
+
+# The fields every post pushed by `/posts/push` and `/posts/push-batch` endpoints must have
+POST_FIELDS = ('date', 'description', 'duration', 'project', 'rounded', 'task')
 
 
 settings = {
     'base_url': os.getenv('BASE_URL', 'https://pl.itcraft.co/api/client-v1'),
+    'client_cache_size': int(os.getenv('CLIENT_CACHE_SIZE', 32)),
+    'client_cache_ttl': int(os.getenv('CLIENT_CACHE_TTL', 300)),
+    'elasticsearch': {
+        'batch_size': int(os.getenv('ES_BATCH_SIZE', 500)),
+        'doc_type': os.getenv('ES_DOC_TYPE', 'toggl'),
+        'flush_interval': float(os.getenv('ES_FLUSH_INTERVAL', 5)),
+        'hosts': os.getenv('ELASTICSEARCH_URL', 'http://elasticsearch:9200').split(','),
+        'maxsize': int(os.getenv('ES_QUEUE_SIZE', 10000)),
+        'spill_path': os.getenv('ES_SPILL_PATH') or None
+    },
+    'limits': {
+        'pl': {
+            'burst': int(os.getenv('PL_BURST', 0)) or None,
+            'connect_timeout': float(os.getenv('PL_CONNECT_TIMEOUT', 0)) or None,
+            'rate': float(os.getenv('PL_RATE', 0)) or None,
+            'read_timeout': float(os.getenv('PL_READ_TIMEOUT', 0)) or None
+        },
+        'toggl': {
+            'burst': int(os.getenv('TOGGL_BURST', 0)) or None,
+            'connect_timeout': float(os.getenv('TOGGL_CONNECT_TIMEOUT', 0)) or None,
+            'rate': float(os.getenv('TOGGL_RATE', 0)) or None,
+            'read_timeout': float(os.getenv('TOGGL_READ_TIMEOUT', 0)) or None
+        }
+    },
     'log_level': os.getenv('LOG_LEVEL', 'info'),
+    'max_workers': int(os.getenv('PL_MAX_WORKERS', 8)),
+    'prefetch': {
+        'active_ttl': int(os.getenv('PREFETCH_ACTIVE_TTL', 3600)),
+        'budget': int(os.getenv('PREFETCH_BUDGET', 50)),
+        'concurrency': int(os.getenv('PREFETCH_CONCURRENCY', 2)),
+        'interval': float(os.getenv('PREFETCH_INTERVAL', 0)),
+        'maxsize': int(os.getenv('PREFETCH_SIZE', 1024))
+    },
+    'pull_cache_size': int(os.getenv('PULL_CACHE_SIZE', 256)),
+    'pull_cache_ttl': int(os.getenv('PULL_CACHE_TTL', 60)),
+    'push_concurrency': int(os.getenv('PUSH_CONCURRENCY', 4)),
+    'report': os.getenv('TOGGL_REPORT', 'details'),
+    'toggl_url': os.getenv('TOGGL_URL') or None,
     'verify': ast.literal_eval(os.getenv('SSL_VERIFY', 'true').lower().title())
 }
 
+clients = ClientCache(factory=Client, maxsize=settings['client_cache_size'], ttl=settings['client_cache_ttl'])
+pulls = ResponseCache(maxsize=settings['pull_cache_size'], ttl=settings['pull_cache_ttl'])
+# Clients caches exposed by metrics (asynchronous server mode adds its own cache of asynchronous clients)
+caches = [clients]
+indexer = Indexer(**settings['elasticsearch'])
+atexit.register(indexer.close, timeout=settings['elasticsearch']['flush_interval'])
+prefetcher = Prefetcher(fetch=lambda data: prefetch(data=data), **settings['prefetch'])
+atexit.register(prefetcher.close, timeout=settings['prefetch']['interval'])
+
+# API service requests metrics updated by request hooks (upstream requests metrics are updated by transport itself)
+requests_in_flight = registry.gauge(
+    name='toggl2pl_requests_in_flight',
+    documentation='The number of API service requests currently processed.'
+)
+request_duration = registry.histogram(
+    name='toggl2pl_request_duration_seconds',
+    documentation='API service requests duration by route, method and response status code.',
+    labels=('route', 'method', 'status')
+)
+
+# GOTCHA: Indexer and clients cache already count their events, so the counters are only read on scrape instead of
+# being updated twice on requests processing path.
+registry.collector(
+    name='toggl2pl_client_cache_events_total',
+    documentation='The number of cached clients lookups (hits and misses), evictions and background refreshes.',
+    function=lambda: {(event,): value for event, value in cache_stats().items() if event != 'size'},
+    kind='counter',
+    labels=('event',)
+)
+registry.collector(
+    name='toggl2pl_client_cache_size',
+    documentation='The number of cached clients.',
+    function=lambda: {(): cache_stats()['size']}
+)
+registry.collector(
+    name='toggl2pl_pull_cache_events_total',
+    documentation='The number of cached pull responses lookups (hits and misses), evictions and invalidations.',
+    function=lambda: {(event,): value for event, value in pulls.stats().items() if event != 'size'},
+    kind='counter',
+    labels=('event',)
+)
+registry.collector(
+    name='toggl2pl_prefetch_events_total',
+    documentation='The number of prefetch cycles and users prefetch outcomes (prefetched, unchanged, throttled, etc.).',
+    function=lambda: {
+        (event,): value for event, value in prefetcher.stats().items() if event not in ('active', 'running')
+    },
+    kind='counter',
+    labels=('event',)
+)
+registry.collector(
+    name='toggl2pl_indexer_documents_total',
+    documentation='The number of Elasticsearch documents by indexing outcome (indexed, failed, spilled, dropped).',
+    function=lambda: {(outcome,): value for outcome, value in indexer.stats().items() if outcome in indexer.counters},
+    kind='counter',
+    labels=('outcome',)
+)
+registry.collector(
+    name='toggl2pl_indexer_queue_size',
+    documentation='The number of documents waiting to be sent to Elasticsearch.',
+    function=lambda: {(): indexer.stats()['queued']}
+)
+
+
+def credentials(data, excluded_projects=None):
+    """
+    Combine request credentials with server settings into keyword arguments used to get cached :class:`Client` objects.
+
+    :param data: The request JSON payload with Toggl and Project Laboratory credentials.
+    :type data: dict
+    :param excluded_projects: Optional list of Project Laboratory projects names to exclude from pull.
+    :type excluded_projects: list
+    :return: Dictionary object with keyword arguments for :meth:`ClientCache.get` and :meth:`ClientCache.invalidate`.
+    :rtype: dict
+    """
+    return {
+        'api_token': data['api_token'],
+        'base_url': settings['base_url'],
+        'excluded_projects': excluded_projects,
+        'limits': settings['limits'],
+        'log_level': settings['log_level'],
+        'max_workers': settings['max_workers'],
+        'report': settings['report'],
+        'toggl_url': settings['toggl_url'],
+        'user_key': data['user_key'],
+        'verify': settings['verify'],
+        'workspace': data['workspace']
+    }
+
+
+def cache_stats():
+    """
+    Sum statistics of all clients caches used in the process.
+
+    :return: Dictionary object with the number of cached clients and hits, misses, evictions and refreshes counters.
+    :rtype: dict
+    """
+    stats = dict()
+    for cache in caches:
+        for name, value in cache.stats().items():
+            stats[name] = stats.get(name, 0) + value
+    return stats
+
 
 def create_app():
     """
@@ -22,46 +178,118 @@ def create_app():
     """
     app = Flask(__name__)
     app.register_blueprint(blueprint=posts)
+    app.add_url_rule(rule='/metrics', view_func=metrics, methods=['GET'])
+    app.add_url_rule(rule='/status', view_func=status, methods=['GET'])
+    app.register_error_handler(UpstreamError, upstream_error)
+    app.before_request(request_started)
+    app.after_request(request_finished)
+    app.teardown_request(request_teardown)
+    prefetcher.start()
     return app
 
 
 posts = Blueprint('posts', __name__, url_prefix='/posts')
 
 
+def add_post(client, data):
+    """
+    Create a new Project Laboratory post from the `/posts/push` request payload.
+
+    :param client: The client object to use to publish post.
+    :type client: :class:`Client`
+    :param data: The request JSON payload with post details.
+    :type data: dict
+    :return: Dictionary object with PL API response content.
+    :rtype: dict
+    """
+    return client.add_post(
+        date=data['date'],
+        description=data['description'],
+        minutes=data['rounded'],  # TODO: Start from rounded but provide an ability to optionally post real duration
+        project=data['project'],
+        task=data['task']
+    )
+
+
 @posts.route(rule='/pull', methods=['GET'])
 def pull():
     """
     Pull list of Toggl posts in period between specified since and until dates.
 
+    Posts are sent as JSON array by default. Clients which prefer newline delimited JSON (`application/x-ndjson`)
+    receive one post per line (`[date, post]` pairs in daily mode) and in daily mode the posts of each day are streamed
+    as soon as the day is aggregated, so the client can start processing before the whole period is fetched from Toggl.
+    Errors which happen after streaming started are sent as the last line with JSON object instead of post. Responses
+    are compressed in case client accepts `gzip` encoding (streamed responses are flushed after every day). In case
+    prefetching is enabled, the current day posts of users who pulled recently are refreshed in background, so the
+    next pull of the current day is served from memory.
+
     .. :quickref: Pull Posts; Pull posts from Toggl and send to client.
 
     :reqheader Content-Type: application/json
 
     :<json string api_token: The Toggl authentication token to use instead of username and password.
+    :<json boolean daily: Optional flag to split posts by days and respond with list of `[date, posts]` pairs.
     :<json string excluded_projects: List of PL projects names to exclude from result.
     :<json string since: The start date in ISO 8601 (`YYYY-MM-DD`) format to pull posts from Toggl.
     :<json string until: The last date in ISO 8601 (`YYYY-MM-DD`) format to pull posts from Toggl.
     :<json string user_key: The Project Laboratory authentication token to use instead of username and password.
     :<json string workspace: The Toggl workspace name (case sensitive) to pull information from.
 
-    :resheader Content-Type: application/json
+    :reqheader Accept: Optional `application/x-ndjson` media type to get newline delimited JSON.
+    :reqheader Accept-Encoding: Optional `gzip` encoding to get compressed response.
+    :reqheader If-None-Match: Optional ETag of previously pulled response to get `304` status if posts did not change.
+
+    :resheader Content-Encoding: The `gzip` encoding in case response is compressed.
+    :resheader Content-Type: application/json or application/x-ndjson
+    :resheader ETag: Strong entity tag of the response content (not sent for streamed responses).
 
     :status 200: Request successfully processed and response provided back to client.
+    :status 304: Posts did not change since the response with ETag sent in `If-None-Match` header.
     """
     data = request.get_json()
-    client = Client(
-        api_token=data['api_token'],
-        base_url=settings['base_url'],
-        excluded_projects=data['excluded_projects'],
-        log_level=settings['log_level'],
-        user_key=data['user_key'],
-        verify=settings['verify'],
-        workspace=data['workspace'],
-    )
-    try:
-        return jsonify(client.posts(since=data['since'], until=data['until']))
-    except AssertionError as ae:
-        abort(make_response(jsonify(ae.args[0]), 500))
+    daily = bool(data.get('daily'))
+    streamed, compressed = negotiate(headers=request.headers)
+    key, scope = pull_key(data=data), pull_scope(data=data)
+    observe(data=data)
+    entry = pulls.get(key=key)
+    if entry is None:
+        generation = pulls.generation(scope=scope)
+        client = clients.get(**credentials(data=data, excluded_projects=data['excluded_projects']))
+        try:
+            if daily and streamed:
+                days = client.stream(since=data['since'], until=data['until'])
+                # GOTCHA: The first day is fetched before response is started, so metadata and the first report page
+                # errors are still reported using response status code.
+                first = next(days, None)
+            elif daily:
+                result = client.days(since=data['since'], until=data['until'])
+            else:
+                result = client.posts(since=data['since'], until=data['until'])
+        except AssertionError as ae:
+            abort(make_response(jsonify(ae.args[0]), 500))
+        if daily and streamed:
+            chunks = stream(days=chain([first] if first else [], days), data=data, generation=generation)
+            response = Response(compress(chunks=chunks) if compressed else chunks, mimetype=NDJSON)
+            if compressed:
+                response.headers['Content-Encoding'] = 'gzip'
+            response.vary.update(('Accept', 'Accept-Encoding'))
+            return response
+        entry = pulls.put(
+            key=key,
+            scope=scope,
+            since=data['since'],
+            until=data['until'],
+            content=json.dumps(result).encode('utf-8'),
+            generation=generation
+        )
+    content, etag = representation(entry=entry, daily=daily, ndjson=streamed, gzip=compressed)
+    response = Response(content, mimetype=NDJSON if streamed else 'application/json')
+    if compressed:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    response.set_etag(etag)
+    return response.make_conditional(request)
 
 
 @posts.route(rule='/push', methods=['PUT'])
@@ -86,41 +314,443 @@ def push():
     :resheader Content-Type: application/json
 
     :status 200: Request successfully processed and response provided back to client.
+    :status 400: Some post fields are missing in the request payload.
+    :status 404: Project or task not found in Project Laboratory even after client metadata refresh.
     """
     data = request.get_json()
-    client = Client(
-        api_token=data['api_token'],
-        base_url=settings['base_url'],
-        log_level=settings['log_level'],
-        user_key=data['user_key'],
-        verify=settings['verify'],
-        workspace=data['workspace'],
-    )
-    response = jsonify(
-        client.add_post(
-            date=data['date'],
-            description=data['description'],
-            minutes=data['rounded'],  # TODO: Start from rounded but provide an ability to optionally post real duration
-            project=data['project'],
-            task=data['task']
-        )
-    )
-    # TODO: Rewrite Elasticsearch integration to asynchronous job executing outside of the main request context.
+    missing = malformed(data=data)
+    if missing:
+        abort(make_response(jsonify({'error': 'missing post fields', 'fields': missing}), 400))
+    kwargs = credentials(data=data)
+    client = clients.get(**kwargs)
     try:
-        es = Elasticsearch(hosts=os.getenv('ELASTICSEARCH_URL', 'http://elasticsearch:9200').split(','))
-        es.index(
-            body={
+        response = jsonify(add_post(client=client, data=data))
+    except KeyError:
+        # GOTCHA: Project or task may be created in PL after the client was cached, so drop outdated client metadata and
+        # try once again before report error back to client.
+        clients.invalidate(**kwargs)
+        client = clients.get(**kwargs)
+        try:
+            response = jsonify(add_post(client=client, data=data))
+        except KeyError as ke:
+            error = {
+                'missing': ke.args[0],
+                'project': data['project'],
+                'task': data['task']
+            }
+            abort(make_response(jsonify(error), 404))
+    invalidate(data=data, posts=[data])
+    index(client=client, posts=[data])
+    return response
+
+
+@posts.route(rule='/push-batch', methods=['PUT'])
+def push_batch():
+    """
+    Push list of Project Laboratory tasks information using bounded number of concurrent PL API requests.
+
+    .. :quickref: Push Posts Batch; Push list of posts into Project Laboratory.
+
+    :reqheader Content-Type: application/json
+
+    :<json string api_token: The Toggl authentication token to use instead of username and password.
+    :<json string date: The default date in ISO 8601 (`YYYY-MM-DD`) format when work was actually done.
+    :<json array posts: List of posts objects with the same fields as `/posts/push` request (`date` is optional).
+    :<json string user_key: The Project Laboratory authentication token to use instead of username and password.
+    :<json string workspace: The Toggl workspace name (case sensitive) to pull information from.
+
+    :>jsonarr integer status: The HTTP status code corresponding to the particular post publishing result.
+    :>jsonarr object response: PL API response content (only for successfully published posts).
+    :>jsonarr string error: The error description (only for failed posts).
+
+    :resheader Content-Type: application/json
+
+    :status 200: Request processed (please check per-item statuses to find failed posts).
+    """
+    data = request.get_json()
+    kwargs = credentials(data=data)
+    client = clients.get(**kwargs)
+    items = [dict(post, date=post.get('date', data.get('date'))) for post in data['posts']]
+    results = publish(client=client, items=items)
+    missing = [i for i, result in enumerate(results) if result['status'] == 404]
+    if missing:
+        # GOTCHA: The same as for single post push, retry posts with unknown projects or tasks with fresh metadata
+        clients.invalidate(**kwargs)
+        client = clients.get(**kwargs)
+        for i, result in zip(missing, publish(client=client, items=[items[i] for i in missing])):
+            results[i] = result
+    published = [item for item, result in zip(items, results) if result['status'] == 200]
+    invalidate(data=data, posts=published)
+    index(client=client, posts=published)
+    return jsonify(results)
+
+
+def compress(chunks):
+    """
+    Compress response chunks into single gzip stream flushing compressor after every chunk, so each chunk can be decoded
+    by client as soon as it is received.
+
+    :param chunks: Iterable of response content chunks.
+    :type chunks: iterable
+    :return: Generator of compressed response content chunks.
+    :rtype: generator
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def index(client, posts):
+    """
+    Enqueue information about published posts to store in Elasticsearch and provide analytics (documents are sent by
+    background worker, so request processing never waits for Elasticsearch).
+
+    :param client: The client object used to publish posts.
+    :type client: :class:`Client`
+    :param posts: List of request payloads with published posts details.
+    :type posts: list
+    """
+    employee = client.me['email'].split('@')[0].upper()
+    for data in posts:
+        indexer.put(
+            document={
                 'description': data['description'],
                 'duration': data['duration'],
-                'employee': client.me['email'].split('@')[0].upper(),
+                'employee': employee,
                 'project': data['project'],
                 'rounded': data['rounded'],
                 'task': data['task'],
                 'timestamp': datetime.strptime(data['date'], '%Y-%m-%d'),
-            },
-            doc_type='toggl',
-            index='toggl',
+            }
+        )
+
+
+def invalidate(data, posts):
+    """
+    Drop cached pull responses which cover dates of published posts, so the next pull reflects the changes.
+
+    :param data: The request JSON payload with credentials.
+    :type data: dict
+    :param posts: List of request payloads with published posts details.
+    :type posts: list
+    """
+    scope = pull_scope(data=data)
+    for day in set(post['date'] for post in posts):
+        pulls.invalidate(scope=scope, date=day)
+
+
+def lines(posts, date=None):
+    """
+    Serialize posts into newline delimited JSON.
+
+    :param posts: List of posts.
+    :type posts: list
+    :param date: Optional date of posts to send every post as `[date, post]` pair.
+    :type date: str
+    :return: Newline delimited JSON content (one post per line).
+    :rtype: bytes
+    """
+    return b''.join(json.dumps(post if date is None else [date, post]).encode('utf-8') + b'\n' for post in posts)
+
+
+def malformed(data):
+    """
+    Find post fields missing in the `/posts/push` request payload (or `/posts/push-batch` item), so malformed payloads
+    are rejected before looking up PL projects and tasks.
+
+    :param data: The request JSON payload with post details.
+    :type data: dict
+    :return: List of missing fields names (empty in case payload is valid).
+    :rtype: list
+    """
+    return [name for name in POST_FIELDS if data.get(name) is None]
+
+
+def metrics():
+    """
+    Expose service metrics in Prometheus text format: API service requests latency and in-flight requests, upstream PL
+    and Toggl requests outcomes and latency, Elasticsearch indexing outcomes and clients cache events.
+
+    .. :quickref: Metrics; Expose service metrics for Prometheus.
+
+    :resheader Content-Type: text/plain; version=0.0.4
+
+    :status 200: Request successfully processed and response provided back to client.
+    """
+    response = make_response(registry.expose())
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    return response
+
+
+def negotiate(headers):
+    """
+    Choose `/posts/pull` response representation using `Accept` and `Accept-Encoding` request headers.
+
+    :param headers: The request headers.
+    :return: Tuple of flags which show if response must be sent as newline delimited JSON and compressed with gzip.
+    :rtype: tuple
+    """
+    accept = parse_accept_header(headers.get('Accept'), MIMEAccept)
+    encodings = parse_accept_header(headers.get('Accept-Encoding'))
+    return accept.best_match(['application/json', NDJSON]) == NDJSON, encodings['gzip'] > 0
+
+
+def observe(data):
+    """
+    Remember user who pulled posts to prefetch the current day posts of the same user in background (only credentials
+    and options which affect response are kept).
+
+    :param data: The `/posts/pull` request JSON payload.
+    :type data: dict
+    """
+    data = {
+        'api_token': data['api_token'],
+        'daily': bool(data.get('daily')),
+        'excluded_projects': data.get('excluded_projects'),
+        'user_key': data['user_key'],
+        'workspace': data['workspace']
+    }
+    prefetcher.observe(key=fingerprint(**data), data=data)
+
+
+def prefetch(data):
+    """
+    Refresh the current day `/posts/pull` response of recently active user in pull responses cache (executed by
+    prefetcher worker).
+
+    Only the current day is fetched, since posts of the previous days rarely change and are cached on request. The
+    refreshed response is kept until the next prefetch cycle and keeps its ETag in case posts did not change.
+
+    :param data: The payload remembered by :func:`observe`.
+    :type data: dict
+    :return: The prefetch outcome: `prefetched`, `unchanged`, `incomplete` (time entry is still running) or
+             `throttled` (user requests already consume Toggl rate limit).
+    :rtype: str
+    """
+    today = date.today().isoformat()
+    data = dict(data, since=today, until=today)
+    # GOTCHA: Prefetch shares rate limiter with requests of the same Toggl account, so it is postponed until the next
+    # cycle instead of delaying user requests in case there are no spare requests left.
+    limiter = RateLimiter.lookup(key=('toggl', data['api_token']))
+    if limiter is not None and limiter.available() < 1:
+        return 'throttled'
+    key, scope = pull_key(data=data), pull_scope(data=data)
+    generation = pulls.generation(scope=scope)
+    client = clients.get(**credentials(data=data, excluded_projects=data['excluded_projects']))
+    try:
+        if data['daily']:
+            result = client.days(since=today, until=today)
+        else:
+            result = client.posts(since=today, until=today)
+    except AssertionError:
+        return 'incomplete'
+    previous = pulls.peek(key=key)
+    entry = pulls.put(
+        key=key,
+        scope=scope,
+        since=today,
+        until=today,
+        content=json.dumps(result).encode('utf-8'),
+        generation=generation,
+        ttl=settings['prefetch']['interval'] + settings['pull_cache_ttl']
+    )
+    return 'unchanged' if previous is not None and previous['etag'] == entry['etag'] else 'prefetched'
+
+
+def publish(client, items):
+    """
+    Publish list of posts concurrently and collect per-item results instead of failing on the first error.
+
+    :param client: The client object to use to publish posts.
+    :type client: :class:`Client`
+    :param items: List of request payloads with posts details.
+    :type items: list
+    :return: List of dictionaries with publishing status and PL API response or error description for each post.
+    :rtype: list
+    """
+    def worker(item):
+        missing = malformed(data=item)
+        if missing:
+            return {'status': 400, 'error': 'missing post fields: {fields}'.format(fields=', '.join(missing))}
+        try:
+            return {'status': 200, 'response': add_post(client=client, data=item)}
+        except KeyError as ke:
+            return {'status': 404, 'error': 'not found: {missing}'.format(missing=ke.args[0])}
+        except UpstreamError as ue:
+            # Report upstream errors as bad gateway for this item only to let the rest of posts be published
+            return {'status': 502, 'error': str(ue)}
+
+    with ThreadPoolExecutor(max_workers=settings['push_concurrency']) as executor:
+        return list(executor.map(worker, items))
+
+
+def pull_key(data):
+    """
+    Calculate `/posts/pull` response cache key (changes with any request parameter which affects response).
+
+    :param data: The `/posts/pull` request JSON payload.
+    :type data: dict
+    :return: The cache key.
+    :rtype: str
+    """
+    return fingerprint(
+        daily=bool(data.get('daily')),
+        excluded_projects=data.get('excluded_projects'),
+        scope=pull_scope(data=data),
+        since=data['since'],
+        until=data['until']
+    )
+
+
+def pull_scope(data):
+    """
+    Calculate `/posts/pull` response cache scope shared by all responses of the same Toggl account and workspace to
+    invalidate them together once posts are pushed.
+
+    :param data: The request JSON payload with credentials.
+    :type data: dict
+    :return: The cache scope.
+    :rtype: str
+    """
+    return fingerprint(api_token=data['api_token'], workspace=data['workspace'])
+
+
+def representation(entry, daily=False, ndjson=False, gzip=False):
+    """
+    Get cached `/posts/pull` response content in the negotiated representation with its own strong ETag (every
+    representation is built once per cache entry).
+
+    :param entry: The cache entry returned by :meth:`toggl2pl.cache.ResponseCache.get` or `put` methods.
+    :type entry: dict
+    :param daily: Optional flag which shows if cached response contains `[date, posts]` pairs.
+    :type daily: bool
+    :param ndjson: Optional flag to get newline delimited JSON instead of JSON array.
+    :type ndjson: bool
+    :param gzip: Optional flag to get content compressed with gzip.
+    :type gzip: bool
+    :return: Tuple of response content and its ETag.
+    :rtype: tuple
+    """
+    variant = ('-ndjson' if ndjson else '') + ('-gzip' if gzip else '')
+    variants = entry.setdefault('variants', {'': entry['content']})
+    if variant not in variants:
+        content = entry['content']
+        if ndjson:
+            result = json.loads(content)
+            if daily:
+                content = b''.join(lines(posts=posts, date=day) for day, posts in result)
+            else:
+                content = lines(posts=result)
+        if gzip:
+            content = b''.join(compress(chunks=[content]))
+        variants[variant] = content
+    return variants[variant], entry['etag'] + variant
+
+
+def request_finished(response):
+    """
+    Record API service request duration (executed after every request including failed ones).
+
+    :param response: The response object to send back to client.
+    :return: The same response object.
+    """
+    started = g.pop('started', None)
+    if started is not None:
+        request_duration.observe(
+            perf_counter() - started,
+            request.url_rule.rule if request.url_rule else 'unmatched',
+            request.method,
+            str(response.status_code)
         )
-    except Exception as ex:
-        logging.warning(msg=ex)
     return response
+
+
+def request_started():
+    """
+    Start API service request measurement (executed before every request).
+    """
+    g.started = perf_counter()
+    requests_in_flight.inc()
+
+
+def request_teardown(exception=None):
+    """
+    Finish API service request measurement (executed after every request even if response was not built).
+
+    :param exception: Optional exception raised during request processing.
+    """
+    requests_in_flight.dec()
+
+
+def status():
+    """
+    Show service status information useful for monitoring.
+
+    .. :quickref: Status; Show service status.
+
+    :>json object clients: Clients cache statistics (cached clients number, hits, misses, evictions and refreshes).
+    :>json object indexer: Elasticsearch indexing queue statistics (queue depth, indexed, failed, spilled and dropped
+                           documents counters).
+    :>json object prefetch: Prefetcher statistics (active users number, cycles and prefetch outcomes counters).
+    :>json object pulls: Pull responses cache statistics (cached responses number, hits, misses, evictions and
+                         invalidations).
+
+    :resheader Content-Type: application/json
+
+    :status 200: Request successfully processed and response provided back to client.
+    """
+    return jsonify(
+        {
+            'clients': clients.stats(),
+            'indexer': indexer.stats(),
+            'prefetch': prefetcher.stats(),
+            'pulls': pulls.stats()
+        }
+    )
+
+
+def stream(days, data, generation):
+    """
+    Serialize streamed days into newline delimited JSON and store the complete response in pull responses cache once
+    the last day is sent.
+
+    :param days: Iterable of `(date, posts)` pairs returned by :meth:`toggl2pl.Client.stream`.
+    :type days: iterable
+    :param data: The `/posts/pull` request JSON payload.
+    :type data: dict
+    :param generation: The pull responses cache scope generation before posts were requested.
+    :type generation: int
+    :return: Generator of newline delimited JSON chunks (one chunk per day).
+    :rtype: generator
+    """
+    collected = list()
+    try:
+        for day, posts in days:
+            collected.append((day, posts))
+            yield lines(posts=posts, date=day)
+    except AssertionError as ae:
+        yield lines(posts=[{'error': ae.args[0]}])
+        return
+    except UpstreamError as ue:
+        yield lines(posts=[{'error': str(ue), 'status_code': ue.status_code}])
+        return
+    pulls.put(
+        key=pull_key(data=data),
+        scope=pull_scope(data=data),
+        since=data['since'],
+        until=data['until'],
+        content=json.dumps(collected).encode('utf-8'),
+        generation=generation
+    )
+
+
+def upstream_error(error):
+    """
+    Report upstream API errors (PL or Toggl request failed or timed out) back to client as bad gateway.
+
+    :param error: The exception raised during request processing.
+    :type error: :class:`toggl2pl.UpstreamError`
+    :return: Flask response object with error description and upstream status code.
+    """
+    return make_response(jsonify({'error': str(error), 'status_code': error.status_code}), 502)
@@ -0,0 +1,1149 @@
+from collections import OrderedDict, deque
+from time import monotonic, perf_counter
+from toggl2pl import (
+    APP_KEY, Aggregator, Client, PL, RateLimiter, TogglAPIClient, TogglReportsClient, Transport,
+    UpstreamConnectionError, UpstreamError, retry_delay
+)
+from toggl2pl import metrics
+from toggl2pl.cache import fingerprint
+from toggl2pl.models import PLProject, PLTask, TimeEntry
+import aiohttp
+import asyncio
+import json
+import logging
+import math
+
+
+class AsyncClientCache(object):
+
+    # The number of seconds to keep evicted clients open, so requests which already got them can finish
+    grace = 60
+
+    def __init__(self, factory, maxsize=32, ttl=300):
+        """
+        Asynchronous counterpart of :class:`toggl2pl.cache.ClientCache` for clients which must be created and refreshed
+        by coroutines (e.g. :class:`AsyncClient`). Must be used from the single event loop.
+
+        :param factory: Coroutine function to create a new opened client from the keyword arguments passed to
+                        :meth:`get` (e.g. :meth:`AsyncClient.create`).
+        :type factory: callable
+        :param maxsize: The maximum number of clients to keep in cache (least recently used are evicted and closed).
+        :type maxsize: int
+        :param ttl: The number of seconds after which client metadata considered stale and refreshed.
+        :type ttl: int
+        """
+        self.counters = {
+            'evictions': 0,
+            'hits': 0,
+            'misses': 0,
+            'refreshes': 0
+        }
+        self.entries = OrderedDict()
+        self.factory = factory
+        self.maxsize = maxsize
+        self.pending = dict()
+        self.tasks = set()
+        self.ttl = ttl
+
+    async def clear(self):
+        """
+        Remove all cached clients and close them (e.g. on server shutdown).
+        """
+        entries, self.entries = list(self.entries.values()), OrderedDict()
+        for task in list(self.tasks):
+            task.cancel()
+        for entry in entries:
+            await entry['client'].close()
+
+    async def create(self, key, **kwargs):
+        """
+        Create a new client and store it in cache (executed in background task shared by concurrent :meth:`get` calls).
+
+        :param key: The cache key of the client.
+        :type key: str
+        :param kwargs: Keyword arguments to pass to the client factory.
+        :return: Client object created by the configured factory.
+        """
+        try:
+            client = await self.factory(**kwargs)
+        except BaseException:
+            self.pending.pop(key, None)
+            raise
+        # NOTE: The pending task is removed only once the entry is stored, so requests which come in between see
+        # either the pending task or the cached client.
+        self.entries[key] = {
+            'client': client,
+            'refreshing': False,
+            'timestamp': monotonic()
+        }
+        while len(self.entries) > self.maxsize:
+            self.retire(client=self.entries.popitem(last=False)[1]['client'])
+            self.counters['evictions'] += 1
+        self.pending.pop(key, None)
+        return client
+
+    async def get(self, **kwargs):
+        """
+        Get cached client for the provided credentials or create a new one using the configured factory.
+
+        :param kwargs: Keyword arguments to pass to the client factory (also used to calculate the cache key).
+        :return: Client object created by the configured factory.
+        """
+        key = fingerprint(**kwargs)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.counters['hits'] += 1
+            return self.touch(key=key, entry=entry)
+        self.counters['misses'] += 1
+        # GOTCHA: Concurrent requests with the same credentials wait for the single client creation instead of
+        # building their own, while requests with other credentials are not blocked at all.
+        pending = self.pending.get(key)
+        if pending is None:
+            pending = self.pending[key] = asyncio.ensure_future(self.create(key=key, **kwargs))
+        return await asyncio.shield(pending)
+
+    def invalidate(self, **kwargs):
+        """
+        Remove cached client for the provided credentials and close it once requests which use it are finished.
+
+        :param kwargs: Keyword arguments previously passed to :meth:`get`.
+        :return: Boolean flag which shows if any client was actually removed from cache.
+        :rtype: bool
+        """
+        entry = self.entries.pop(fingerprint(**kwargs), None)
+        if entry is None:
+            return False
+        self.retire(client=entry['client'])
+        return True
+
+    async def refresh(self, key, entry):
+        """
+        Refresh cached client metadata (executed in background task started by :meth:`get`).
+
+        :param key: The cache key of the entry to refresh.
+        :type key: str
+        :param entry: The cache entry to refresh.
+        :type entry: dict
+        """
+        try:
+            await entry['client'].refresh()
+            entry['timestamp'] = monotonic()
+        except Exception as ex:
+            logging.warning(msg='failed to refresh cached client, evicting it: {ex}'.format(ex=ex))
+            if self.entries.get(key) is entry:
+                del self.entries[key]
+                self.retire(client=entry['client'])
+        finally:
+            entry['refreshing'] = False
+
+    def retire(self, client):
+        """
+        Close evicted client after :attr:`grace` period in background.
+
+        :param client: The client object to close.
+        """
+        async def close():
+            await asyncio.sleep(self.grace)
+            await client.close()
+
+        self.schedule(coroutine=close())
+
+    def schedule(self, coroutine):
+        """
+        Run coroutine in background task and keep reference to it until it is done.
+
+        :param coroutine: The coroutine object to run.
+        """
+        task = asyncio.ensure_future(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def stats(self):
+        """
+        Collect cache statistics (useful for monitoring).
+
+        :return: Dictionary object with the number of cached clients and hits, misses, evictions and refreshes counters.
+        :rtype: dict
+        """
+        return dict(self.counters, size=len(self.entries))
+
+    def touch(self, key, entry):
+        """
+        Mark cache entry as recently used and schedule its background refresh if entry is stale.
+
+        :param key: The cache key of the entry to touch.
+        :type key: str
+        :param entry: The cache entry to touch.
+        :type entry: dict
+        :return: Client object stored in the cache entry.
+        """
+        self.entries.move_to_end(key)
+        if monotonic() - entry['timestamp'] > self.ttl and not entry['refreshing']:
+            entry['refreshing'] = True
+            self.counters['refreshes'] += 1
+            self.schedule(coroutine=self.refresh(key=key, entry=entry))
+        return entry['client']
+
+
+class AsyncPL(object):
+
+    burst = PL.burst
+    normalize = staticmethod(PL.normalize)
+    rate = PL.rate
+    retries = PL.retries
+
+    def __init__(self, app_key, base_url, user_key, burst=None, connect_timeout=None, log_level='info', max_workers=8,
+                 rate=None, read_timeout=None, session=None, verify=True):
+        """
+        Initialize a new instance of class object to communicate with PL using :mod:`asyncio`.
+
+        :param app_key: The required application key used to gather application usage statistic.
+        :type app_key: str
+        :param base_url: The Project Laboratory API base URL in format `<scheme>://<domain>/<uri>`.
+        :type base_url: str
+        :param user_key: The Project Laboratory authentication token to use instead of username and password.
+        :type user_key: str
+        :param burst: Optional maximum number of requests allowed to send at once (shared by all instances with the same
+                      credentials).
+        :type burst: int
+        :param connect_timeout: Optional number of seconds to wait for connection to PL API.
+        :type connect_timeout: float
+        :param log_level: Optional logging level name to configure logging verbosity (default: `info`).
+        :type log_level: str
+        :param max_workers: Optional limit of concurrent requests to PL API.
+        :type max_workers: int
+        :param rate: Optional number of requests per second allowed to send to PL API.
+        :type rate: float
+        :param read_timeout: Optional number of seconds to wait for PL API response.
+        :type read_timeout: float
+        :param session: Optional HTTP session to share connection pool with other clients (otherwise own session is
+                        created on first request and closed by :meth:`close`).
+        :type session: :class:`aiohttp.ClientSession`
+        :param verify: Optional argument which allows to disable TLS connection verification.
+        :type verify: bool
+        """
+        logging.basicConfig(level=logging.getLevelName(log_level.upper()))
+        self.base_url = base_url
+        self.data = {
+            'app-key': app_key,
+            'user-key': user_key
+        }
+        self.limiter = RateLimiter.shared(
+            key=('pl', base_url, user_key),
+            rate=rate or self.rate,
+            burst=burst or self.burst
+        )
+        self.max_workers = max(1, max_workers)
+        self.owned = session is None
+        self.semaphore = None
+        self.session = session
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=connect_timeout or Transport.connect_timeout,
+            sock_read=read_timeout or Transport.read_timeout
+        )
+        self.verify = verify
+
+    async def add_post(self, date, description, minutes, project_id, task_id):
+        """
+        Create a new post in Project Laboratory about specific task execution details.
+
+        :param date: The date when work was actually done in `YYYY-MM-DD` format (ISO 8601).
+        :type date: str
+        :param description: Relatively short description of the work done as a part of the parent task.
+        :type description: str
+        :param minutes: Total amount of minutes spent during work on the task entry.
+        :type minutes: int
+        :param project_id: The project ID in PL database corresponding task belongs to.
+        :type project_id: int
+        :param task_id: The task ID in PL database to create new post.
+        :type task_id: int
+        :return: Dictionary object with PL API response content.
+        :rtype: dict
+        """
+        return await self.post(
+            endpoint='posts/add',
+            project_id=project_id,
+            task_id=task_id,
+            description=description,
+            date=date,
+            taken=minutes
+        )
+
+    async def close(self):
+        """
+        Close own HTTP session (shared session passed to constructor is closed by its owner).
+        """
+        if self.owned and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def list(self, endpoint, **kwargs):
+        """
+        Wrapper for :meth:`post` method especially to execute requests to PL `list` endpoints.
+
+        :param endpoint: The PL entity (projects, tasks and so on) to list objects via API request.
+        :type endpoint: str
+        :param kwargs: Request parameters specific to each entity (please see the official PL API reference).
+        :return: Dictionary object with list of requested PL entities.
+        :rtype: dict
+        """
+        return await self.post(endpoint='{endpoint}/list'.format(endpoint=endpoint), **kwargs)
+
+    async def list_projects(self, include_inactive=False):
+        """
+        List projects visible for the provided `user-key`.
+
+        :param include_inactive: Optional argument which allows to include inactive tasks in the result list.
+        :type include_inactive: bool
+        :return: Dictionary object with list of PL projects visible for the `user-key`.
+        :rtype: dict
+        """
+        return await self.list(endpoint='projects', include_inactive=include_inactive)
+
+    async def list_tasks(self, project_id, per_page=-1):
+        """
+        List tasks corresponding to the particular project specified by its ID.
+
+        :param project_id: The parent object ID to query list of tasks.
+        :type project_id: int
+        :param per_page: The maximum number of projects to return in response.
+        :type per_page: int
+        :return: Dictionary object with list of PL tasks related to requested project.
+        :rtype: dict
+        """
+        return await self.list(endpoint='tasks', project_id=project_id, per_page=per_page)
+
+    async def post(self, endpoint, **kwargs):
+        """
+        Prepare provided keyword arguments and send them to the specified PL API endpoint using HTTP POST request.
+
+        :param endpoint: The PL API endpoint to send data using HTTP POST request.
+        :type endpoint: str
+        :param kwargs: Request parameters specific to each endpoint (please see the official PL API reference).
+        :return: Dictionary object with PL API endpoint response content.
+        :rtype: dict
+        """
+        kwargs = self.normalize(items=kwargs)
+        kwargs.update(self.data)
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_workers)
+        url = '{base_url}/{endpoint}'.format(base_url=self.base_url, endpoint=endpoint)
+        async with self.semaphore:
+            status, content = await observe(
+                upstream='pl',
+                endpoint=endpoint,
+                method='POST',
+                request=send(
+                    session=self.session,
+                    method='POST',
+                    url=url,
+                    limiter=self.limiter,
+                    idempotent=endpoint.endswith('/list'),
+                    retries=self.retries,
+                    max_delay=self.timeout.sock_read,
+                    json=kwargs,
+                    ssl=None if self.verify else False,
+                    timeout=self.timeout
+                )
+            )
+        logging.debug(msg=kwargs)
+        return decode(status=status, content=content, url=url)
+
+    async def projects(self, excluded_projects=None):
+        """
+        Combine projects data with tasks data (requested concurrently) into single object with machine-readable
+        structure and optionally exclude particular PL projects.
+
+        :param excluded_projects: List of PL projects names to exclude from result.
+        :type excluded_projects: list
+        :return: Dictionary object with :class:`toggl2pl.models.PLProject` records (with their tasks) by names.
+        :rtype: dict
+        """
+        projects = dict()
+        items = list()
+        for project in (await self.list_projects())['projects']:
+            if excluded_projects and project['name'] in excluded_projects:
+                continue
+            items.append(project)
+        results = await asyncio.gather(*[self.list_tasks(project_id=project['id']) for project in items])
+        for project, tasks in zip(items, results):
+            projects.update(
+                {
+                    project['name']: PLProject(
+                        id=project['id'],
+                        name=project['name'],
+                        tasks={task['title']: PLTask.from_json(data=task) for task in tasks['tasks']['data']}
+                    )
+                }
+            )
+        return projects
+
+
+class AsyncTogglAPIClient(object):
+
+    base_url = TogglAPIClient.base_url
+    burst = TogglAPIClient.burst
+    rate = TogglAPIClient.rate
+    reports_api_url = TogglAPIClient.reports_api_url
+    reports_api_version = TogglAPIClient.reports_api_version
+    retries = TogglAPIClient.retries
+    toggl_api_url = TogglAPIClient.toggl_api_url
+    toggl_api_version = TogglAPIClient.toggl_api_version
+
+    def __init__(self, api_token, user_agent, base_url=None, burst=None, connect_timeout=None, rate=None,
+                 read_timeout=None, session=None):
+        """
+        Initialize a new instance of class object to communicate with Toggl using :mod:`asyncio`.
+
+        :param api_token: The unique authentication token to use instead of username and password.
+        :type api_token: str
+        :param user_agent: The required user agent identifier used to gather application usage statistic.
+        :type user_agent: str
+        :param base_url: Optional Toggl root URL to use instead of the official one (e.g. local stand-in server).
+        :type base_url: str
+        :param burst: Optional maximum number of requests allowed to send at once (shared by all instances with the same
+                      API token).
+        :type burst: int
+        :param connect_timeout: Optional number of seconds to wait for connection to Toggl API.
+        :type connect_timeout: float
+        :param rate: Optional number of requests per second allowed to send to Toggl API.
+        :type rate: float
+        :param read_timeout: Optional number of seconds to wait for Toggl API response.
+        :type read_timeout: float
+        :param session: Optional HTTP session to share connection pool with other clients (otherwise own session is
+                        created on first request and closed by :meth:`close`).
+        :type session: :class:`aiohttp.ClientSession`
+        """
+        self.auth = aiohttp.BasicAuth(login=api_token, password='api_token')
+        if base_url:
+            self.base_url = base_url.rstrip('/')
+            self.reports_api_url = '{base_url}/reports/api/v{reports_api_version}'.format(
+                base_url=self.base_url,
+                reports_api_version=self.reports_api_version
+            )
+            self.toggl_api_url = '{base_url}/api/v{toggl_api_version}'.format(
+                base_url=self.base_url,
+                toggl_api_version=self.toggl_api_version
+            )
+        self.limiter = RateLimiter.shared(key=('toggl', api_token), rate=rate or self.rate, burst=burst or self.burst)
+        self.owned = session is None
+        self.session = session
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=connect_timeout or Transport.connect_timeout,
+            sock_read=read_timeout or Transport.read_timeout
+        )
+        self.user_agent = user_agent
+
+    async def clients(self, wid):
+        """
+        Wrapper for :meth:`list_clients` method to convert list of Toggl clients into machine-readable format.
+
+        :param wid: The unique Toggl workspace ID to list clients.
+        :type wid: int
+        :return: Dictionary object with detailed information about Toggl clients.
+        :rtype: dict
+        """
+        clients = dict()
+        for client in await self.list_clients(wid=wid):
+            clients[client['name']] = client
+            del clients[client['name']]['name']
+        return clients
+
+    async def close(self):
+        """
+        Close own HTTP session (shared session passed to constructor is closed by its owner).
+        """
+        if self.owned and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def create_client(self, name, wid):
+        """
+        Create a new client in the particular Toggl workspace.
+
+        :param name: The client name to create in Toggl workspace.
+        :type name: str
+        :param wid: The unique Toggl workspace ID to create client.
+        :type wid: int
+        :return: Dictionary object with information about the newly created Toggl client.
+        :rtype: dict
+        """
+        return (await self.post(
+            endpoint='clients',
+            client={
+                'name': name,
+                'wid': wid
+            }
+        ))['data']
+
+    async def create_project(self, cid, name, wid):
+        """
+        Create a new client project in the particular Toggl workspace.
+
+        :param cid: The client ID to associate project with.
+        :type cid: int
+        :param name: The name to use for a new project.
+        :type name: str
+        :param wid: The unique Toggl workspace ID to create project.
+        :type wid: int
+        :return: Dictionary object with information about the newly created Toggl project.
+        :rtype: dict
+        """
+        return (await self.post(
+            endpoint='projects',
+            project={
+                'cid': cid,
+                'name': name,
+                'wid': wid
+            }
+        ))['data']
+
+    async def get(self, endpoint, url=None, **kwargs):
+        """
+        Send provided keyword arguments to the combination of Toggl API URL and endpoint using HTTP GET request.
+
+        :param endpoint: The Toggl API endpoint to send data using HTTP GET request.
+        :type endpoint: str
+        :param url: Optional Toggl API URL to send HTTP GET requests (default: :attr:`toggl_api_url`).
+        :type url: str
+        :param kwargs: Request parameters specific to each endpoint (please see the official Toggl API reference).
+        :return: Dictionary object with Toggl API endpoint response content.
+        :rtype: dict
+        """
+        return await self.request(method='GET', endpoint=endpoint, url=url or self.toggl_api_url, params=kwargs)
+
+    async def list_clients(self, wid):
+        """
+        List clients corresponding to the particular Toggl workspace.
+
+        :param wid: The unique Toggl workspace ID to list clients.
+        :type wid: int
+        :return: List of dictionaries with clients descriptions.
+        :rtype: list
+        """
+        clients = await AsyncTogglAPIClient.get(self, endpoint='workspaces/{wid}/clients'.format(wid=wid))
+        if clients:
+            return clients
+        return dict()
+
+    async def me(self):
+        """
+        Fetch information about the currently authenticated user account.
+
+        :return: Dictionary object with information about the currently authenticated user account.
+        :rtype: dict
+        """
+        return (await AsyncTogglAPIClient.get(self, endpoint='me'))['data']
+
+    async def post(self, endpoint, url=None, **kwargs):
+        """
+        Send provided keyword arguments to the combination of Toggl API URL and endpoint using HTTP POST request.
+
+        :param endpoint: The Toggl API endpoint to send data using HTTP POST request.
+        :type endpoint: str
+        :param url: Optional Toggl API URL to send HTTP POST requests (default: :attr:`toggl_api_url`).
+        :type url: str
+        :param kwargs: Request payload specific to each endpoint (please see the official Toggl API reference).
+        :return: Dictionary object with Toggl API endpoint response content.
+        :rtype: dict
+        """
+        return await self.request(method='POST', endpoint=endpoint, url=url or self.toggl_api_url, json=kwargs)
+
+    async def request(self, method, endpoint, url, **kwargs):
+        """
+        Send HTTP request to the combination of Toggl API URL and endpoint and decode JSON response.
+
+        :param method: The HTTP method to use.
+        :type method: str
+        :param endpoint: The Toggl API endpoint to send request.
+        :type endpoint: str
+        :param url: The Toggl API URL to send request.
+        :type url: str
+        :param kwargs: Additional keyword arguments to pass to :meth:`aiohttp.ClientSession.request`.
+        :return: Dictionary object with Toggl API endpoint response content.
+        :rtype: dict
+        """
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        if 'params' in kwargs:
+            # GOTCHA: Unlike requests, aiohttp does not accept non-string query values, so encode them explicitly.
+            kwargs['params'] = {key: str(value) for key, value in kwargs['params'].items()}
+        url = '{url}/{endpoint}'.format(url=url, endpoint=endpoint)
+        status, content = await observe(
+            upstream='toggl',
+            endpoint=endpoint,
+            method=method,
+            request=send(
+                session=self.session,
+                method=method,
+                url=url,
+                limiter=self.limiter,
+                idempotent=method == 'GET',
+                retries=self.retries,
+                max_delay=self.timeout.sock_read,
+                auth=self.auth,
+                timeout=self.timeout,
+                **kwargs
+            )
+        )
+        logging.debug(msg=kwargs)
+        return decode(status=status, content=content, url=url)
+
+    async def workspaces(self, name=None):
+        """
+        List workspaces available for specified API token with optional ability to query single workspace by its name.
+
+        :param name: The optional workspace name to filter results.
+        :type name: str
+        :return: Dictionary object which represents single or all workspaces available for specified API token.
+        :rtype: dict
+        """
+        workspaces = await AsyncTogglAPIClient.get(self, endpoint='workspaces', url=self.toggl_api_url)
+        if name:
+            for workspace in workspaces:
+                if workspace['name'] == name:
+                    return workspace
+        return workspaces
+
+
+class AsyncTogglReportsClient(AsyncTogglAPIClient):
+
+    flatten = staticmethod(TogglReportsClient.flatten)
+    fmt = staticmethod(TogglReportsClient.fmt)
+    group = staticmethod(TogglReportsClient.group)
+    summarize = staticmethod(TogglReportsClient.summarize)
+
+    async def get(self, endpoint, url=None, **kwargs):
+        """
+        Send provided keyword arguments to the combination of Toggl Reports API URL and endpoint using HTTP GET request.
+
+        :param endpoint: The Toggl Reports API endpoint to send data using HTTP GET request.
+        :type endpoint: str
+        :param url: Optional Toggl Reports API URL to send HTTP GET requests (default: :attr:`reports_api_url`).
+        :type url: str
+        :param kwargs: Request parameters specific to each endpoint (please see the official Toggl API reference).
+        :return: Dictionary object with Toggl Reports API endpoint response content.
+        :rtype: dict
+        """
+        return await super().get(endpoint=endpoint, url=url or self.reports_api_url, **kwargs)
+
+    async def details(self, wid, max_workers=2, **kwargs):
+        """
+        Fetch detailed information about tasks related to the specified Toggl workspace page by page.
+
+        :param wid: The Toggl workspace ID to query information about tasks.
+        :type wid: int
+        :param max_workers: Optional limit of concurrently requested pages (keep it low to respect Toggl rate limits).
+        :type max_workers: int
+        :param kwargs: Parameters to query Toggl Reports API (please see official Toggl Reports API for details).
+        :return: Asynchronous generator of :class:`toggl2pl.models.TimeEntry` records in order returned by Toggl Reports
+                 API.
+        :rtype: async_generator
+        """
+        if 'user_ids' not in kwargs:
+            kwargs['user_ids'] = (await self.me())['id']
+        kwargs.update(
+            {
+                'user_agent': self.user_agent,
+                'workspace_id': wid
+            }
+        )
+        report = await self.get(endpoint='details', page=1, **kwargs)
+        for entry in report['data']:
+            yield TimeEntry.from_json(data=entry)
+        pages = math.ceil(report.get('total_count', 0) / (report.get('per_page') or len(report['data']) or 1))
+        max_workers = max(1, max_workers)
+        futures = deque()
+        try:
+            for page in range(2, pages + 1):
+                futures.append(asyncio.ensure_future(self.get(endpoint='details', page=page, **kwargs)))
+                if len(futures) >= max_workers:
+                    for entry in (await futures.popleft())['data']:
+                        yield TimeEntry.from_json(data=entry)
+            while futures:
+                for entry in (await futures.popleft())['data']:
+                    yield TimeEntry.from_json(data=entry)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def days(self, since, until, wid, **kwargs):
+        """
+        Fetch Toggl tasks for the whole date range using a single :meth:`details` pass and split them into daily posts.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type since: str
+        :param until: The end date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type until: str
+        :param wid: The unique Toggl workspace ID to list tasks.
+        :type wid: int
+        :param kwargs: Additional parameters to pass to :meth:`details` method.
+        :return: List of `(date, posts)` pairs sorted by date (days without time entries are omitted).
+        :rtype: list
+        """
+        aggregator = Aggregator(daily=True)
+        async for entry in self.details(wid=wid, since=since, until=until, **kwargs):
+            aggregator.update(entries=(entry,))
+        return aggregator.days()
+
+    async def posts(self, since, until, wid, report='details', **kwargs):
+        """
+        Stream Toggl time entries through :class:`toggl2pl.Aggregator` to aggregate them by projects, format
+        descriptions and round total amount of minutes per project (please see :meth:`toggl2pl.TogglReportsClient.posts`
+        for reports difference and fallback).
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type since: str
+        :param until: The end date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type until: str
+        :param wid: The unique Toggl workspace ID to list tasks.
+        :type wid: int
+        :param report: Optional report to fetch time entries from: `details` (default) or `summary` (with fallback).
+        :type report: str
+        :param kwargs: Additional parameters to pass to :meth:`summary` or :meth:`details` method.
+        :return: Normalized list of Toggl tasks aggregated by projects.
+        :rtype: list
+        """
+        if report == 'summary':
+            try:
+                entries = await self.summary(since=since, until=until, wid=wid, **kwargs)
+            except UpstreamError as ue:
+                if ue.status_code in (401, 403, 429):
+                    raise
+                logging.warning(msg='summary report failed, falling back to details report: {ue}'.format(ue=ue))
+            except (KeyError, TypeError) as ex:
+                logging.warning(msg='unexpected summary report, falling back to details report: {ex}'.format(ex=ex))
+            else:
+                return Aggregator().update(entries=entries).posts()
+        aggregator = Aggregator()
+        async for entry in self.details(wid=wid, since=since, until=until, **kwargs):
+            aggregator.update(entries=(entry,))
+        return aggregator.posts()
+
+    async def projects(self, wid):
+        """
+        Fetch list of the particular workspace projects and rewrite it into dictionary with machine-readable structure.
+
+        :param wid: The unique Toggl workspace ID to list projects.
+        :type wid: int
+        :return: Dictionary object with machine-readable information about projects in the specified workspace.
+        :rtype: dict
+        """
+        projects = dict()
+        items = await AsyncTogglAPIClient.get(self, endpoint='workspaces/{wid}/projects'.format(wid=wid))
+        if not items:
+            logging.debug(msg='it looks like you do not have any Toggl projects yet')
+            return projects
+        for item in items:
+            projects.setdefault(item['cid'], list()).append(item['name'])
+        return projects
+
+    async def stream(self, since, until, wid, **kwargs):
+        """
+        Fetch Toggl tasks sorted by start time and yield daily posts as soon as all time entries of the day are fetched
+        (please see :meth:`toggl2pl.TogglReportsClient.stream`).
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type since: str
+        :param until: The end date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type until: str
+        :param wid: The unique Toggl workspace ID to list tasks.
+        :type wid: int
+        :param kwargs: Additional parameters to pass to :meth:`details` method.
+        :return: Asynchronous generator of `(date, posts)` pairs sorted by date.
+        :rtype: async_generator
+        """
+        kwargs.update({'order_desc': 'off', 'order_field': 'date'})
+        aggregator = Aggregator(daily=True)
+        async for entry in self.details(wid=wid, since=since, until=until, **kwargs):
+            for day in aggregator.feed(entry=entry):
+                yield day
+        for day in aggregator.flush():
+            yield day
+
+    async def summary(self, wid, **kwargs):
+        """
+        Fetch durations of tasks already summed by Toggl per project and time entry description using single `summary`
+        report request (please see :meth:`toggl2pl.TogglReportsClient.summary`).
+
+        :param wid: The Toggl workspace ID to query information about tasks.
+        :type wid: int
+        :param kwargs: Parameters to query Toggl Reports API (please see official Toggl Reports API for details).
+        :return: List of time entries in :meth:`toggl2pl.TogglReportsClient.flatten` format.
+        :rtype: list
+        """
+        if 'user_ids' not in kwargs:
+            kwargs['user_ids'] = (await self.me())['id']
+        kwargs.update(
+            {
+                'grouping': 'projects',
+                'subgrouping': 'time_entries',
+                'user_agent': self.user_agent,
+                'workspace_id': wid
+            }
+        )
+        return self.flatten(report=await self.get(endpoint='summary', **kwargs))
+
+    async def tasks(self, since, until, wid, **kwargs):
+        """
+        Combine clients, projects and tasks information into single object with machine-readable format.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type since: str
+        :param until: The end date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type until: str
+        :param wid: The unique Toggl workspace ID to list tasks.
+        :type wid: int
+        :param kwargs: Additional parameters to pass to :meth:`details` method.
+        :return: Dictionary object with machine-readable information about Toggl tasks during specified range of dates.
+        :rtype: dict
+        """
+        tasks = dict()
+        async for entry in self.details(wid=wid, since=since, until=until, **kwargs):
+            self.group(entries=(entry,), tasks=tasks)
+        return tasks
+
+
+class AsyncClient(object):
+
+    check_workspace = staticmethod(Client.check_workspace)
+
+    def __init__(self, api_token, base_url, user_key, workspace, excluded_projects=None, limits=None,
+                 log_level='info', max_workers=8, report='details', toggl_url=None, verify=True):
+        """
+        Asynchronous counterpart of :class:`toggl2pl.Client` which shares single connection pool between PL and Toggl
+        clients. Instances must be opened with :meth:`open` (or used as asynchronous context manager) before use.
+
+        :param api_token: The Toggl authentication token to use instead of username and password.
+        :type api_token: str
+        :param base_url: The Project Laboratory API base URL in format `<scheme>://<domain>/<uri>`.
+        :type base_url: str
+        :param user_key: The Project Laboratory authentication token to use instead of username and password.
+        :type user_key: str
+        :param workspace: The Toggl workspace name (case sensitive) to pull information from.
+        :type workspace: str
+        :param excluded_projects: Optional list of Project Laboratory projects names to exclude from pull.
+        :type excluded_projects: list
+        :param limits: Optional rate limits and timeouts (`rate`, `burst`, `connect_timeout` and `read_timeout` values)
+                       per upstream, e.g. `{'toggl': {'rate': 1}}`.
+        :type limits: dict
+        :param log_level: Optional logging level name to configure logging verbosity (default: `info`).
+        :type log_level: str
+        :param max_workers: Optional limit of concurrent requests to Project Laboratory API.
+        :type max_workers: int
+        :param report: Optional Toggl report to pull posts for the whole period from: `details` (default) or `summary`.
+        :type report: str
+        :param toggl_url: Optional Toggl root URL to use instead of the official one (e.g. local stand-in server).
+        :type toggl_url: str
+        :param verify: Optional argument which allows to disable TLS connection verification.
+        :type verify: bool
+        """
+        self.api_token = api_token
+        self.base_url = base_url
+        self.excluded_projects = excluded_projects
+        self.limits = limits or dict()
+        self.log_level = log_level
+        self.max_workers = max_workers
+        self.me = None
+        self.pl = None
+        self.projects = None
+        self.report = report
+        self.session = None
+        self.toggl = None
+        self.toggl_url = toggl_url
+        self.user_key = user_key
+        self.verify = verify
+        self.workspace = None
+        self.workspace_name = workspace
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def add_post(self, date, description, minutes, project, task):
+        """
+        Create a new post in Project Laboratory about specific task execution details.
+
+        :param date: The date when work was actually done in ISO 8601 (`YYYY-MM-DD`) format.
+        :type date: str
+        :param description: Relatively short description of the work done as a part of the parent task.
+        :type description: str
+        :param minutes: Total amount of minutes spent during work on the task entry.
+        :type minutes: int
+        :param project: The project name in Project Laboratory database corresponding task belongs to.
+        :type project: str
+        :param task: The task name in Project Laboratory database to create new post.
+        :type task: str
+        :return: Dictionary object with PL API response content.
+        :rtype: dict
+        """
+        return await self.pl.add_post(
+            date=date,
+            description=description,
+            minutes=minutes,
+            project_id=self.projects[project].id,
+            task_id=self.projects[project].tasks[task].id
+        )
+
+    async def close(self):
+        """
+        Close shared HTTP session and release all pooled connections.
+        """
+        for client in (self.pl, self.toggl):
+            if client is not None:
+                await client.close()
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    @classmethod
+    async def create(cls, **kwargs):
+        """
+        Create a new instance of class object and open it (i.e. load metadata from PL and Toggl).
+
+        :param kwargs: Keyword arguments to pass to class constructor.
+        :return: Opened instance of class object.
+        :rtype: :class:`AsyncClient`
+        """
+        return await cls(**kwargs).open()
+
+    async def days(self, since, until):
+        """
+        Pull list of Toggl posts between since and until dates split by days.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type since: str
+        :param until: The end date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type until: str
+        :return: List of `(date, posts)` pairs sorted by date.
+        :rtype: list
+        """
+        return await self.toggl.days(since=since, until=until, wid=self.workspace['id'], user_ids=self.me['id'])
+
+    async def open(self):
+        """
+        Create shared HTTP session and load PL projects and Toggl user and workspace metadata concurrently.
+
+        :return: The same instance of class object.
+        :rtype: :class:`AsyncClient`
+        """
+        self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=max(1, self.max_workers) * 2))
+        self.pl = AsyncPL(
+            app_key=APP_KEY,
+            base_url=self.base_url,
+            log_level=self.log_level,
+            max_workers=self.max_workers,
+            session=self.session,
+            user_key=self.user_key,
+            verify=self.verify,
+            **self.limits.get('pl', dict())
+        )
+        self.toggl = AsyncTogglReportsClient(
+            api_token=self.api_token,
+            user_agent=APP_KEY,
+            base_url=self.toggl_url,
+            session=self.session,
+            **self.limits.get('toggl', dict())
+        )
+        try:
+            await self.refresh()
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def posts(self, since, until):
+        """
+        Pull list of Toggl posts between since and until dates.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type since: str
+        :param until: The end date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type until: str
+        :return: Normalized list of Toggl tasks aggregated by projects.
+        :rtype: list
+        """
+        return await self.toggl.posts(
+            since=since,
+            until=until,
+            wid=self.workspace['id'],
+            report=self.report,
+            user_ids=self.me['id']
+        )
+
+    async def refresh(self):
+        """
+        Reload Project Laboratory projects and Toggl user and workspace metadata concurrently.
+        """
+        self.projects, self.me, workspace = await asyncio.gather(
+            self.pl.projects(excluded_projects=self.excluded_projects),
+            self.toggl.me(),
+            self.toggl.workspaces(name=self.workspace_name)
+        )
+        self.workspace = self.check_workspace(workspace=workspace)
+
+    def stream(self, since, until):
+        """
+        Pull Toggl posts between since and until dates day by day.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type since: str
+        :param until: The end date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type until: str
+        :return: Asynchronous generator of `(date, posts)` pairs sorted by date.
+        :rtype: async_generator
+        """
+        return self.toggl.stream(since=since, until=until, wid=self.workspace['id'], user_ids=self.me['id'])
+
+    async def sync(self, max_workers=4):
+        """
+        Synchronize projects and tasks from Project Laboratory into Toggl.
+
+        :param max_workers: Optional limit of concurrent create requests (the actual rate is limited by Toggl client).
+        :type max_workers: int
+        """
+        wid = self.workspace['id']
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def bounded(coroutine):
+            async with semaphore:
+                return await coroutine
+
+        clients, projects = await asyncio.gather(self.toggl.clients(wid=wid), self.toggl.projects(wid=wid))
+        missing = [project for project in self.projects if project not in clients]
+        created = await asyncio.gather(*[bounded(self.toggl.create_client(name=name, wid=wid)) for name in missing])
+        for client in created:
+            clients[client.pop('name')] = client
+        items = list()
+        for project in self.projects:
+            names = projects.get(clients[project]['id'], list())
+            for item in self.projects[project].tasks:
+                if item not in names:
+                    items.append(bounded(self.toggl.create_project(cid=clients[project]['id'], name=item, wid=wid)))
+        await asyncio.gather(*items)
+
+
+def decode(status, content, url):
+    """
+    Decode JSON response content of upstream API or raise exception in case request failed.
+
+    :param status: The HTTP response status code.
+    :type status: int
+    :param content: The HTTP response content.
+    :type content: bytes
+    :param url: The URL of the request.
+    :type url: str
+    :return: Object with upstream API response content.
+    :raises toggl2pl.UpstreamError: In case upstream API responded with unexpected status code or content.
+    """
+    if status != 200:
+        raise UpstreamError(
+            '{status_code}: {content}'.format(status_code=status, content=content),
+            content=content,
+            status_code=status,
+            url=url
+        )
+    try:
+        return json.loads(content)
+    except ValueError as ve:
+        raise UpstreamError(
+            'invalid response: {content}'.format(content=content),
+            content=content,
+            status_code=status,
+            url=url
+        ) from ve
+
+
+async def observe(upstream, endpoint, method, request):
+    """
+    Await upstream API request and record its outcome and duration into :mod:`toggl2pl.metrics` registry.
+
+    :param upstream: The upstream name (`pl` or `toggl`).
+    :type upstream: str
+    :param endpoint: The API endpoint used as metrics label.
+    :type endpoint: str
+    :param method: The HTTP method.
+    :type method: str
+    :param request: The coroutine returned by :func:`send`.
+    :return: Tuple with HTTP status code and response content.
+    :rtype: tuple
+    """
+    started = perf_counter()
+    status = 'error'
+    try:
+        status, content = await request
+        return status, content
+    finally:
+        metrics.observe_upstream(
+            upstream=upstream,
+            path=endpoint,
+            method=method,
+            status=status,
+            seconds=perf_counter() - started
+        )
+
+
+async def send(session, method, url, limiter, idempotent=True, retries=3, backoff=0.5, max_delay=60, **kwargs):
+    """
+    Send HTTP request respecting rate limits and retry throttled (and failed idempotent) requests.
+
+    :param session: The HTTP session to use.
+    :type session: :class:`aiohttp.ClientSession`
+    :param method: The HTTP method to use.
+    :type method: str
+    :param url: The URL to send request.
+    :type url: str
+    :param limiter: The rate limiter to reserve slot before every attempt.
+    :type limiter: :class:`toggl2pl.RateLimiter`
+    :param idempotent: Optional flag which shows if request is safe to repeat on server errors and timeouts.
+    :type idempotent: bool
+    :param retries: Optional number of times to retry failed request.
+    :type retries: int
+    :param backoff: Optional base number of seconds for exponential backoff.
+    :type backoff: float
+    :param max_delay: Optional maximum number of seconds to wait before retry (even if upstream asks to wait longer).
+    :type max_delay: float
+    :param kwargs: Additional keyword arguments to pass to :meth:`aiohttp.ClientSession.request`.
+    :return: Tuple with HTTP status code and response content of the last attempt.
+    :rtype: tuple
+    :raises toggl2pl.UpstreamConnectionError: In case connection failed or timed out and request must not be retried.
+    """
+    for attempt in range(retries + 1):
+        delay = limiter.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            async with session.request(method=method, url=url, **kwargs) as response:
+                status, content = response.status, await response.read()
+                delay = retry_delay(
+                    status_code=status,
+                    headers=response.headers,
+                    attempt=attempt,
+                    idempotent=idempotent,
+                    backoff=backoff,
+                    max_delay=max_delay
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            # GOTCHA: Unlike failed connection attempts, the request may be already processed by upstream in case of
+            # timeout or disconnect, so only idempotent requests are repeated.
+            if not (idempotent or isinstance(ex, aiohttp.ClientConnectorError)) or attempt == retries:
+                raise UpstreamConnectionError(str(ex) or type(ex).__name__, url=url) from ex
+            delay = backoff * 2 ** attempt
+            logging.debug(msg='{ex!r}: retry {url} in {delay} seconds'.format(ex=ex, url=url, delay=delay))
+            await asyncio.sleep(delay)
+            continue
+        if delay is None:
+            limiter.recover()
+            return status, content
+        if attempt == retries:
+            return status, content
+        logging.debug(msg='{status_code}: retry {url} in {delay} seconds'.format(
+            status_code=status,
+            url=url,
+            delay=delay
+        ))
+        limiter.backoff(delay=delay)
@@ -0,0 +1,440 @@
+from collections import OrderedDict
+from threading import Lock, Thread
+from time import monotonic, time
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+
+def fingerprint(**kwargs):
+    """
+    Calculate stable hash of the provided keyword arguments to use as a cache key without storing credentials in plain.
+
+    :param kwargs: JSON serializable values (credentials, workspace name and so on) to calculate hash of.
+    :return: Hexadecimal SHA-256 digest of the provided keyword arguments.
+    :rtype: str
+    """
+    return hashlib.sha256(json.dumps(kwargs, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class ClientCache(object):
+
+    def __init__(self, factory, maxsize=32, ttl=300):
+        """
+        Thread-safe LRU cache of authenticated clients with TTL based background metadata refresh.
+
+        Cached clients keep their HTTP sessions and projects metadata warm between requests. Once an entry becomes older
+        than `ttl` seconds it is still returned to callers while its metadata is refreshed by a background thread.
+
+        :param factory: Callable object to create a new client from the keyword arguments passed to :meth:`get`.
+        :type factory: callable
+        :param maxsize: The maximum number of clients to keep in cache (least recently used are evicted first).
+        :type maxsize: int
+        :param ttl: The number of seconds after which client metadata considered stale and refreshed.
+        :type ttl: int
+        """
+        self.counters = {
+            'evictions': 0,
+            'hits': 0,
+            'misses': 0,
+            'refreshes': 0
+        }
+        self.entries = OrderedDict()
+        self.factory = factory
+        self.lock = Lock()
+        self.maxsize = maxsize
+        self.pending = dict()
+        self.ttl = ttl
+
+    def get(self, **kwargs):
+        """
+        Get cached client for the provided credentials or create a new one using the configured factory.
+
+        :param kwargs: Keyword arguments to pass to the client factory (also used to calculate the cache key).
+        :return: Client object created by the configured factory.
+        """
+        key = fingerprint(**kwargs)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.counters['hits'] += 1
+                return self.touch(key=key, entry=entry)
+            self.counters['misses'] += 1
+            pending = self.pending.setdefault(key, Lock())
+        # GOTCHA: Clients are created outside of the main lock since it requires a number of upstream API calls, but
+        # concurrent requests with the same credentials wait for the single client instead of building their own.
+        with pending:
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None:
+                    return self.touch(key=key, entry=entry)
+            try:
+                client = self.factory(**kwargs)
+            except BaseException:
+                with self.lock:
+                    self.pending.pop(key, None)
+                raise
+            # NOTE: The pending lock is released only once the entry is stored, so requests which come in between see
+            # either the pending lock or the cached client.
+            with self.lock:
+                self.entries[key] = {
+                    'client': client,
+                    'refreshing': False,
+                    'timestamp': monotonic()
+                }
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+                    self.counters['evictions'] += 1
+                self.pending.pop(key, None)
+        return client
+
+    def invalidate(self, **kwargs):
+        """
+        Remove cached client for the provided credentials (for example, when its metadata is known to be outdated).
+
+        :param kwargs: Keyword arguments previously passed to :meth:`get`.
+        :return: Boolean flag which shows if any client was actually removed from cache.
+        :rtype: bool
+        """
+        with self.lock:
+            return self.entries.pop(fingerprint(**kwargs), None) is not None
+
+    def refresh(self, key, entry):
+        """
+        Refresh cached client metadata (executed in background thread started by :meth:`get`).
+
+        :param key: The cache key of the entry to refresh.
+        :type key: str
+        :param entry: The cache entry to refresh.
+        :type entry: dict
+        """
+        try:
+            entry['client'].refresh()
+            entry['timestamp'] = monotonic()
+        except Exception as ex:
+            logging.warning(msg='failed to refresh cached client, evicting it: {ex}'.format(ex=ex))
+            with self.lock:
+                if self.entries.get(key) is entry:
+                    del self.entries[key]
+        finally:
+            entry['refreshing'] = False
+
+    def stats(self):
+        """
+        Collect cache statistics (useful for monitoring).
+
+        :return: Dictionary object with the number of cached clients and hits, misses, evictions and refreshes counters.
+        :rtype: dict
+        """
+        with self.lock:
+            stats = dict(self.counters)
+            stats['size'] = len(self.entries)
+        return stats
+
+    def touch(self, key, entry):
+        """
+        Mark cache entry as recently used and schedule its background refresh if entry is stale.
+
+        :param key: The cache key of the entry to touch (must be called while holding the cache lock).
+        :type key: str
+        :param entry: The cache entry to touch.
+        :type entry: dict
+        :return: Client object stored in the cache entry.
+        """
+        self.entries.move_to_end(key)
+        if monotonic() - entry['timestamp'] > self.ttl and not entry['refreshing']:
+            entry['refreshing'] = True
+            self.counters['refreshes'] += 1
+            Thread(target=self.refresh, kwargs={'key': key, 'entry': entry}, daemon=True).start()
+        return entry['client']
+
+
+class MetadataCache(object):
+
+    # Locks shared by instances which use the same cache file (e.g. several team members configured in one directory)
+    locks = dict()
+    locks_lock = Lock()
+
+    # The cache file format version (entries stored using other versions are discarded)
+    version = 1
+
+    def __init__(self, path, namespace, ttl=86400, refresh=False):
+        """
+        Persistent on-disk cache of rarely changed metadata (projects, tasks, clients, user and workspaces information).
+
+        The cache file may be shared between multiple accounts, since entries are stored in separate namespaces which
+        are calculated as a hash of credentials and API URLs.
+
+        :param path: The path to JSON file to store cache entries in.
+        :type path: str
+        :param namespace: The cache namespace (e.g. the result of :func:`fingerprint` of credentials and base URL).
+        :type namespace: str
+        :param ttl: The default number of seconds after which cache entries considered stale and fetched again.
+        :type ttl: int
+        :param refresh: Optional flag to ignore existing entries and fetch all of them again.
+        :type refresh: bool
+        """
+        with self.locks_lock:
+            self.lock = self.locks.setdefault(os.path.abspath(path), Lock())
+        self.namespace = namespace
+        self.path = path
+        self.refresh = refresh
+        self.refreshed = set()
+        self.ttl = ttl
+
+    def fetch(self, name, loader, ttl=None):
+        """
+        Get fresh cache entry value or load it using the provided callable object and store into the cache file.
+
+        :param name: The cache entry name unique within the namespace.
+        :type name: str
+        :param loader: Callable object to load entry value in case cache entry is missing or stale.
+        :type loader: callable
+        :param ttl: Optional number of seconds to use instead of default entry time to live.
+        :type ttl: int
+        :return: JSON serializable value loaded from cache file or by the provided loader.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self.lock:
+            entry = self.load().get(self.namespace, dict()).get(name)
+        if entry and (not self.refresh or name in self.refreshed) and time() - entry['timestamp'] < ttl:
+            logging.debug(msg='using cached {name}'.format(name=name))
+            return entry['value']
+        value = loader()
+        self.store(name=name, value=value)
+        return value
+
+    def get(self, name):
+        """
+        Get cache entry value regardless of its age (e.g. to revalidate it with upstream using stored ETag).
+
+        :param name: The cache entry name unique within the namespace.
+        :type name: str
+        :return: JSON serializable value stored in the cache file or `None` in case entry is missing or refresh is
+                 forced.
+        """
+        with self.lock:
+            entry = self.load().get(self.namespace, dict()).get(name)
+        if entry is None or (self.refresh and name not in self.refreshed):
+            return None
+        return entry['value']
+
+    def invalidate(self, *names):
+        """
+        Remove cache entries by their names or all entries from the namespace in case no names provided.
+
+        :param names: The cache entries names to remove.
+        :type names: str
+        """
+        with self.lock:
+            data = self.load()
+            if self.namespace not in data:
+                return
+            if not names:
+                del data[self.namespace]
+            for name in names:
+                data[self.namespace].pop(name, None)
+            self.save(data=data)
+
+    def load(self):
+        """
+        Load cache entries from file (missing, corrupted or incompatible files are treated as empty cache).
+
+        :return: Dictionary object with cache entries grouped by namespaces.
+        :rtype: dict
+        """
+        try:
+            with open(self.path, 'r') as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return dict()
+        if not isinstance(data, dict) or data.get('version') != self.version:
+            return dict()
+        return data['namespaces']
+
+    def save(self, data):
+        """
+        Atomically write cache entries into file (errors are logged and ignored since cache is optional).
+
+        :param data: Dictionary object with cache entries grouped by namespaces.
+        :type data: dict
+        """
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            fd, path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix='.tmp')
+            with os.fdopen(fd, 'w') as fp:
+                json.dump({'namespaces': data, 'version': self.version}, fp)
+            os.replace(path, self.path)
+        except OSError as ex:
+            logging.warning(msg='failed to save metadata cache: {ex}'.format(ex=ex))
+
+    def store(self, name, value):
+        """
+        Store cache entry value into the cache file (e.g. to update entry after related remote objects were changed).
+
+        :param name: The cache entry name unique within the namespace.
+        :type name: str
+        :param value: JSON serializable value to store.
+        """
+        with self.lock:
+            data = self.load()
+            data.setdefault(self.namespace, dict())[name] = {
+                'timestamp': time(),
+                'value': value
+            }
+            self.refreshed.add(name)
+            self.save(data=data)
+
+
+class ResponseCache(object):
+
+    def __init__(self, maxsize=256, ttl=60):
+        """
+        Thread-safe LRU cache of serialized API service responses with short TTL and strong ETags.
+
+        Each entry belongs to a scope (e.g. hash of user credentials) and covers a range of dates, so entries affected
+        by changes made on particular date can be invalidated without knowing exact cache keys. Responses computed
+        while their scope was invalidated are not stored, so cache never serves data older than the last change.
+
+        :param maxsize: The maximum number of responses to keep in cache (least recently used are evicted first).
+        :type maxsize: int
+        :param ttl: The number of seconds to keep responses (zero disables cache).
+        :type ttl: int
+        """
+        self.counters = {
+            'evictions': 0,
+            'hits': 0,
+            'invalidations': 0,
+            'misses': 0
+        }
+        self.entries = OrderedDict()
+        self.generations = dict()
+        self.lock = Lock()
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+    def generation(self, scope):
+        """
+        Get the current generation of the scope to pass to :meth:`put` once response is computed.
+
+        :param scope: The entries scope (e.g. hash of user credentials).
+        :type scope: str
+        :return: The number of scope invalidations.
+        :rtype: int
+        """
+        with self.lock:
+            return self.generations.get(scope, 0)
+
+    def get(self, key):
+        """
+        Get fresh cache entry.
+
+        :param key: The cache key (e.g. hash of request parameters).
+        :type key: str
+        :return: Dictionary object with `content` and `etag` of the cached response or `None` in case of miss.
+        :rtype: dict
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or monotonic() - entry['timestamp'] > entry['ttl']:
+                self.counters['misses'] += 1
+                return None
+            self.counters['hits'] += 1
+            self.entries.move_to_end(key)
+            return entry
+
+    def invalidate(self, scope, date=None):
+        """
+        Remove scope entries which cover the provided date (or all scope entries in case date is not provided).
+
+        :param scope: The entries scope (e.g. hash of user credentials).
+        :type scope: str
+        :param date: Optional date in ISO 8601 (`YYYY-MM-DD`) format affected by the change.
+        :type date: str
+        :return: The number of removed entries.
+        :rtype: int
+        """
+        with self.lock:
+            self.generations[scope] = self.generations.get(scope, 0) + 1
+            keys = [
+                key for key, entry in self.entries.items()
+                if entry['scope'] == scope and (date is None or entry['since'] <= date <= entry['until'])
+            ]
+            for key in keys:
+                del self.entries[key]
+            self.counters['invalidations'] += len(keys)
+        return len(keys)
+
+    def peek(self, key):
+        """
+        Get cache entry even if it is expired without updating statistics and LRU order (e.g. to compare with a new
+        response before storing it).
+
+        :param key: The cache key (e.g. hash of request parameters).
+        :type key: str
+        :return: Dictionary object with `content` and `etag` of the cached response or `None` in case it is not stored.
+        :rtype: dict
+        """
+        with self.lock:
+            return self.entries.get(key)
+
+    def put(self, key, scope, since, until, content, generation=None, ttl=None):
+        """
+        Store serialized response and calculate its strong ETag.
+
+        :param key: The cache key (e.g. hash of request parameters).
+        :type key: str
+        :param scope: The entries scope (e.g. hash of user credentials).
+        :type scope: str
+        :param since: The first date in ISO 8601 (`YYYY-MM-DD`) format covered by response.
+        :type since: str
+        :param until: The last date in ISO 8601 (`YYYY-MM-DD`) format covered by response.
+        :type until: str
+        :param content: The serialized response content.
+        :type content: bytes
+        :param generation: Optional scope generation returned by :meth:`generation` before response was computed (the
+                           entry is not stored in case scope was invalidated since then).
+        :type generation: int
+        :param ttl: Optional number of seconds to keep this response instead of the cache default (e.g. to keep
+                    prefetched responses until the next prefetch).
+        :type ttl: int
+        :return: Dictionary object with `content` and `etag` of the response (even if it was not stored).
+        :rtype: dict
+        """
+        entry = {
+            'content': content,
+            'etag': hashlib.sha256(content).hexdigest()[:32],
+            'scope': scope,
+            'since': since,
+            'timestamp': monotonic(),
+            'ttl': self.ttl if ttl is None else ttl,
+            'until': until
+        }
+        with self.lock:
+            if entry['ttl'] <= 0 or (generation is not None and generation != self.generations.get(scope, 0)):
+                return entry
+            previous = self.entries.get(key)
+            if previous is not None and previous['etag'] == entry['etag'] and 'variants' in previous:
+                # GOTCHA: Unchanged response keeps already built representations, so refresh does not rebuild them
+                entry['variants'] = previous['variants']
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.counters['evictions'] += 1
+        return entry
+
+    def stats(self):
+        """
+        Collect cache statistics (useful for monitoring).
+
+        :return: Dictionary object with the number of cached responses and hits, misses, evictions and invalidations
+                 counters.
+        :rtype: dict
+        """
+        with self.lock:
+            stats = dict(self.counters)
+            stats['size'] = len(self.entries)
+        return stats
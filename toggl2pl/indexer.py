@@ -0,0 +1,244 @@
+from datetime import date, datetime
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from time import monotonic
+import json
+import logging
+import os
+
+
+class Indexer(object):
+
+    # The sentinel object put into the queue to stop the background worker
+    stop = object()
+
+    def __init__(self, hosts, batch_size=500, doc_type='toggl', flush_interval=5, index='toggl', maxsize=10000,
+                 spill_path=None):
+        """
+        Process-wide Elasticsearch indexing queue drained by a single background worker using the bulk API.
+
+        Documents are buffered in a bounded in-memory queue, so request handlers never wait for Elasticsearch. The
+        worker sends buffered documents once `batch_size` documents are collected or `flush_interval` seconds passed.
+        Batches which can not be indexed (e.g. Elasticsearch is unavailable) are appended to the spill file and replayed
+        after the next successful bulk request, while new documents are dropped in case the queue is full.
+
+        :param hosts: List of Elasticsearch nodes URLs to connect to.
+        :type hosts: list
+        :param batch_size: The maximum number of documents to send using single bulk request.
+        :type batch_size: int
+        :param doc_type: The Elasticsearch mapping type of documents (required by Elasticsearch 6.x clusters).
+        :type doc_type: str
+        :param flush_interval: The maximum number of seconds to keep documents in the queue before sending them.
+        :type flush_interval: float
+        :param index: The Elasticsearch index name to store documents in.
+        :type index: str
+        :param maxsize: The maximum number of documents waiting in the queue (new documents are dropped when exceeded).
+        :type maxsize: int
+        :param spill_path: Optional path to JSON lines file to keep documents which failed to be indexed.
+        :type spill_path: str
+        """
+        self.batch_size = max(1, batch_size)
+        self.counters = {
+            'dropped': 0,
+            'failed': 0,
+            'indexed': 0,
+            'spilled': 0
+        }
+        self.doc_type = doc_type
+        self.es = None
+        self.flush_interval = flush_interval
+        self.hosts = hosts
+        self.index = index
+        self.lock = Lock()
+        self.queue = Queue(maxsize=maxsize)
+        self.spill_path = spill_path
+        self.worker = None
+
+    def bulk(self, documents):
+        """
+        Send documents to Elasticsearch using single bulk request (the client is created once on the first call).
+
+        :param documents: List of documents to index.
+        :type documents: list
+        :return: The number of successfully indexed documents.
+        :rtype: int
+        """
+        from elasticsearch import Elasticsearch, helpers
+        if self.es is None:
+            self.es = Elasticsearch(hosts=self.hosts)
+        actions = ({'_index': self.index, '_source': document, '_type': self.doc_type} for document in documents)
+        indexed, errors = helpers.bulk(client=self.es, actions=actions, raise_on_error=False)
+        if errors:
+            logging.warning(msg='failed to index {count} documents: {errors}'.format(count=len(errors), errors=errors))
+            self.count(name='failed', value=len(errors))
+        return indexed
+
+    def close(self, timeout=None):
+        """
+        Stop the background worker after all queued documents are processed.
+
+        :param timeout: Optional number of seconds to wait for the worker to finish.
+        :type timeout: float
+        """
+        with self.lock:
+            worker, self.worker = self.worker, None
+        if worker is None:
+            return
+        self.queue.put(self.stop)
+        worker.join(timeout=timeout)
+
+    def count(self, name, value=1):
+        """
+        Increment the particular statistics counter in thread-safe way.
+
+        :param name: The counter name.
+        :type name: str
+        :param value: The value to add to the counter.
+        :type value: int
+        """
+        with self.lock:
+            self.counters[name] += value
+
+    def flush(self, documents):
+        """
+        Index batch of documents and replay spilled documents or spill the batch in case Elasticsearch is unavailable.
+
+        :param documents: List of documents to index.
+        :type documents: list
+        """
+        if not documents:
+            return
+        try:
+            self.count(name='indexed', value=self.bulk(documents=documents))
+        except Exception as ex:
+            logging.warning(msg='failed to send documents to Elasticsearch: {ex}'.format(ex=ex))
+            self.spill(documents=documents)
+            return
+        self.replay()
+
+    def put(self, document):
+        """
+        Enqueue document for indexing without blocking the caller (the background worker is started on demand).
+
+        :param document: The document to index.
+        :type document: dict
+        :return: Boolean flag which shows if document was accepted (i.e. the queue was not full).
+        :rtype: bool
+        """
+        self.start()
+        try:
+            self.queue.put_nowait(document)
+        except Full:
+            self.count(name='dropped')
+            return False
+        return True
+
+    def replay(self):
+        """
+        Send documents previously stored in the spill file (executed after successful bulk request).
+        """
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        path = '{path}.replay'.format(path=self.spill_path)
+        try:
+            os.replace(self.spill_path, path)
+            with open(path, 'r') as fp:
+                documents = [json.loads(line) for line in fp if line.strip()]
+            os.remove(path)
+        except (OSError, ValueError) as ex:
+            logging.warning(msg='failed to read spilled documents: {ex}'.format(ex=ex))
+            return
+        for i in range(0, len(documents), self.batch_size):
+            batch = documents[i:i + self.batch_size]
+            try:
+                self.count(name='indexed', value=self.bulk(documents=batch))
+            except Exception as ex:
+                logging.warning(msg='failed to replay spilled documents: {ex}'.format(ex=ex))
+                self.spill(documents=documents[i:], counted=True)
+                return
+
+    def run(self):
+        """
+        Drain the queue and send documents in batches until the stop sentinel is received (background worker target).
+        """
+        batch = list()
+        deadline = monotonic() + self.flush_interval
+        while True:
+            try:
+                document = self.queue.get(timeout=max(0, deadline - monotonic()))
+            except Empty:
+                document = None
+            if document is self.stop:
+                self.flush(documents=batch)
+                return
+            if document is not None:
+                batch.append(document)
+            if len(batch) >= self.batch_size or monotonic() >= deadline:
+                self.flush(documents=batch)
+                batch = list()
+                deadline = monotonic() + self.flush_interval
+
+    def spill(self, documents, counted=False):
+        """
+        Append documents to the spill file to replay them later (documents are dropped in case spill file is not set).
+
+        :param documents: List of documents which failed to be indexed.
+        :type documents: list
+        :param counted: Optional flag to skip statistics update for documents which were already spilled before.
+        :type counted: bool
+        """
+        if not self.spill_path:
+            self.count(name='dropped', value=len(documents))
+            return
+        try:
+            with open(self.spill_path, 'a') as fp:
+                for document in documents:
+                    fp.write(json.dumps(document, default=serialize) + '\n')
+        except OSError as ex:
+            logging.warning(msg='failed to spill documents: {ex}'.format(ex=ex))
+            self.count(name='dropped', value=len(documents))
+            return
+        if not counted:
+            self.count(name='spilled', value=len(documents))
+
+    def start(self):
+        """
+        Start the background worker thread unless it is already running.
+        """
+        with self.lock:
+            if self.worker is not None:
+                return
+            self.worker = Thread(target=self.run, name='indexer', daemon=True)
+            self.worker.start()
+
+    def stats(self):
+        """
+        Collect indexing queue statistics (useful for monitoring).
+
+        :return: Dictionary object with the queue depth and indexed, failed, spilled and dropped documents counters.
+        :rtype: dict
+        """
+        with self.lock:
+            stats = dict(self.counters)
+        stats.update(
+            {
+                'maxsize': self.queue.maxsize,
+                'queued': self.queue.qsize(),
+                'running': self.worker is not None
+            }
+        )
+        return stats
+
+
+def serialize(value):
+    """
+    Convert dates into ISO 8601 strings to store documents in the spill file (used as :func:`json.dumps` default).
+
+    :param value: The value not serializable by :mod:`json` module.
+    :return: ISO 8601 representation of date and datetime objects.
+    :rtype: str
+    :raises TypeError: In case the value is not a date or datetime object.
+    """
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError('object of type {name} is not JSON serializable'.format(name=type(value).__name__))
@@ -0,0 +1,167 @@
+from threading import Lock
+from time import time
+import hashlib
+import json
+import logging
+import sqlite3
+
+
+class Ledger(object):
+
+    # The table of published posts (rows are only inserted, so the ledger is an append-only journal)
+    schema = '''
+        CREATE TABLE IF NOT EXISTS posts (
+            namespace TEXT NOT NULL,
+            date TEXT NOT NULL,
+            project TEXT NOT NULL,
+            task TEXT NOT NULL,
+            digest TEXT NOT NULL,
+            description TEXT NOT NULL,
+            duration INTEGER NOT NULL,
+            minutes INTEGER NOT NULL,
+            response TEXT,
+            published REAL NOT NULL,
+            PRIMARY KEY (namespace, date, project, task, digest)
+        ) WITHOUT ROWID
+    '''
+
+    def __init__(self, path, namespace):
+        """
+        Local journal of posts published into Project Laboratory stored in SQLite database, so interrupted exports can
+        be re-run without publishing the same posts twice.
+
+        Every post is identified by its date, project, task and description hash and recorded right after PL confirmed
+        publishing, so re-run skips exactly the posts published before interruption (only the posts which were being
+        published at the moment of interruption may be published again).
+
+        :param path: The path to SQLite database file (created if does not exist).
+        :type path: str
+        :param namespace: The unique name of PL account (e.g. hash of PL URL and user key) to keep posts of different
+                          accounts separately in the same file.
+        :type namespace: str
+        """
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(self.schema)
+        self.lock = Lock()
+        self.namespace = namespace
+        self.skipped = 0
+
+    def close(self):
+        """
+        Close database connection.
+        """
+        with self.lock:
+            self.connection.close()
+
+    def contains(self, date, post):
+        """
+        Check if the post has been already published.
+
+        :param date: The date in ISO 8601 (`YYYY-MM-DD`) format when work was actually done.
+        :type date: str
+        :param post: The post in `[project, task, description, duration, rounded]` format.
+        :type post: list
+        :return: Flag which shows if the post is recorded in the ledger.
+        :rtype: bool
+        """
+        with self.lock:
+            cursor = self.connection.execute(
+                'SELECT 1 FROM posts WHERE namespace = ? AND date = ? AND project = ? AND task = ? AND digest = ?',
+                (self.namespace,) + self.key(date=date, post=post)
+            )
+            return cursor.fetchone() is not None
+
+    @staticmethod
+    def key(date, post):
+        """
+        Build the unique ledger key of the post.
+
+        :param date: The date in ISO 8601 (`YYYY-MM-DD`) format when work was actually done.
+        :type date: str
+        :param post: The post in `[project, task, description, duration, rounded]` format.
+        :type post: list
+        :return: Tuple of date, project, task and description hash.
+        :rtype: tuple
+        """
+        project, task, description = post[:3]
+        return date, project, task, hashlib.sha256(description.encode('utf-8')).hexdigest()
+
+    def pending(self, items):
+        """
+        Filter out posts which have been already published (the number of skipped posts is counted in :attr:`skipped`).
+
+        :param items: Iterable of `(date, post)` pairs (consumed lazily).
+        :type items: iterable
+        :return: Generator of `(date, post)` pairs which are not recorded in the ledger.
+        :rtype: generator
+        """
+        for date, post in items:
+            if self.contains(date=date, post=post):
+                logging.debug(msg='skipping post already published on {date}: {post}'.format(date=date, post=post))
+                self.skipped += 1
+                continue
+            yield date, post
+
+    def posts(self, since, until=None):
+        """
+        List posts published for the work done in period between since and until dates.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format.
+        :type since: str
+        :param until: Optional last date in ISO 8601 (`YYYY-MM-DD`) format (default: the same as since date).
+        :type until: str
+        :return: List of dictionaries with posts details sorted by dates and publishing time.
+        :rtype: list
+        """
+        with self.lock:
+            cursor = self.connection.execute(
+                'SELECT date, project, task, description, duration, minutes, response, published FROM posts '
+                'WHERE namespace = ? AND date BETWEEN ? AND ? ORDER BY date, published',
+                (self.namespace, since, until or since)
+            )
+            rows = cursor.fetchall()
+        return [
+            {
+                'date': date,
+                'description': description,
+                'duration': duration,
+                'minutes': minutes,
+                'project': project,
+                'published': published,
+                'response': json.loads(response) if response else None,
+                'task': task
+            } for date, project, task, description, duration, minutes, response, published in rows
+        ]
+
+    def record(self, date, post, minutes, response=None):
+        """
+        Record published post (the ledger is append-only, so recording the same post twice keeps the first record).
+
+        :param date: The date in ISO 8601 (`YYYY-MM-DD`) format when work was actually done.
+        :type date: str
+        :param post: The post in `[project, task, description, duration, rounded]` format.
+        :type post: list
+        :param minutes: The number of minutes actually published (real or rounded duration).
+        :type minutes: int
+        :param response: Optional PL API response content (e.g. with created post ID).
+        :type response: dict
+        """
+        date, project, task, digest = self.key(date=date, post=post)
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR IGNORE INTO posts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    self.namespace,
+                    date,
+                    project,
+                    task,
+                    digest,
+                    post[2],
+                    post[3],
+                    minutes,
+                    json.dumps(response) if response is not None else None,
+                    time()
+                )
+            )
@@ -0,0 +1,344 @@
+from bisect import bisect_left
+from threading import Lock
+import re
+
+# The default histogram buckets (in seconds) suitable for both API service routes and upstream requests latency
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Metric(object):
+
+    # The metric type name used in exposition format `TYPE` line
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labels=()):
+        """
+        Base class of metrics stored in process memory and exposed in Prometheus text format.
+
+        :param name: The metric name (e.g. `toggl2pl_requests_total`).
+        :type name: str
+        :param documentation: Human-readable metric description used in exposition format `HELP` line.
+        :type documentation: str
+        :param labels: Optional names of labels which values must be passed (in the same order) to update metric.
+        :type labels: tuple
+        """
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.lock = Lock()
+        self.name = name
+        self.values = dict()
+
+    def expose(self):
+        """
+        Render metric samples in Prometheus text exposition format.
+
+        :return: List of exposition format lines (including `HELP` and `TYPE` lines).
+        :rtype: list
+        """
+        lines = [
+            '# HELP {name} {documentation}'.format(name=self.name, documentation=self.documentation),
+            '# TYPE {name} {kind}'.format(name=self.name, kind=self.kind)
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append('{name}{suffix}{labels} {value}'.format(
+                name=self.name,
+                suffix=suffix,
+                labels=render(labels=labels),
+                value=number(value=value)
+            ))
+        return lines
+
+    def samples(self):
+        """
+        Collect metric samples.
+
+        :return: List of `(suffix, labels, value)` tuples where labels are list of `(name, value)` pairs.
+        :rtype: list
+        """
+        with self.lock:
+            values = sorted(self.values.items())
+        return [('', list(zip(self.labels, key)), value) for key, value in values]
+
+
+class Collector(Metric):
+
+    def __init__(self, name, documentation, function, kind='gauge', labels=()):
+        """
+        Metric which values are collected on scrape using the provided callable object (e.g. from existing counters of
+        other components), so it does not add any overhead to requests processing.
+
+        :param name: The metric name.
+        :type name: str
+        :param documentation: Human-readable metric description used in exposition format `HELP` line.
+        :type documentation: str
+        :param function: Callable object which returns dictionary object with values by tuples of labels values.
+        :type function: callable
+        :param kind: Optional metric type name (`gauge` or `counter`).
+        :type kind: str
+        :param labels: Optional names of labels returned by the callable object.
+        :type labels: tuple
+        """
+        super().__init__(name=name, documentation=documentation, labels=labels)
+        self.function = function
+        self.kind = kind
+
+    def samples(self):
+        return [('', list(zip(self.labels, key)), value) for key, value in sorted(self.function().items())]
+
+
+class Counter(Metric):
+
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        """
+        Increase counter value for the provided labels values.
+
+        :param labels: The labels values in the same order as labels names.
+        :type labels: str
+        :param amount: Optional positive number to increase counter by.
+        :type amount: float
+        """
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+
+    kind = 'gauge'
+
+    def dec(self, *labels, amount=1):
+        """
+        Decrease gauge value for the provided labels values.
+
+        :param labels: The labels values in the same order as labels names.
+        :type labels: str
+        :param amount: Optional number to decrease gauge by.
+        :type amount: float
+        """
+        self.inc(*labels, amount=-amount)
+
+    def inc(self, *labels, amount=1):
+        """
+        Increase gauge value for the provided labels values.
+
+        :param labels: The labels values in the same order as labels names.
+        :type labels: str
+        :param amount: Optional number to increase gauge by.
+        :type amount: float
+        """
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Histogram(Metric):
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=BUCKETS):
+        """
+        Histogram of observed values (e.g. latencies) with fixed buckets.
+
+        Only per-bucket counts are updated on observation (cumulative counts required by exposition format are
+        calculated on scrape), so observation costs a binary search and a few additions under the metric lock.
+
+        :param name: The metric name (e.g. `toggl2pl_request_duration_seconds`).
+        :type name: str
+        :param documentation: Human-readable metric description used in exposition format `HELP` line.
+        :type documentation: str
+        :param labels: Optional names of labels which values must be passed (in the same order) to observe values.
+        :type labels: tuple
+        :param buckets: Optional sorted upper bounds of histogram buckets (`+Inf` bucket is added automatically).
+        :type buckets: tuple
+        """
+        super().__init__(name=name, documentation=documentation, labels=labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        """
+        Add observed value to the histogram for the provided labels values.
+
+        :param value: The observed value (e.g. request duration in seconds).
+        :type value: float
+        :param labels: The labels values in the same order as labels names.
+        :type labels: str
+        """
+        i = bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(labels)
+            if state is None:
+                # The state is a list of per-bucket counts (the last one is `+Inf` bucket) followed by sum of values
+                state = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[i] += 1
+            state[-1] += value
+
+    def samples(self):
+        with self.lock:
+            values = sorted((key, list(state)) for key, state in self.values.items())
+        samples = list()
+        for key, state in values:
+            labels = list(zip(self.labels, key))
+            total = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state):
+                total += count
+                samples.append(('_bucket', labels + [('le', number(value=bound))], total))
+            samples.append(('_count', labels, total))
+            samples.append(('_sum', labels, state[-1]))
+        return samples
+
+
+class Registry(object):
+
+    def __init__(self):
+        """
+        Set of metrics exposed together in Prometheus text format.
+        """
+        self.lock = Lock()
+        self.metrics = dict()
+
+    def collector(self, name, documentation, function, kind='gauge', labels=()):
+        """
+        Register metric which values are collected on scrape (please see :class:`Collector` for details).
+
+        :return: The registered metric object.
+        :rtype: :class:`Collector`
+        """
+        return self.register(
+            metric=Collector(name=name, documentation=documentation, function=function, kind=kind, labels=labels)
+        )
+
+    def counter(self, name, documentation, labels=()):
+        """
+        Register a new counter metric or get existing one with the same name.
+
+        :return: The registered metric object.
+        :rtype: :class:`Counter`
+        """
+        return self.register(metric=Counter(name=name, documentation=documentation, labels=labels))
+
+    def expose(self):
+        """
+        Render all registered metrics in Prometheus text exposition format.
+
+        :return: Metrics in Prometheus text exposition format (version 0.0.4).
+        :rtype: str
+        """
+        with self.lock:
+            metrics = [self.metrics[name] for name in sorted(self.metrics)]
+        lines = list()
+        for metric in metrics:
+            lines.extend(metric.expose())
+        return '\n'.join(lines) + '\n'
+
+    def gauge(self, name, documentation, labels=()):
+        """
+        Register a new gauge metric or get existing one with the same name.
+
+        :return: The registered metric object.
+        :rtype: :class:`Gauge`
+        """
+        return self.register(metric=Gauge(name=name, documentation=documentation, labels=labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=BUCKETS):
+        """
+        Register a new histogram metric or get existing one with the same name.
+
+        :return: The registered metric object.
+        :rtype: :class:`Histogram`
+        """
+        return self.register(metric=Histogram(name=name, documentation=documentation, labels=labels, buckets=buckets))
+
+    def register(self, metric):
+        """
+        Add metric to the registry (metrics with the same name registered earlier are kept, so module reloads and
+        repeated application creation do not reset collected values).
+
+        :param metric: The metric object to register.
+        :type metric: :class:`Metric`
+        :return: The registered metric object.
+        :rtype: :class:`Metric`
+        """
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+
+def endpoint(path):
+    """
+    Replace numeric identifiers in API endpoint path with placeholder to keep metrics labels cardinality low.
+
+    :param path: The API endpoint path (e.g. `workspaces/123/clients`).
+    :type path: str
+    :return: The endpoint path with identifiers replaced (e.g. `workspaces/:id/clients`).
+    :rtype: str
+    """
+    return re.sub(r'(?<![^/])\d+(?![^/])', ':id', path)
+
+
+def number(value):
+    """
+    Format sample value according to exposition format (integers without fractional part, infinity as `+Inf`).
+
+    :param value: The sample value.
+    :type value: float
+    :return: String representation of the sample value.
+    :rtype: str
+    """
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render(labels):
+    """
+    Render sample labels in exposition format with escaped values.
+
+    :param labels: List of `(name, value)` pairs.
+    :type labels: list
+    :return: Labels in curly braces or empty string in case there are no labels.
+    :rtype: str
+    """
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        '{name}="{value}"'.format(
+            name=name,
+            value=str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        ) for name, value in labels
+    ) + '}'
+
+
+registry = Registry()
+
+# Upstream (PL and Toggl) API requests metrics updated by :class:`toggl2pl.Transport`
+upstream_requests = registry.counter(
+    name='toggl2pl_upstream_requests_total',
+    documentation='The number of upstream API requests by upstream, endpoint, method and outcome.',
+    labels=('upstream', 'endpoint', 'method', 'status')
+)
+upstream_duration = registry.histogram(
+    name='toggl2pl_upstream_request_duration_seconds',
+    documentation='Upstream API requests duration including rate limiter waits and retries.',
+    labels=('upstream', 'endpoint', 'method')
+)
+
+
+def observe_upstream(upstream, path, method, status, seconds):
+    """
+    Record upstream API request outcome and duration.
+
+    :param upstream: The upstream name (`pl` or `toggl`).
+    :type upstream: str
+    :param path: The API endpoint path as passed to client methods (identifiers are replaced by placeholder).
+    :type path: str
+    :param method: The HTTP method.
+    :type method: str
+    :param status: The HTTP response status code or error name in case response was not received.
+    :type status: str
+    :param seconds: The request duration in seconds.
+    :type seconds: float
+    """
+    path = endpoint(path=path)
+    upstream_requests.inc(upstream, path, method, str(status))
+    upstream_duration.observe(seconds, upstream, path, method)
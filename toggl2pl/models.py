@@ -0,0 +1,88 @@
+from collections import namedtuple
+
+
+class PLProject(namedtuple('PLProject', ('id', 'name', 'tasks'))):
+
+    # GOTCHA: Empty slots keep records as small as plain tuples (no per-instance dictionary)
+    __slots__ = ()
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Build Project Laboratory project from PL API payload (only fields used to publish posts are kept) or from its
+        own JSON representation (e.g. loaded from persistent metadata cache).
+
+        :param data: Dictionary object with PL project and its tasks by titles or `[id, name, tasks]` list.
+        :type data: dict
+        :return: Immutable PL project record.
+        :rtype: :class:`PLProject`
+        """
+        if isinstance(data, dict):
+            data = (data['id'], data['name'], data['tasks'])
+        pid, name, tasks = data
+        return cls(id=pid, name=name, tasks={title: PLTask.from_json(data=task) for title, task in tasks.items()})
+
+
+class PLTask(namedtuple('PLTask', ('id', 'title'))):
+
+    __slots__ = ()
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Build Project Laboratory task from PL API payload or from its own JSON representation.
+
+        :param data: Dictionary object with PL task or `[id, title]` list.
+        :type data: dict
+        :return: Immutable PL task record.
+        :rtype: :class:`PLTask`
+        """
+        if isinstance(data, dict):
+            return cls(id=data['id'], title=data['title'])
+        return cls(*data)
+
+
+class Post(namedtuple('Post', ('project', 'task', 'description', 'duration', 'rounded'))):
+
+    __slots__ = ()
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Build post from its JSON representation (posts are serialized as plain arrays by :func:`json.dumps`).
+
+        :param data: The post in `[project, task, description, duration, rounded]` format.
+        :type data: list
+        :return: Immutable post record.
+        :rtype: :class:`Post`
+        """
+        return cls(*data)
+
+
+class TimeEntry(namedtuple('TimeEntry', ('client', 'project', 'description', 'dur', 'date', 'id'))):
+
+    __slots__ = ()
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Build time entry from Toggl Reports API `details` report item (only fields used to build posts are kept, so
+        the rest of upstream payload is released together with the report page).
+
+        :param data: Dictionary object with Toggl time entry.
+        :type data: dict
+        :return: Immutable time entry record (`date` and `id` are `None` for entries without them).
+        :rtype: :class:`TimeEntry`
+        """
+        start = data.get('start')
+        # GOTCHA: Records are built for every fetched time entry, so the fast positional constructor is used
+        return cls._make(
+            (
+                data['client'],
+                data['project'],
+                data['description'],
+                data['dur'],
+                start[:10] if start else None,
+                data.get('id')
+            )
+        )
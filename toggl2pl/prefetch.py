@@ -0,0 +1,148 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, Thread
+from time import monotonic
+import logging
+
+
+class Prefetcher(object):
+
+    def __init__(self, fetch, active_ttl=3600, budget=50, concurrency=2, interval=0, maxsize=1024):
+        """
+        Background scheduler which periodically refreshes responses of recently active users, so the next requests of
+        the same users are served from memory instead of waiting for upstream.
+
+        Users are observed by request handlers and forgotten once they are inactive for `active_ttl` seconds. Every
+        `interval` seconds the most recently active users are passed to `fetch` callable using bounded pool of workers
+        (at most `budget` users per cycle, the rest are skipped until they become the most recent ones).
+
+        :param fetch: Callable object which accepts observed request payload as `data` keyword argument, refreshes its
+                      response and returns the outcome name (e.g. `prefetched`, `unchanged` or `throttled`).
+        :type fetch: callable
+        :param active_ttl: The number of seconds since the last request to keep prefetching user responses.
+        :type active_ttl: int
+        :param budget: The maximum number of users prefetched per cycle (zero disables the limit).
+        :type budget: int
+        :param concurrency: The number of users prefetched concurrently.
+        :type concurrency: int
+        :param interval: The number of seconds between prefetch cycles (zero disables prefetching).
+        :type interval: float
+        :param maxsize: The maximum number of observed users (least recently active are forgotten first).
+        :type maxsize: int
+        """
+        self.active = OrderedDict()
+        self.active_ttl = active_ttl
+        self.budget = budget
+        self.concurrency = max(1, concurrency)
+        self.counters = {
+            'cycles': 0,
+            'failed': 0,
+            'skipped': 0
+        }
+        self.fetch = fetch
+        self.interval = interval
+        self.lock = Lock()
+        self.maxsize = maxsize
+        self.stopped = Event()
+        self.worker = None
+
+    def close(self, timeout=None):
+        """
+        Stop the background worker thread (the current cycle is finished before the worker exits).
+
+        :param timeout: Optional number of seconds to wait for the worker to stop.
+        :type timeout: float
+        """
+        self.stopped.set()
+        with self.lock:
+            worker = self.worker
+        if worker is not None:
+            worker.join(timeout=timeout)
+
+    def cycle(self):
+        """
+        Forget inactive users and prefetch responses of the most recently active ones (executed by background worker
+        every `interval` seconds).
+        """
+        with self.lock:
+            expired = [key for key, (data, seen) in self.active.items() if monotonic() - seen > self.active_ttl]
+            for key in expired:
+                del self.active[key]
+            candidates = [data for data, seen in reversed(self.active.values())]
+        if self.budget > 0:
+            candidates, skipped = candidates[:self.budget], len(candidates[self.budget:])
+        else:
+            skipped = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            outcomes = list(executor.map(self.prefetch, candidates))
+        with self.lock:
+            self.counters['cycles'] += 1
+            self.counters['skipped'] += skipped
+            for outcome in outcomes:
+                self.counters[outcome] = self.counters.get(outcome, 0) + 1
+
+    def observe(self, key, data):
+        """
+        Remember request payload of active user to prefetch its responses during the next cycles.
+
+        :param key: The unique user key (e.g. hash of credentials and request options).
+        :type key: str
+        :param data: The request payload passed to `fetch` callable.
+        :type data: dict
+        """
+        if self.interval <= 0:
+            return
+        with self.lock:
+            self.active[key] = (data, monotonic())
+            self.active.move_to_end(key)
+            while len(self.active) > self.maxsize:
+                self.active.popitem(last=False)
+
+    def prefetch(self, data):
+        """
+        Prefetch response of single user without failing the whole cycle.
+
+        :param data: The observed request payload.
+        :type data: dict
+        :return: The outcome name returned by `fetch` callable or `failed` in case it raised an exception.
+        :rtype: str
+        """
+        try:
+            return self.fetch(data=data)
+        except Exception as ex:
+            logging.warning(msg='failed to prefetch response: {ex}'.format(ex=ex))
+            return 'failed'
+
+    def run(self):
+        """
+        Execute prefetch cycles until the prefetcher is closed (background worker target).
+        """
+        while not self.stopped.wait(timeout=self.interval):
+            self.cycle()
+
+    def start(self):
+        """
+        Start the background worker thread unless it is already running or prefetching is disabled.
+        """
+        with self.lock:
+            if self.worker is not None or self.interval <= 0:
+                return
+            self.worker = Thread(target=self.run, name='prefetcher', daemon=True)
+            self.worker.start()
+
+    def stats(self):
+        """
+        Collect prefetcher statistics (useful for monitoring).
+
+        :return: Dictionary object with the number of active users and prefetch cycles and outcomes counters.
+        :rtype: dict
+        """
+        with self.lock:
+            stats = dict(self.counters)
+            stats.update(
+                {
+                    'active': len(self.active),
+                    'running': self.worker is not None
+                }
+            )
+        return stats
@@ -0,0 +1,231 @@
+from datetime import date, timedelta
+from threading import Lock
+from time import time
+import sqlite3
+
+
+class Replica(object):
+
+    # Time entries replicated from Toggl Reports API (only fields used to build posts) and synced range of dates
+    schema = (
+        '''
+        CREATE TABLE IF NOT EXISTS entries (
+            namespace TEXT NOT NULL,
+            id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            client TEXT,
+            project TEXT,
+            description TEXT,
+            dur INTEGER NOT NULL,
+            PRIMARY KEY (namespace, id)
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX IF NOT EXISTS entries_date ON entries (namespace, date, client, project, description, dur)',
+        '''
+        CREATE TABLE IF NOT EXISTS watermarks (
+            namespace TEXT PRIMARY KEY,
+            first TEXT NOT NULL,
+            last TEXT,
+            synced REAL NOT NULL
+        )
+        '''
+    )
+
+    def __init__(self, path, namespace, recheck=2, refresh=False):
+        """
+        Local replica of Toggl time entries stored in SQLite database and synced incrementally, so reports for periods
+        which were already synced are built by indexed queries without Toggl requests.
+
+        The replica covers continuous range of final dates between `first` and `last` watermarks, where the day is
+        final once it was fetched at least `recheck` days after it passed (recent time entries may still be edited or
+        added). Requested days outside of the range are fetched on every sync, and the range is extended to keep it
+        continuous. Time entries of every fetched day replace the replicated ones, so deleted time entries disappear
+        from the replica as well.
+
+        :param path: The path to SQLite database file (created if does not exist).
+        :type path: str
+        :param namespace: The unique name of Toggl account and workspace (e.g. hash of API token and workspace name) to
+                          keep time entries of different accounts separately in the same file.
+        :type namespace: str
+        :param recheck: Optional number of days which must pass before fetched day is considered final.
+        :type recheck: int
+        :param refresh: Optional flag to ignore watermarks and fetch all requested days again.
+        :type refresh: bool
+        """
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        for statement in self.schema:
+            self.connection.execute(statement)
+        self.lock = Lock()
+        self.namespace = namespace
+        self.recheck = max(1, recheck)
+        self.refresh = refresh
+
+    def close(self):
+        """
+        Close database connection.
+        """
+        with self.lock:
+            self.connection.close()
+
+    def durations(self, since, until, daily=False):
+        """
+        Sum replicated time entries durations by clients, projects and descriptions (and dates in daily mode).
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format.
+        :type since: str
+        :param until: The last date in ISO 8601 (`YYYY-MM-DD`) format.
+        :type until: str
+        :param daily: Optional flag to sum durations of every day separately.
+        :type daily: bool
+        :return: List of `(key, seconds)` pairs sorted by keys in :attr:`toggl2pl.Aggregator.durations` format.
+        :rtype: list
+        :raises AssertionError: In case some time entry does not have client, project or description.
+        """
+        columns = 'date, client, project, description' if daily else 'client, project, description'
+        with self.lock:
+            # GOTCHA: Durations are truncated to seconds before summing the same way as time entries are aggregated
+            rows = self.connection.execute(
+                'SELECT {columns}, SUM(dur / 1000) FROM entries WHERE namespace = ? AND date BETWEEN ? AND ? '
+                'GROUP BY {columns} ORDER BY {columns}'.format(columns=columns),
+                (self.namespace, since, until)
+            ).fetchall()
+        items = list()
+        for row in rows:
+            key = tuple(row[:-1])
+            if None in key[-3:]:
+                raise AssertionError(
+                    {
+                        'client': key[-3],
+                        'project': key[-2],
+                        'description': key[-1]
+                    }
+                )
+            items.append((key, row[-1]))
+        return items
+
+    def plan(self, since, until):
+        """
+        Calculate ranges of dates to fetch from Toggl to make replica cover the requested period.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format.
+        :type since: str
+        :param until: The last date in ISO 8601 (`YYYY-MM-DD`) format.
+        :type until: str
+        :return: List of `(since, until)` pairs of dates (empty in case the period is already replicated).
+        :rtype: list
+        """
+        first, last = self.watermarks()
+        if first is None:
+            return [(since, until)]
+        ranges = [(since, until)] if self.refresh else list()
+        # GOTCHA: Days between the requested period and watermarks are fetched as well, otherwise the replica would
+        # have a gap inside the range of dates considered replicated once watermarks are moved.
+        if since < first:
+            ranges.append((since, shift(first, days=-1)))
+        start = first if last is None else shift(last, days=1)
+        if until >= start:
+            ranges.append((start, until))
+        return merge(ranges=ranges)
+
+    def store(self, since, until, entries, today=None):
+        """
+        Replace replicated time entries of the fetched days and move watermarks in single transaction.
+
+        :param since: The first fetched date in ISO 8601 (`YYYY-MM-DD`) format.
+        :type since: str
+        :param until: The last fetched date in ISO 8601 (`YYYY-MM-DD`) format.
+        :type until: str
+        :param entries: Iterable of :class:`toggl2pl.models.TimeEntry` records (consumed before transaction).
+        :type entries: iterable
+        :param today: Optional current date in ISO 8601 (`YYYY-MM-DD`) format (default: local date).
+        :type today: str
+        :return: The number of stored time entries.
+        :rtype: int
+        """
+        rows = [
+            (
+                self.namespace,
+                entry.id,
+                entry.date,
+                entry.client,
+                entry.project,
+                entry.description,
+                entry.dur
+            ) for entry in entries
+        ]
+        final = min(until, shift(today or date.today().isoformat(), days=-self.recheck))
+        # GOTCHA: The last watermark is moved only in case some fetched day is final, otherwise any placeholder date
+        # merged with the stored watermark would claim days which were never fetched after they passed to be final.
+        last = final if final >= since else None
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                self.connection.execute(
+                    'DELETE FROM entries WHERE namespace = ? AND date BETWEEN ? AND ?',
+                    (self.namespace, since, until)
+                )
+                self.connection.executemany('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+                # NOTE: Upsert syntax is not used as it requires SQLite 3.24+ (Debian Stretch ships SQLite 3.16)
+                self.connection.execute(
+                    'INSERT OR IGNORE INTO watermarks VALUES (?, ?, ?, ?)',
+                    (self.namespace, since, last, time())
+                )
+                self.connection.execute(
+                    'UPDATE watermarks SET first = MIN(first, ?), last = COALESCE(MAX(last, ?), last, ?), synced = ? '
+                    'WHERE namespace = ?',
+                    (since, last, last, time(), self.namespace)
+                )
+            except BaseException:
+                self.connection.execute('ROLLBACK')
+                raise
+            self.connection.execute('COMMIT')
+        return len(rows)
+
+    def watermarks(self):
+        """
+        Get the range of dates covered by the replica.
+
+        :return: Tuple of the first and the last final dates (both are `None` in case nothing was synced yet, the last
+                 date is `None` in case no fetched day is final yet).
+        :rtype: tuple
+        """
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT first, last FROM watermarks WHERE namespace = ?',
+                (self.namespace,)
+            ).fetchone()
+        return tuple(row) if row else (None, None)
+
+
+def merge(ranges):
+    """
+    Merge overlapping and adjacent ranges of dates.
+
+    :param ranges: List of `(since, until)` pairs of dates in ISO 8601 (`YYYY-MM-DD`) format.
+    :type ranges: list
+    :return: List of non-overlapping `(since, until)` pairs sorted by dates.
+    :rtype: list
+    """
+    merged = list()
+    for since, until in sorted(ranges):
+        if merged and since <= shift(merged[-1][1], days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], until))
+        else:
+            merged.append((since, until))
+    return merged
+
+
+def shift(value, days):
+    """
+    Shift date by the number of days.
+
+    :param value: The date in ISO 8601 (`YYYY-MM-DD`) format.
+    :type value: str
+    :param days: The number of days to add (negative to subtract).
+    :type days: int
+    :return: The shifted date in ISO 8601 (`YYYY-MM-DD`) format.
+    :rtype: str
+    """
+    return (date.fromisoformat(value) + timedelta(days=days)).isoformat()
@@ -0,0 +1,290 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+from time import perf_counter
+from toggl2pl import APP_KEY, PL, Client, UpstreamError
+import glob
+import os
+
+
+class Member(object):
+
+    def __init__(self, name, credentials, cache=None, ledger=None):
+        """
+        Team member whose Toggl posts are exported into Project Laboratory by :class:`Team`.
+
+        :param name: The team member name shown in review table and summary (e.g. configuration file name).
+        :type name: str
+        :param credentials: Keyword arguments to create :class:`toggl2pl.Client` (credentials, workspace, limits and so
+                            on) except persistent cache and preloaded projects.
+        :type credentials: dict
+        :param cache: Optional persistent cache to store rarely changed Toggl metadata between runs.
+        :type cache: :class:`toggl2pl.cache.MetadataCache`
+        :param ledger: Optional push ledger to skip already published posts and record published ones.
+        :type ledger: :class:`toggl2pl.ledger.Ledger`
+        """
+        self.cache = cache
+        self.client = None
+        self.credentials = credentials
+        self.error = None
+        self.latencies = list()
+        self.ledger = ledger
+        self.lock = Lock()
+        self.name = name
+        self.stats = {
+            'failed': 0,
+            'posts': 0,
+            'published': 0,
+            'pull': 0.0,
+            'skipped': 0
+        }
+        self.window = None
+
+    def connect(self, projects):
+        """
+        Create client using shared PL projects (only Toggl user and workspace metadata is loaded by each member).
+
+        :param projects: PL projects with tasks returned by :meth:`toggl2pl.PL.projects` without exclusions.
+        :type projects: dict
+        """
+        try:
+            self.client = Client(cache=self.cache, projects=projects, **self.credentials)
+        except (TypeError, UpstreamError) as error:
+            self.error = str(error)
+
+    def observe(self, started, finished):
+        """
+        Record PL request latency and extend the member publishing time window.
+
+        :param started: The request start time returned by :func:`time.perf_counter`.
+        :type started: float
+        :param finished: The request finish time returned by :func:`time.perf_counter`.
+        :type finished: float
+        """
+        with self.lock:
+            self.latencies.append(finished - started)
+            if self.window is None:
+                self.window = (started, finished)
+            else:
+                self.window = (min(self.window[0], started), max(self.window[1], finished))
+
+    def pull(self, since, until):
+        """
+        Pull member daily posts which are not recorded in the push ledger yet and measure pull duration.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type since: str
+        :param until: The end date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type until: str
+        :return: List of `(date, post)` pairs (empty in case member client failed).
+        :rtype: list
+        """
+        if self.client is None:
+            return list()
+        started = perf_counter()
+        try:
+            days = self.client.days(since=since, until=until)
+        except AssertionError as ae:
+            self.error = 'incomplete time entry: {entry}'.format(entry=ae.args[0])
+            return list()
+        except UpstreamError as ue:
+            self.error = str(ue)
+            return list()
+        finally:
+            self.stats['pull'] = perf_counter() - started
+        items = [(date, post) for date, posts in days for post in posts]
+        if self.ledger is not None:
+            items = list(self.ledger.pending(items=items))
+            self.stats['skipped'] = self.ledger.skipped
+        self.stats['posts'] = len(items)
+        return items
+
+    def summary(self):
+        """
+        Summarize member export: pulled, skipped, published and failed posts, pull duration, push throughput and
+        latency of PL requests.
+
+        :return: Dictionary object with member statistics.
+        :rtype: dict
+        """
+        push = self.window[1] - self.window[0] if self.window else 0.0
+        return dict(
+            self.stats,
+            error=self.error,
+            latency_max=max(self.latencies, default=0.0),
+            latency_mean=sum(self.latencies) / len(self.latencies) if self.latencies else 0.0,
+            name=self.name,
+            push=push,
+            throughput=self.stats['published'] / push if push else 0.0
+        )
+
+
+class Team(object):
+
+    def __init__(self, members, jobs=4, rounding=False):
+        """
+        Export Toggl posts of several team members at once: PL projects are loaded once per PL instance and shared by
+        all members, members posts are pulled from Toggl concurrently and published using a single bounded pool of
+        workers.
+
+        :param members: List of team members.
+        :type members: list
+        :param jobs: Optional number of posts to publish concurrently (shared by all members).
+        :type jobs: int
+        :param rounding: Optional flag to publish rounded number of minutes instead of real.
+        :type rounding: bool
+        """
+        self.jobs = max(1, jobs)
+        self.members = members
+        self.rounding = rounding
+
+    def connect(self):
+        """
+        Load PL projects once per PL instance and create members clients concurrently.
+        """
+        shared = dict()
+        for member in self.members:
+            base_url = member.credentials['base_url']
+            if base_url not in shared:
+                shared[base_url] = self.projects(credentials=member.credentials)
+        with ThreadPoolExecutor(max_workers=len(self.members) or 1) as executor:
+            list(executor.map(lambda item: item.connect(projects=shared[item.credentials['base_url']]), self.members))
+
+    @staticmethod
+    def projects(credentials):
+        """
+        Load PL projects with tasks (without exclusions which are applied by each member client).
+
+        :param credentials: Keyword arguments of member which credentials are used to load projects.
+        :type credentials: dict
+        :return: Dictionary object with combined information about PL projects and their tasks.
+        :rtype: dict
+        """
+        pl = PL(
+            app_key=APP_KEY,
+            base_url=credentials['base_url'],
+            log_level=credentials.get('log_level', 'info'),
+            max_workers=credentials.get('max_workers', 8),
+            user_key=credentials['user_key'],
+            verify=credentials.get('verify', True),
+            **(credentials.get('limits') or dict()).get('pl', dict())
+        )
+        return pl.projects()
+
+    def pull(self, since, until):
+        """
+        Pull posts of all members concurrently.
+
+        :param since: The start date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type since: str
+        :param until: The end date in ISO 8601 (`YYYY-MM-DD`) format to query Toggl Reports API for tasks.
+        :type until: str
+        :return: List of `(member, date, post)` tuples in members order.
+        :rtype: list
+        """
+        with ThreadPoolExecutor(max_workers=len(self.members) or 1) as executor:
+            pulled = list(executor.map(lambda member: member.pull(since=since, until=until), self.members))
+        return [(member, date, post) for member, items in zip(self.members, pulled) for date, post in items]
+
+    def push(self, items, progress=None):
+        """
+        Publish posts of all members using single bounded pool of workers, record published posts in members ledgers
+        and measure every PL request latency.
+
+        :param items: List of reviewed `(member, date, post)` tuples returned by :meth:`pull`.
+        :type items: list
+        :param progress: Optional callable object called once every post is processed (e.g. to update progress bar).
+        :type progress: callable
+        :return: List of dictionaries with failed posts, their members names and error descriptions.
+        :rtype: list
+        """
+        def worker(member, date, post):
+            project, task, description, duration, rounded = post
+            started = perf_counter()
+            try:
+                return member.client.add_post(
+                    date=date,
+                    description=description,
+                    minutes=rounded if self.rounding else duration,
+                    project=project,
+                    task=task
+                )
+            finally:
+                member.observe(started=started, finished=perf_counter())
+
+        failed = list()
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            futures = {executor.submit(worker, *item): i for i, item in enumerate(items)}
+            for future in as_completed(futures):
+                member, date, post = items[futures[future]]
+                try:
+                    response = future.result()
+                except KeyError as ke:
+                    error = 'not found: {missing}'.format(missing=ke.args[0])
+                except UpstreamError as ue:
+                    error = str(ue)
+                else:
+                    error = None
+                    member.stats['published'] += 1
+                    if member.ledger is not None:
+                        minutes = post[4] if self.rounding else post[3]
+                        member.ledger.record(date=date, post=post, minutes=minutes, response=response)
+                if error is not None:
+                    member.stats['failed'] += 1
+                    failed.append(
+                        (
+                            futures[future],
+                            {
+                                'date': date,
+                                'error': error,
+                                'post': list(post),
+                                'user': member.name
+                            }
+                        )
+                    )
+                if progress is not None:
+                    progress()
+        return [item for i, item in sorted(failed, key=lambda pair: pair[0])]
+
+    def summary(self):
+        """
+        Summarize export of every team member (please see :meth:`Member.summary`).
+
+        :return: List of dictionaries with members statistics.
+        :rtype: list
+        """
+        return [member.summary() for member in self.members]
+
+
+def discover(paths):
+    """
+    Find team members configuration files: files are used as is, while directories are searched for `*.yml` files
+    (member name is the file name) and `*/config.yml` files (member name is the directory name).
+
+    :param paths: List of paths to configuration files or directories with them.
+    :type paths: list
+    :return: List of `(name, path)` pairs sorted by names within every directory.
+    :rtype: list
+    """
+    found = list()
+    for path in paths:
+        if not os.path.isdir(path):
+            found.append((member_name(path=path), path))
+            continue
+        files = glob.glob(os.path.join(path, '*.yml')) + glob.glob(os.path.join(path, '*', 'config.yml'))
+        found.extend(sorted((member_name(path=item), item) for item in files))
+    return found
+
+
+def member_name(path):
+    """
+    Get team member name from configuration file path.
+
+    :param path: The path to configuration file.
+    :type path: str
+    :return: The file name without extension or the parent directory name for `config.yml` files.
+    :rtype: str
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if stem == 'config':
+        return os.path.basename(os.path.dirname(os.path.abspath(path)))
+    return stem